@@ -7,6 +7,9 @@ import dotenv
 
 from strategy.edgex_arb import EdgexArb
 from strategy.extended_arb import ExtendedArb
+from strategy.multi_market import MultiMarketRunner
+from strategy.risk_service import RiskLimits
+from strategy.supervisor import ShardedSupervisor
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -18,7 +21,8 @@ def parse_arguments():
     parser.add_argument('--exchange', type=str, default='edgex',
                         help='Exchange to use (edgex or extended)')
     parser.add_argument('--ticker', type=str, default='BTC',
-                        help='Ticker symbol (default: BTC)')
+                        help='Ticker symbol, or a comma-separated list to run several markets '
+                             'in one process over shared connections (default: BTC)')
     parser.add_argument('--size', type=str, required=True,
                         help='Number of tokens to buy/sell per order')
     parser.add_argument('--fill-timeout', type=int, default=5,
@@ -29,22 +33,63 @@ def parse_arguments():
                         help='Long threshold (default: 10)')
     parser.add_argument('--short-threshold', type=Decimal, default=Decimal('10'),
                         help='Short threshold (default: 10)')
+    parser.add_argument('--inline-hedge', action='store_true',
+                        help='Send the Lighter hedge directly from the maker-fill WebSocket callback')
+    parser.add_argument('--max-book-age', type=float, default=2.0,
+                        help='Skip trade decisions when an order book is older than this many seconds; 0 disables (default: 2)')
+    parser.add_argument('--ladder-levels', type=int, default=1,
+                        help='Number of edgeX maker orders to rest per side at once; 1 keeps one order at a time (default: 1)')
+    parser.add_argument('--ladder-step', type=int, default=1,
+                        help='Spacing between ladder orders in ticks (default: 1)')
+    parser.add_argument('--md-process', action='store_true',
+                        help='Decode the order book streams in a separate process that shares the books '
+                             'through shared memory')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Shard the tickers across this many worker processes; each needs its own '
+                             'Lighter API key (default: 1)')
+    parser.add_argument('--max-total-notional', type=Decimal, default=Decimal('0'),
+                        help='Global cap on the edgeX position notional summed over all tickers, in USD; '
+                             '0 disables (multi-process only, default: 0)')
+    parser.add_argument('--max-net-exposure', type=Decimal, default=Decimal('0'),
+                        help='Global cap on unhedged (edgeX + Lighter) notional summed over all tickers, in USD; '
+                             '0 disables (multi-process only, default: 0)')
+    parser.add_argument('--risk-socket', type=str, default=None,
+                        help='Unix socket path of the shared risk service (default: a temp file)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics; with --workers, '
+                             'worker N uses PORT+N (default: disabled)')
     return parser.parse_args()
 
 async def main():
     args = parse_arguments()
     dotenv.load_dotenv()
 
+    tickers = [t.strip().upper() for t in args.ticker.split(',') if t.strip()]
+
+    edgex_kwargs = dict(
+        order_quantity=Decimal(args.size),
+        fill_timeout=args.fill_timeout,
+        max_position=args.max_position,
+        long_ex_threshold=Decimal(args.long_threshold),
+        short_ex_threshold=Decimal(args.short_threshold),
+        inline_hedge=args.inline_hedge,
+        max_book_age=args.max_book_age,
+        ladder_levels=args.ladder_levels,
+        ladder_step_ticks=args.ladder_step,
+        market_data_process=args.md_process,
+        metrics_port=args.metrics_port
+    )
+
     # Dispatch strategy
-    if args.exchange.lower() == 'edgex':
-        bot = EdgexArb(
-            ticker=args.ticker.upper(),
-            order_quantity=Decimal(args.size),
-            fill_timeout=args.fill_timeout,
-            max_position=args.max_position,
-            long_ex_threshold=Decimal(args.long_threshold),
-            short_ex_threshold=Decimal(args.short_threshold)
-        )
+    if args.exchange.lower() == 'edgex' and args.workers > 1 and len(tickers) > 1:
+        limits = RiskLimits(max_position=args.max_position,
+                            max_total_notional=args.max_total_notional,
+                            max_net_exposure=args.max_net_exposure)
+        bot = ShardedSupervisor(tickers, args.workers, edgex_kwargs, limits, args.risk_socket)
+    elif args.exchange.lower() == 'edgex' and len(tickers) > 1:
+        bot = MultiMarketRunner(tickers, **edgex_kwargs)
+    elif args.exchange.lower() == 'edgex':
+        bot = EdgexArb(ticker=tickers[0], **edgex_kwargs)
     elif args.exchange.lower() == 'extended':
         extended_api_key = os.getenv("EXTENDED_API_KEY")
         extended_private_key = os.getenv("EXTENDED_PRIVATE_KEY")
@@ -65,6 +110,7 @@ async def main():
             lighter_api_key=lighter_api_key,
             lighter_private_key=lighter_private_key,
             lighter_api_key_index=lighter_api_key_index,
+            lighter_account_index=int(os.getenv("LIGHTER_ACCOUNT_INDEX", 0)),
             ticker=args.ticker.upper(),
             size=args.size,
             fill_timeout=args.fill_timeout,
@@ -9,6 +9,8 @@ from dataclasses import dataclass
 from decimal import Decimal, ROUND_HALF_UP
 from tenacity import RetryCallState, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from .metrics import QUERY_FAILURES, QUERY_RETRIES
+
 
 def query_retry(
     default_return: Any = None,
@@ -18,7 +20,11 @@ def query_retry(
     max_wait: float = 10,
     reraise: bool = False
 ):
+    def before_sleep(retry_state: RetryCallState):
+        QUERY_RETRIES.inc(operation=retry_state.fn.__name__)
+
     def retry_error_callback(retry_state: RetryCallState):
+        QUERY_FAILURES.inc(operation=retry_state.fn.__name__)
         print(f"Operation: [{retry_state.fn.__name__}] failed after {retry_state.attempt_number} retries, "
               f"exception: {str(retry_state.outcome.exception())}")
         return default_return
@@ -27,6 +33,7 @@ def query_retry(
         stop=stop_after_attempt(max_attempts),
         wait=wait_exponential(multiplier=1, min=min_wait, max=max_wait),
         retry=retry_if_exception_type(exception_type),
+        before_sleep=before_sleep,
         retry_error_callback=retry_error_callback,
         reraise=reraise
     )
@@ -11,6 +11,10 @@ from typing import Dict, Any, List, Optional, Tuple
 from edgex_sdk import Client, OrderSide, WebSocketManager, CancelOrderParams, GetOrderBookDepthParams, GetActiveOrderParams
 
 from .base import BaseExchangeClient, OrderResult, OrderInfo, query_retry
+from .http_transport import HttpTransport
+from .market_metadata import MarketMetadataService
+from .metrics import POST_ONLY_RETRIES, WS_RECONNECTS
+from .ws_codec import BookUpdate, decode_edgex
 from helpers.logger import TradingLogger
 
 
@@ -49,6 +53,17 @@ class EdgeXClient(BaseExchangeClient):
 
         self._order_update_handler = None
 
+        # Local edgeX book fed by the public depth stream (see setup_depth_stream);
+        # order pricing falls back to REST when it is missing or older than book_max_age.
+        self.order_book_manager = None
+        self.book_max_age = 2.0
+        # Contract rules: the MarketMetadataService injected with set_metadata,
+        # otherwise a private one created on first use
+        self.metadata = None
+        self._owns_metadata = False
+        # Shared keep-alive pool for the SDK's REST calls (set_http_transport)
+        self.http_transport: Optional[HttpTransport] = None
+
         # --- reconnection state ---
         self._ws_task: Optional[asyncio.Task] = None
         self._ws_stop = asyncio.Event()
@@ -66,9 +81,19 @@ class EdgeXClient(BaseExchangeClient):
     # Connection / Reconnect
     # ---------------------------
 
+    def set_http_transport(self, transport: HttpTransport) -> None:
+        self.http_transport = transport
+
+    def set_metadata(self, metadata: MarketMetadataService) -> None:
+        """Use a metadata store shared with other clients; its owner closes it."""
+        self.metadata = metadata
+        self._owns_metadata = False
+
     async def connect(self) -> None:
         """Connect private WS and keep it alive with auto-reconnect."""
         self._loop = asyncio.get_running_loop()
+        if self.http_transport:
+            await self.http_transport.attach_edgex(self.client)
 
         # Hook disconnect/connect once (SDK calls these from threads)
         try:
@@ -111,6 +136,7 @@ class EdgeXClient(BaseExchangeClient):
                 self.logger.log(
                     "[WS] disconnected; attempting to reconnect…", "WARNING"
                 )
+                WS_RECONNECTS.inc(venue="edgex", stream="private")
             except Exception as e:
                 self.logger.log(f"[WS] connect error: {e}", "ERROR")
             finally:
@@ -140,7 +166,11 @@ class EdgeXClient(BaseExchangeClient):
             pass
 
         try:
+            if self.metadata and self._owns_metadata:
+                await self.metadata.close()
             if hasattr(self, "client") and self.client:
+                if self.http_transport:
+                    self.http_transport.detach_edgex(self.client)
                 await self.client.close()
             if hasattr(self, "ws_manager"):
                 self.ws_manager.disconnect_all()
@@ -228,10 +258,49 @@ class EdgeXClient(BaseExchangeClient):
         except Exception as e:
             self.logger.log(f"Could not add trade-event handler: {e}", "ERROR")
 
+    def setup_depth_stream(self, order_book_manager, depth: int = 15) -> None:
+        """Subscribe the public depth stream and keep ``order_book_manager``'s edgeX book current."""
+        self.order_book_manager = order_book_manager
+        loop = self._loop or asyncio.get_running_loop()
+
+        def apply_update(msg):
+            if msg.snapshot:
+                order_book_manager.apply_book_snapshot("edgex", msg.bids, msg.asks, msg.timestamp, msg.offset)
+            else:
+                order_book_manager.apply_book_delta("edgex", msg.bids, msg.asks, msg.timestamp, msg.offset)
+
+        def depth_handler(message):
+            # Runs on the SDK's WebSocket thread; the book is only touched on the loop
+            try:
+                msg = decode_edgex(message)
+                if isinstance(msg, BookUpdate):
+                    loop.call_soon_threadsafe(apply_update, msg)
+            except Exception as e:
+                self.logger.log(f"[WS] depth update error: {e}", "ERROR")
+
+        try:
+            public_client = self.ws_manager.get_public_client()
+            public_client.on_disconnect(
+                lambda exc: loop.call_soon_threadsafe(
+                    order_book_manager.mark_book_stale, "edgex", f"public stream disconnected: {exc}")
+            )
+            self.ws_manager.connect_public()
+            self.ws_manager.subscribe_depth(str(self.config.contract_id), depth_handler, depth=depth)
+        except Exception as e:
+            self.logger.log(f"[WS] failed to subscribe depth stream: {e}", "ERROR")
+
     # ---------------------------
     # REST-ish helpers
     # ---------------------------
 
+    async def get_bbo_prices(self, contract_id: str) -> Tuple[Decimal, Decimal]:
+        """Best bid/ask from the streamed book, REST depth only when the stream is down or stale."""
+        obm = self.order_book_manager
+        if (obm is not None and str(contract_id) == str(self.config.contract_id)
+                and obm.edgex_order_book_ready and obm.is_fresh(self.book_max_age, "edgex")):
+            return obm.get_edgex_bbo()
+        return await self.fetch_bbo_prices(contract_id)
+
     @query_retry(default_return=(0, 0))
     async def fetch_bbo_prices(self, contract_id: str) -> Tuple[Decimal, Decimal]:
         depth_params = GetOrderBookDepthParams(contract_id=contract_id, limit=15)
@@ -253,7 +322,7 @@ class EdgeXClient(BaseExchangeClient):
 
     async def get_order_price(self, direction: str) -> Decimal:
         """Get the price of an order with EdgeX using official SDK."""
-        best_bid, best_ask = await self.fetch_bbo_prices(self.config.contract_id)
+        best_bid, best_ask = await self.get_bbo_prices(self.config.contract_id)
         if best_bid <= 0 or best_ask <= 0:
             self.logger.log("Invalid bid/ask prices", "ERROR")
             raise ValueError("Invalid bid/ask prices")
@@ -274,7 +343,7 @@ class EdgeXClient(BaseExchangeClient):
 
         while retry_count < max_retries:
             try:
-                best_bid, best_ask = await self.fetch_bbo_prices(contract_id)
+                best_bid, best_ask = await self.get_bbo_prices(contract_id)
 
                 if best_bid <= 0 or best_ask <= 0:
                     return OrderResult(success=False, error_message='Invalid bid/ask prices')
@@ -313,6 +382,7 @@ class EdgeXClient(BaseExchangeClient):
                     if order_info.status == 'CANCELED':
                         if retry_count < max_retries - 1:
                             retry_count += 1
+                            POST_ONLY_RETRIES.inc(venue="edgex")
                             continue
                         else:
                             return OrderResult(success=False, error_message=f'Order rejected after {max_retries} attempts')
@@ -356,7 +426,7 @@ class EdgeXClient(BaseExchangeClient):
 
         while retry_count < max_retries:
             try:
-                best_bid, best_ask = await self.fetch_bbo_prices(contract_id)
+                best_bid, best_ask = await self.get_bbo_prices(contract_id)
 
                 if best_bid <= 0 or best_ask <= 0:
                     return OrderResult(success=False, error_message='Invalid bid/ask prices')
@@ -402,6 +472,7 @@ class EdgeXClient(BaseExchangeClient):
                     if order_info.status == 'CANCELED':
                         if retry_count < max_retries - 1:
                             retry_count += 1
+                            POST_ONLY_RETRIES.inc(venue="edgex")
                             continue
                         else:
                             return OrderResult(success=False, error_message=f'Close order rejected after {max_retries} attempts')
@@ -541,33 +612,23 @@ class EdgeXClient(BaseExchangeClient):
             self.logger.log("Ticker is empty", "ERROR")
             raise ValueError("Ticker is empty")
 
-        response = await self.client.get_metadata()
-        data = response.get('data', {})
-        if not data:
-            self.logger.log("Failed to get metadata", "ERROR")
-            raise ValueError("Failed to get metadata")
-
-        contract_list = data.get('contractList', [])
-        if not contract_list:
-            self.logger.log("Failed to get contract list", "ERROR")
-            raise ValueError("Failed to get contract list")
-
-        current_contract = None
-        for c in contract_list:
-            if c.get('contractName') == ticker+'USD':
-                current_contract = c
-                break
-
-        if not current_contract:
+        if self.metadata is None:
+            self.metadata = MarketMetadataService(
+                edgex_client=self.client,
+                session=self.http_transport.session if self.http_transport else None)
+            self._owns_metadata = True
+        try:
+            contract = await self.metadata.get_market("edgex", ticker)
+        except ValueError:
             self.logger.log("Failed to get contract ID for ticker", "ERROR")
-            raise ValueError("Failed to get contract ID for ticker")
+            raise
 
-        self.config.contract_id = current_contract.get('contractId')
-        min_quantity = Decimal(current_contract.get('minOrderSize'))
-        if self.config.quantity < min_quantity:
+        self.config.contract_id = contract.market_id
+        min_quantity = contract.min_size
+        if min_quantity is not None and self.config.quantity < min_quantity:
             self.logger.log(f"Order quantity is less than min quantity: {self.config.quantity} < {min_quantity}", "ERROR")
             raise ValueError(f"Order quantity is less than min quantity: {self.config.quantity} < {min_quantity}")
 
-        self.config.tick_size = Decimal(current_contract.get('tickSize'))
+        self.config.tick_size = contract.tick_size
 
         return self.config.contract_id, self.config.tick_size
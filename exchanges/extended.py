@@ -10,6 +10,8 @@ from starknet_py.net.signer.stark_curve_signer import StarkCurveSigner, KeyPair
 from starknet_py.net.models import StarknetChainId
 
 from .base import BaseExchangeClient, OrderResult, OrderInfo, query_retry
+from .http_transport import HttpTransport
+from .market_metadata import MarketMetadataService
 
 
 class ExtendedClient(BaseExchangeClient):
@@ -48,7 +50,14 @@ class ExtendedClient(BaseExchangeClient):
             self.signer = None
 
         self.base_url = "https://api.starknet.extended.exchange/v1"
+        self.headers = {"Content-Type": "application/json", "X-API-KEY": self.api_key}
         self.session = None
+        # Shared keep-alive pool (set_http_transport); otherwise connect() makes a private session
+        self.http_transport: Optional[HttpTransport] = None
+        # Market rules (tick/lot/min size) from the metadata store injected with
+        # set_metadata, otherwise a private one created on first use
+        self.metadata = None
+        self._owns_metadata = False
 
     def _validate_config(self) -> None:
         required = ["extended_api_key", "extended_vault", "extended_stark_key_private"]
@@ -56,16 +65,28 @@ class ExtendedClient(BaseExchangeClient):
         if missing:
             raise ValueError(f"Extended client config missing: {missing}")
 
+    def set_http_transport(self, transport: HttpTransport) -> None:
+        self.http_transport = transport
+
+    def set_metadata(self, metadata: MarketMetadataService) -> None:
+        """Use a metadata store shared with other clients; its owner closes it."""
+        self.metadata = metadata
+        self._owns_metadata = False
+
     async def connect(self) -> None:
         if not self.session:
-            self.session = aiohttp.ClientSession(
-                headers={"Content-Type": "application/json", "X-API-KEY": self.api_key}
-            )
+            if self.http_transport:
+                self.session = self.http_transport.session
+            else:
+                self.session = aiohttp.ClientSession()
             self.logger.info("Extended client session created")
 
     async def disconnect(self) -> None:
+        if self.metadata and self._owns_metadata:
+            await self.metadata.close()
         if self.session:
-            await self.session.close()
+            if not self.http_transport:
+                await self.session.close()
             self.session = None
 
     # ==========================================
@@ -102,7 +123,7 @@ class ExtendedClient(BaseExchangeClient):
 
         try:
             url = f"{self.base_url}/orders/{order_id}"
-            async with self.session.get(url) as response:
+            async with self.session.get(url, headers=self.headers) as response:
                 if response.status == 200:
                     return await response.json()
                 if response.status == 404:
@@ -124,7 +145,7 @@ class ExtendedClient(BaseExchangeClient):
 
         try:
             url = f"{self.base_url}/orders/{order_id}"
-            async with self.session.delete(url) as response:
+            async with self.session.delete(url, headers=self.headers) as response:
                 if response.status == 200:
                     return OrderResult(success=True, order_id=order_id)
 
@@ -142,8 +163,11 @@ class ExtendedClient(BaseExchangeClient):
     # ==========================================
 
     async def get_contract_attributes(self) -> Tuple[str, Decimal]:
-        contract_id = f"{self.ticker}-USD"
-        return contract_id, Decimal("0.1")
+        if self.metadata is None:
+            self.metadata = MarketMetadataService(session=self.session)
+            self._owns_metadata = True
+        market = await self.metadata.get_market("extended", self.ticker)
+        return market.market_id, market.tick_size
 
     async def place_open_order(
         self,
@@ -173,7 +197,7 @@ class ExtendedClient(BaseExchangeClient):
             self.logger.info(f"Placing order payload: {order_payload}")
 
             url = f"{self.base_url}/orders"
-            async with self.session.post(url, json=order_payload) as response:
+            async with self.session.post(url, json=order_payload, headers=self.headers) as response:
                 resp_json = await response.json()
 
                 if response.status in [200, 201]:
@@ -204,7 +228,7 @@ class ExtendedClient(BaseExchangeClient):
             await self.connect()
         try:
             url = f"{self.base_url}/account/{self.vault_id}/positions"
-            async with self.session.get(url) as response:
+            async with self.session.get(url, headers=self.headers) as response:
                 if response.status == 200:
                     data = await response.json()
                     for pos in data.get("positions", []):
@@ -0,0 +1,220 @@
+"""Shared HTTP transport: one pooled keep-alive connection pool for every exchange client in the process."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+import aiohttp
+
+
+class HttpTransport:
+    """One aiohttp session (and TCP connector) shared by all REST clients.
+
+    The connector keeps idle connections alive for ``keepalive_timeout``
+    seconds and caches DNS answers for ``dns_ttl`` seconds, so an order sent
+    right after a quote or position request reuses an open TLS connection
+    instead of paying for a new handshake. aiohttp sets TCP_NODELAY on every
+    connection it opens. HTTP/2 is not available in aiohttp; every venue
+    here serves HTTP/1.1 keep-alive.
+
+    The session is created lazily inside the running event loop. The edgeX
+    and Lighter SDKs are pointed at it with ``attach_edgex`` /
+    ``attach_lighter``; Extended and the metadata store take ``session``
+    directly. Only the owner of the transport closes it; SDK clients are
+    detached (``detach_edgex`` / ``detach_lighter``) before closing themselves.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 20, keepalive_timeout: float = 120.0,
+                 dns_ttl: int = 300, timeout: float = 10.0, logger=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self._session = None
+        # id(Lighter REST client) -> the pool it had before attach_lighter (see detach_lighter)
+        self._lighter_pools = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept": "application/json"},
+            )
+        return self._session
+
+    async def _replace(self, owner, attr, name):
+        """Point ``owner.attr`` at the shared session, closing the one the SDK made for itself."""
+        previous = getattr(owner, attr, None)
+        if previous is self._session and previous is not None:
+            return
+        if previous is not None and not previous.closed:
+            await previous.close()
+        setattr(owner, attr, self.session)
+        self.logger.info(f"✅ {name} REST client using the shared HTTP transport")
+
+    async def attach_edgex(self, client):
+        """Route an edgex_sdk Client's REST requests over the shared session."""
+        async_client = getattr(client, "async_client", None)
+        if async_client is None or not hasattr(async_client, "_session"):
+            self.logger.warning("⚠️ edgeX SDK session is not replaceable; it keeps its own connection pool")
+            return
+        await self._replace(async_client, "_session", "EdgeX")
+
+    def detach_edgex(self, client):
+        """Undo attach_edgex so that closing the SDK client leaves the shared session open."""
+        async_client = getattr(client, "async_client", None)
+        if async_client is not None and getattr(async_client, "_session", None) is self._session:
+            async_client._session = None
+
+    async def attach_lighter(self, signer_client):
+        """Route a Lighter SignerClient's REST requests (sendTx, nonces) over the shared session."""
+        rest_client = getattr(getattr(signer_client, "api_client", None), "rest_client", None)
+        if rest_client is None or not hasattr(rest_client, "pool_manager"):
+            self.logger.warning("⚠️ Lighter SDK session is not replaceable; it keeps its own connection pool")
+            return
+        previous = rest_client.pool_manager
+        if previous is self._session and previous is not None:
+            return
+        # The SDK's own pool stays open (unused) so detach_lighter can hand it back
+        self._lighter_pools[id(rest_client)] = previous
+        rest_client.pool_manager = self.session
+        self.logger.info("✅ Lighter REST client using the shared HTTP transport")
+
+    def detach_lighter(self, signer_client):
+        """Undo attach_lighter: restore the SDK's own pool, which closing the SignerClient then closes."""
+        rest_client = getattr(getattr(signer_client, "api_client", None), "rest_client", None)
+        if rest_client is not None and getattr(rest_client, "pool_manager", None) is self._session:
+            rest_client.pool_manager = self._lighter_pools.pop(id(rest_client), None)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+@dataclass
+class EndpointStats:
+    """Round-trip times of one warmed endpoint, in seconds."""
+    name: str
+    last_rtt: Optional[float] = None
+    avg_rtt: Optional[float] = None     # EWMA
+    min_rtt: Optional[float] = None
+    max_rtt: Optional[float] = None
+    pings: int = 0
+    failures: int = 0
+    last_ok: Optional[float] = None     # monotonic time of the last successful ping
+    last_error: str = ''
+
+    def record(self, rtt, alpha=0.2):
+        self.pings += 1
+        self.last_rtt = rtt
+        self.avg_rtt = rtt if self.avg_rtt is None else self.avg_rtt + alpha * (rtt - self.avg_rtt)
+        self.min_rtt = rtt if self.min_rtt is None else min(self.min_rtt, rtt)
+        self.max_rtt = rtt if self.max_rtt is None else max(self.max_rtt, rtt)
+        self.last_ok = time.monotonic()
+
+
+class ConnectionWarmer:
+    """Keeps the order-entry connections of each venue open with periodic cheap requests.
+
+    Every ``interval`` seconds each probe (an authenticated read such as a
+    positions query, sent on the same host and connection pool as the
+    orders) runs once. The interval stays below the pool's keep-alive
+    timeout and the venues' idle timeouts, so the first order after a quiet
+    stretch still finds an open TLS connection. Each probe's round-trip time
+    is recorded in ``stats`` and logged every ``report_interval`` seconds;
+    ``on_rtt(name, rtt, ok)`` is called after every probe.
+    """
+
+    def __init__(self, interval: float = 20.0, timeout: float = 5.0, report_interval: float = 300.0,
+                 logger=None):
+        self.interval = interval
+        self.timeout = timeout
+        self.report_interval = report_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.on_rtt = None
+        self.stats: Dict[str, EndpointStats] = {}
+        self._probes: Dict[str, Callable[[], Awaitable]] = {}
+        self._task = None
+
+    def add_probe(self, name: str, probe: Callable[[], Awaitable]):
+        """Warm ``name`` by awaiting ``probe()``; it raises on failure."""
+        self._probes[name] = probe
+        self.stats[name] = EndpointStats(name)
+
+    def add_url(self, name: str, session: aiohttp.ClientSession, url: str, headers=None):
+        """Warm ``name`` with a GET on ``url``."""
+        async def probe():
+            async with session.get(url, headers=headers) as response:
+                response.raise_for_status()
+                await response.read()
+        self.add_probe(name, probe)
+
+    async def _ping(self, name, probe):
+        stats = self.stats[name]
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.pings += 1
+            stats.failures += 1
+            stats.last_error = str(e) or type(e).__name__
+            self.logger.warning(f"⚠️ {name} keep-warm ping failed: {stats.last_error}")
+            ok, rtt = False, time.perf_counter() - start
+        else:
+            rtt = time.perf_counter() - start
+            stats.record(rtt)
+            ok = True
+        if self.on_rtt:
+            self.on_rtt(name, rtt, ok)
+
+    async def warm_all(self):
+        """Ping every endpoint once, concurrently (also opens the connections at startup)."""
+        await asyncio.gather(*(self._ping(name, probe) for name, probe in self._probes.items()))
+
+    def report(self):
+        for stats in self.stats.values():
+            if stats.avg_rtt is None:
+                self.logger.info(f"📶 {stats.name}: no successful ping ({stats.failures} failed)")
+                continue
+            self.logger.info(
+                f"📶 {stats.name} RTT ms: last {stats.last_rtt * 1000:.1f}, avg {stats.avg_rtt * 1000:.1f}, "
+                f"min {stats.min_rtt * 1000:.1f}, max {stats.max_rtt * 1000:.1f} "
+                f"({stats.failures}/{stats.pings} failed)")
+
+    def start(self):
+        """Ping now, then every ``interval`` seconds in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        last_report = time.monotonic()
+        while True:
+            await self.warm_all()
+            if time.monotonic() - last_report >= self.report_interval:
+                last_report = time.monotonic()
+                self.report()
+            await asyncio.sleep(self.interval)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,9 +1,42 @@
 import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
 from lighter.signer_client import SignerClient
 from lighter.constants import ORDER_TYPE_LIMIT, ORDER_SIDE_BUY, ORDER_SIDE_SELL
 
 from exchanges.base import OrderResult
 
+
+@dataclass
+class PreparedOrder:
+    """A signed-but-unsent Lighter order."""
+    side: str
+    base_amount: int
+    price: int
+    client_order_index: int
+    api_key_index: int
+    nonce: int
+    tx_info: str
+
+
+@dataclass
+class PreparedHedge:
+    """Pre-signed buy and sell hedge orders sharing one reserved nonce.
+
+    Only one of the two is ever sent, so a single nonce is reserved for the pair.
+    """
+    market_index: int
+    buy: Optional[PreparedOrder]
+    sell: Optional[PreparedOrder]
+    api_key_index: int
+    nonce: int
+    used: bool = False
+
+    def get(self, side: str) -> Optional[PreparedOrder]:
+        return self.buy if side.lower() == 'buy' else self.sell
+
+
 class LighterClient:
     def __init__(self, api_key, private_key, api_key_index, logger=None, account_index=0):
         self.logger = logger or logging.getLogger(__name__)
@@ -15,13 +48,69 @@ class LighterClient:
             account_index=int(account_index),
             api_key_index=int(api_key_index),
         )
+        self.account_index = int(account_index)
+        self.api_key_index = int(api_key_index)
+        # API keys whose nonce counter must be reloaded from the server before the next order
+        self._nonce_resync = set()
+        # Last client order index handed out (see new_client_order_index)
+        self._last_client_order_index = 0
         self.logger.info("Lighter client initialized")
 
+    def create_auth_token(self):
+        """Auth token for private WebSocket channels; returns (token, error)."""
+        return self.client.create_auth_token_with_expiry()
+
     async def get_order_book(self, market_id):
         pass
 
+    async def ping(self):
+        """Keep-warm request through the SDK's REST client, i.e. the same host and
+        connection pool as sendTx (the next-nonce lookup the SDK itself makes)."""
+        await self.client.tx_api.next_nonce(account_index=self.account_index,
+                                            api_key_index=self.api_key_index)
+
+    async def close(self):
+        """Close the SDK's REST client; detach it from a shared HttpTransport first."""
+        await self.client.close()
+
+    def new_client_order_index(self) -> int:
+        """Client order index unique for this client: the millisecond clock * 100,
+        bumped past the previous index so orders in the same millisecond never collide."""
+        index = max(int(time.time() * 1000) * 100, self._last_client_order_index + 1)
+        self._last_client_order_index = index
+        return index
+
+    # --- Nonces ---
+
+    def _release_nonce(self, api_key_index, nonce):
+        """Give back an issued but unused ``nonce``.
+
+        The SDK's acknowledge_failure only decrements the counter, which is
+        correct while ``nonce`` is still the latest one handed out. If a newer
+        nonce was issued meanwhile (another order signed concurrently),
+        decrementing would hand that newer nonce out twice, so the counter is
+        resynced from the server before the next order instead.
+        """
+        manager = self.client.nonce_manager
+        if getattr(manager, 'nonce', {}).get(api_key_index) == nonce:
+            manager.acknowledge_failure(api_key_index)
+        else:
+            self._nonce_resync.add(api_key_index)
+
+    async def _resync_nonces(self):
+        while self._nonce_resync:
+            api_key_index = self._nonce_resync.pop()
+            try:
+                await self.client.nonce_manager.async_hard_refresh_nonce(api_key_index)
+                self.logger.info(f"Lighter nonce resynced for API key {api_key_index}")
+            except Exception as e:
+                self._nonce_resync.add(api_key_index)
+                self.logger.error(f"Lighter nonce resync failed: {e}")
+                return
+
     async def place_order(self, market_id, side, size, price, order_type='limit'):
         try:
+            await self._resync_nonces()
             l_side = ORDER_SIDE_BUY if side.lower() == 'buy' else ORDER_SIDE_SELL
             
             order = await self.client.create_limit_order(
@@ -51,3 +140,109 @@ class LighterClient:
 
     async def place_limit_order(self, contract_id, quantity, price, side):
         return await self.place_order(contract_id, side, quantity, price)
+
+    async def place_ioc_order(self, market_index, side: str, base_amount: int, price: int,
+                              client_order_index: int) -> OrderResult:
+        """Sign and send an IOC order with the caller's ``client_order_index``.
+
+        Amount and price are in Lighter integer units; the order id returned is
+        the client order index, which the account_orders stream echoes back.
+        """
+        await self._resync_nonces()
+        api_key_index, nonce = self.client.nonce_manager.next_nonce()
+        try:
+            tx_info, error = self.client.sign_create_order(
+                market_index=int(market_index),
+                client_order_index=int(client_order_index),
+                base_amount=int(base_amount),
+                price=int(price),
+                is_ask=side.lower() == 'sell',
+                order_type=self.client.ORDER_TYPE_LIMIT,
+                time_in_force=self.client.ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL,
+                reduce_only=False,
+                trigger_price=0,
+                order_expiry=self.client.DEFAULT_IOC_EXPIRY,
+                nonce=nonce,
+            )
+            if error is not None:
+                raise Exception(error)
+            res = await self.client.send_tx(tx_type=self.client.TX_TYPE_CREATE_ORDER, tx_info=tx_info)
+            if getattr(res, 'code', 200) != 200:
+                self._release_nonce(api_key_index, nonce)
+                return OrderResult(success=False, error_message=str(res))
+            self.logger.info(f"Lighter IOC Order Sent: {res}")
+            return OrderResult(success=True, order_id=str(client_order_index), side=side)
+        except Exception as e:
+            self.logger.error(f"Lighter IOC Order Error: {e}")
+            self._release_nonce(api_key_index, nonce)
+            return OrderResult(success=False, error_message=str(e))
+
+    # --- Pre-signed hedge orders ---
+
+    def prepare_hedge_orders(self, market_index, base_amount: int,
+                             buy_price: int, sell_price: int) -> Optional[PreparedHedge]:
+        """Sign an IOC buy and an IOC sell of ``base_amount`` ahead of time.
+
+        Amounts and prices are already scaled to Lighter integer units. Returns
+        None if signing fails (the reserved nonce is released in that case) or
+        while a nonce resync is pending.
+        """
+        if self._nonce_resync:
+            return None
+        api_key_index, nonce = self.client.nonce_manager.next_nonce()
+        client_order_index = self.new_client_order_index()
+        orders = {}
+        try:
+            for side, price in (('buy', buy_price), ('sell', sell_price)):
+                tx_info, error = self.client.sign_create_order(
+                    market_index=int(market_index),
+                    client_order_index=client_order_index,
+                    base_amount=int(base_amount),
+                    price=int(price),
+                    is_ask=side == 'sell',
+                    order_type=self.client.ORDER_TYPE_LIMIT,
+                    time_in_force=self.client.ORDER_TIME_IN_FORCE_IMMEDIATE_OR_CANCEL,
+                    reduce_only=False,
+                    trigger_price=0,
+                    order_expiry=self.client.DEFAULT_IOC_EXPIRY,
+                    nonce=nonce,
+                )
+                if error is not None:
+                    raise Exception(error)
+                orders[side] = PreparedOrder(side, int(base_amount), int(price), client_order_index,
+                                             api_key_index, nonce, tx_info)
+        except Exception as e:
+            self.logger.error(f"Lighter Prepare Order Error: {e}")
+            self._release_nonce(api_key_index, nonce)
+            return None
+
+        return PreparedHedge(int(market_index), orders['buy'], orders['sell'], api_key_index, nonce)
+
+    async def send_prepared_order(self, prepared: PreparedHedge, side: str) -> OrderResult:
+        """Send the pre-signed ``side`` order of ``prepared``; consumes its nonce."""
+        order = prepared.get(side)
+        if prepared.used or order is None:
+            return OrderResult(success=False, error_message='Prepared order unavailable')
+        prepared.used = True
+        try:
+            res = await self.client.send_tx(tx_type=self.client.TX_TYPE_CREATE_ORDER, tx_info=order.tx_info)
+            if getattr(res, 'code', 200) != 200:
+                self._release_nonce(prepared.api_key_index, prepared.nonce)
+                return OrderResult(success=False, error_message=str(res))
+            self.logger.info(f"Lighter Prepared Order Sent: {res}")
+            return OrderResult(success=True, order_id=str(order.client_order_index), side=side)
+        except Exception as e:
+            self.logger.error(f"Lighter Send Prepared Order Error: {e}")
+            self._release_nonce(prepared.api_key_index, prepared.nonce)
+            return OrderResult(success=False, error_message=str(e))
+
+    def release_prepared_orders(self, prepared: Optional[PreparedHedge]):
+        """Give back the nonce of a prepared pair that will never be sent.
+
+        The counter is only rolled back while the pair's nonce is still the
+        latest issued; otherwise the next order resyncs it (see _release_nonce).
+        """
+        if prepared is None or prepared.used:
+            return
+        prepared.used = True
+        self._release_nonce(prepared.api_key_index, prepared.nonce)
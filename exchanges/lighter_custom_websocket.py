@@ -1,86 +1,386 @@
-import json
 import logging
 import asyncio
+import random
+import time
 import websockets
 
+from .metrics import WS_RECONNECTS
+from .ws_codec import BookUpdate, ControlMessage, OrderEvent, decode_lighter, dumps, loads
+
+class LighterMarketFeed:
+    """Book and order-update routing plus sequence state for one market on the shared stream."""
+
+    def __init__(self, market_index, order_book_manager=None, on_order_update=None):
+        self.market_index = market_index
+        self.order_book_manager = order_book_manager
+        self.on_order_update = on_order_update
+
+        # 订单簿序列跟踪: 增量消息的 begin_nonce 必须等于上一条的 nonce, offset 必须递增
+        self.last_offset = None
+        self.last_nonce = None
+        self.resync_reason = None      # 非 None 时由接收循环触发重新订阅
+        self.resyncing_since = None    # 正在等待重新订阅后的快照
+        self.resync_count = 0
+
+    @property
+    def book_channel(self):
+        return f"order_book/{self.market_index}"
+
+    def reset_sequence(self):
+        self.last_offset = None
+        self.last_nonce = None
+        self.resync_reason = None
+        self.resyncing_since = None
+
+    def mark_stale(self, reason):
+        if self.order_book_manager:
+            self.order_book_manager.mark_book_stale("lighter", reason)
+
+
 class LighterCustomWebSocketManager:
+    """One Lighter stream connection carrying the order book (and own orders) of one or more markets.
+
+    The single-market constructor keeps its old behaviour; further markets are
+    added with ``add_market`` and share the connection, reconnect loop and auth.
+    """
+    # 备选地址列表，解决 DNS 解析问题; 连接失败时依次切换
+    DEFAULT_URLS = [
+        "wss://mainnet.zklighter.elliot.ai/stream",
+        "wss://api.lighter.xyz/v1/stream"
+    ]
+
     def __init__(self, config, on_order_update=None, order_book_manager=None):
         self.config = config
-        self.on_order_update = on_order_update
-        self.order_book_manager = order_book_manager
         self.logger = logging.getLogger(__name__)
         self.ws = None
         self.stop_flag = False
-        # 从配置获取 market_id，默认为 1 (BTC-USD)
-        self.market_index = getattr(config, 'contract_id', 1) 
+        # 快照最多保留的档位数 (None 表示全部)
+        self.book_depth = getattr(config, 'book_depth', None)
+        self.resync_timeout = getattr(config, 'resync_timeout', 5)
+
+        # market_index -> LighterMarketFeed
+        self.markets = {}
+        self._auth_token = None
+        if not getattr(config, 'multi_market', False):
+            # 从配置获取 market_id，默认为 1 (BTC-USD)
+            market_index = getattr(config, 'contract_id', None)
+            self.add_market(1 if market_index is None else market_index,
+                            order_book_manager, on_order_update)
+
+        # 重连: 带随机抖动的指数退避 + 多地址切换
+        self.urls = list(getattr(config, 'ws_urls', None) or self.DEFAULT_URLS)
+        self.url_index = 0
+        self.backoff_initial = 0.5
+        self.backoff_max = 30.0
+        # 超过该时间未收到任何消息 (包括 ping) 视为连接已死
+        self.idle_timeout = getattr(config, 'idle_timeout', 20)
+        self._pong_due = False
+        self.metrics = {
+            "connects": 0,
+            "reconnects": 0,
+            "disconnects": 0,
+            "connect_failures": 0,
+            "url": None,
+            "connected": False,
+            "last_disconnect_at": None,
+            "last_reconnect_seconds": None,
+            "max_reconnect_seconds": 0.0,
+            "total_downtime_seconds": 0.0,
+            "book_resyncs": 0,
+        }
+
+    @property
+    def _default_feed(self):
+        return next(iter(self.markets.values()), None)
+
+    @property
+    def market_index(self):
+        feed = self._default_feed
+        return feed.market_index if feed else None
+
+    @property
+    def resync_count(self):
+        return sum(feed.resync_count for feed in self.markets.values())
+
+    def add_market(self, market_index, order_book_manager=None, on_order_update=None):
+        """Route ``market_index`` book/order updates to the given manager and callback.
+
+        If the stream is already connected the market is subscribed right away.
+        """
+        feed = LighterMarketFeed(market_index, order_book_manager, on_order_update)
+        self.markets[market_index] = feed
+        if self.ws is not None:
+            asyncio.ensure_future(self._subscribe_market(self.ws, feed))
+        return feed
+
+    def remove_market(self, market_index):
+        feed = self.markets.pop(market_index, None)
+        if feed is not None and feed.order_book_manager and self.ws is not None:
+            asyncio.ensure_future(self._send(self.ws, {"type": "unsubscribe", "channel": feed.book_channel}))
+
+    def get_metrics(self):
+        """Snapshot of connection metrics (reconnect counts, time-to-reconnect, downtime)."""
+        metrics = dict(self.metrics)
+        metrics["book_resyncs"] = self.resync_count
+        if len(self.markets) > 1:
+            metrics["markets"] = {idx: {"book_resyncs": feed.resync_count}
+                                  for idx, feed in self.markets.items()}
+        if not metrics["connected"] and metrics["last_disconnect_at"] is not None:
+            metrics["current_downtime_seconds"] = time.monotonic() - metrics["last_disconnect_at"]
+        return metrics
 
     def set_logger(self, logger):
         self.logger = logger
         
     def set_order_book_manager(self, manager):
-        self.order_book_manager = manager
+        feed = self._default_feed
+        if feed is not None:
+            feed.order_book_manager = manager
 
     async def connect(self):
-        # 备选地址列表，解决 DNS 解析问题
-        urls = [
-            "wss://mainnet.zklighter.elliot.ai/stream",
-            "wss://api.lighter.xyz/v1/stream"
-        ]
-        
-        for url in urls:
-            if self.stop_flag: break
+        """Keep the stream connected until disconnect(): reconnects with jittered backoff."""
+        backoff = self.backoff_initial
+        while not self.stop_flag:
+            url = self.urls[self.url_index]
             try:
                 self.logger.info(f"Connecting to Lighter: {url}")
-                async with websockets.connect(url, open_timeout=5) as ws:
+                async with websockets.connect(url, open_timeout=5, ping_interval=10,
+                                              ping_timeout=10, close_timeout=2) as ws:
                     self.ws = ws
-                    self.logger.info(f"✅ Connected to Lighter Stream")
-                    
-                    sub_msg = {"type": "subscribe", "channel": "order_book/1"}
-                    await ws.send(json.dumps(sub_msg))
-                    
-                    async for message in ws:
-                        if self.stop_flag: break
-                        try:
-                            self._parse_message(message)
-                        except Exception:
-                            pass
-                return 
+                    self._on_connected(url)
+                    backoff = self.backoff_initial
+
+                    self._auth_token = None
+                    for feed in list(self.markets.values()):
+                        await self._subscribe_market(ws, feed)
+                    await self._receive_loop(ws)
+                if self.stop_flag:
+                    break
+                self.logger.warning("Lighter WS closed; reconnecting…")
+            except Exception as e:
+                self.logger.error(f"Lighter WS Error ({url}): {e}")
+                if not self.metrics["connected"]:
+                    # 连接未建立: 切换到下一个地址
+                    self.metrics["connect_failures"] += 1
+                    self.url_index = (self.url_index + 1) % len(self.urls)
+            finally:
+                self.ws = None
+                self._on_disconnected()
+
+            if self.stop_flag:
+                break
+            # 全抖动避免多个实例同时重连
+            await asyncio.sleep(random.uniform(backoff / 2, backoff))
+            backoff = min(self.backoff_max, backoff * 2)
+
+    async def _receive_loop(self, ws):
+        while not self.stop_flag:
+            try:
+                message = await asyncio.wait_for(ws.recv(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                raise ConnectionError(f"no message for {self.idle_timeout}s")
+            self._parse_message(message)
+            if self._pong_due:
+                self._pong_due = False
+                await ws.send(dumps({"type": "pong"}))
+            for feed in list(self.markets.values()):
+                if feed.resync_reason is None and feed.resyncing_since is not None and \
+                        time.monotonic() - feed.resyncing_since > self.resync_timeout:
+                    feed.resync_reason = "snapshot not received after resubscribe"
+                if feed.resync_reason is not None:
+                    await self._resync(ws, feed)
+
+    def _on_connected(self, url):
+        metrics = self.metrics
+        now = time.monotonic()
+        if metrics["last_disconnect_at"] is not None:
+            downtime = now - metrics["last_disconnect_at"]
+            metrics["reconnects"] += 1
+            metrics["last_reconnect_seconds"] = downtime
+            metrics["max_reconnect_seconds"] = max(metrics["max_reconnect_seconds"], downtime)
+            metrics["total_downtime_seconds"] += downtime
+            WS_RECONNECTS.inc(venue="lighter", stream="main")
+            self.logger.info(f"✅ Reconnected to Lighter Stream ({url}) after {downtime:.2f}s")
+        else:
+            self.logger.info(f"✅ Connected to Lighter Stream ({url})")
+        metrics["connects"] += 1
+        metrics["connected"] = True
+        metrics["url"] = url
+
+    def _on_disconnected(self):
+        metrics = self.metrics
+        if metrics["connected"]:
+            metrics["connected"] = False
+            metrics["disconnects"] += 1
+            metrics["last_disconnect_at"] = time.monotonic()
+        if not self.stop_flag:
+            for feed in self.markets.values():
+                feed.mark_stale("connection lost")
+
+    async def _send(self, ws, payload):
+        try:
+            await ws.send(dumps(payload))
+        except Exception as e:
+            self.logger.error(f"Lighter WS send error: {e}")
+
+    async def _subscribe_market(self, ws, feed):
+        feed.reset_sequence()
+        if feed.order_book_manager:
+            await ws.send(dumps({"type": "subscribe", "channel": feed.book_channel}))
+        await self._subscribe_account_orders(ws, feed)
+
+    def _request_resync(self, feed, reason):
+        """Mark the book stale and let the receive loop resubscribe for a fresh snapshot."""
+        if feed.resync_reason is None and feed.resyncing_since is None:
+            feed.resync_reason = reason
+        feed.mark_stale(reason)
+
+    async def _resync(self, ws, feed):
+        """Unsubscribe/resubscribe the book channel; the server answers with a full snapshot."""
+        reason = feed.resync_reason
+        feed.resync_reason = None
+        feed.resync_count += 1
+        self.logger.warning(f"Lighter order book resync #{feed.resync_count} "
+                            f"(market {feed.market_index}): {reason}")
+        feed.last_offset = None
+        feed.last_nonce = None
+        feed.resyncing_since = time.monotonic()
+        await ws.send(dumps({"type": "unsubscribe", "channel": feed.book_channel}))
+        await ws.send(dumps({"type": "subscribe", "channel": feed.book_channel}))
+
+    def _check_sequence(self, feed, msg):
+        """Return True if ``msg`` continues the stream, False if it must be dropped.
+
+        Snapshots restart the sequence. A delta whose begin_nonce does not match
+        the previous nonce, or whose offset goes backwards, means updates were
+        lost or reordered and the book is resynced.
+        """
+        if msg.snapshot:
+            feed.last_offset = msg.offset
+            feed.last_nonce = msg.nonce
+            feed.resyncing_since = None
+            return True
+
+        if feed.resyncing_since is not None or (feed.last_offset is None and feed.last_nonce is None):
+            # 尚未收到 (重新订阅后的) 快照, 增量无法应用
+            return False
+
+        if msg.offset is not None and feed.last_offset is not None:
+            if msg.offset == feed.last_offset:
+                return False  # 重复消息
+            if msg.offset < feed.last_offset:
+                self._request_resync(feed, f"out-of-order offset {msg.offset} after {feed.last_offset}")
+                return False
+
+        if msg.begin_nonce is not None and feed.last_nonce is not None and msg.begin_nonce != feed.last_nonce:
+            self._request_resync(feed, f"nonce gap: begin_nonce {msg.begin_nonce} != last nonce {feed.last_nonce}")
+            return False
+
+        if msg.offset is not None:
+            feed.last_offset = msg.offset
+        if msg.nonce is not None:
+            feed.last_nonce = msg.nonce
+        return True
+
+    async def _subscribe_account_orders(self, ws, feed):
+        """Subscribe to our own order updates (used to detect hedge fills)."""
+        client = getattr(self.config, 'lighter_client', None)
+        account_index = getattr(self.config, 'account_index', None)
+        if client is None or account_index is None or not feed.on_order_update:
+            return
+        try:
+            # 同一连接上的各市场共用一个认证 token
+            if self._auth_token is None:
+                auth_token, err = client.create_auth_token()
+                if err is not None:
+                    self.logger.error(f"Lighter auth token error: {err}")
+                    return
+                self._auth_token = auth_token
+            await ws.send(dumps({
+                "type": "subscribe",
+                "channel": f"account_orders/{feed.market_index}/{account_index}",
+                "auth": self._auth_token,
+            }))
+        except Exception as e:
+            self.logger.error(f"Lighter account orders subscribe error: {e}")
+
+    def _feed_for(self, market):
+        if market is not None:
+            return self.markets.get(market)
+        # 未带市场标识的消息只有单市场时才能确定归属
+        return self._default_feed if len(self.markets) == 1 else None
+
+    def _handle_account_orders(self, orders):
+        by_feed = {}
+        for order in orders:
+            order["status"] = str(order.get("status", "")).upper()
+            order.setdefault("client_order_id", order.get("client_order_index"))
+            feed = self._feed_for(order.get("market_index"))
+            if feed is not None and feed.on_order_update:
+                by_feed.setdefault(feed.market_index, (feed, []))[1].append(order)
+        for feed, feed_orders in by_feed.values():
+            try:
+                feed.on_order_update(feed_orders)
             except Exception as e:
-                self.logger.error(f"Lighter WS Error: {e}")
-                await asyncio.sleep(1)
+                self.logger.error(f"Lighter order update handler error (market {feed.market_index}): {e}")
+
+    def _book_feed_for_frame(self, message):
+        """Feed of a frame that failed to decode, if it is a book update for a known market."""
+        try:
+            data = loads(message) if isinstance(message, (str, bytes)) else message
+            if not isinstance(data, dict) or 'order_book' not in str(data.get('type', '')):
+                return None
+            channel = str(data.get('channel') or '').replace('/', ':').rpartition(':')[2]
+            return self._feed_for(int(channel) if channel.isdigit() else None)
+        except Exception:
+            return None
 
     def _parse_message(self, message):
+        feed = None
         try:
-            data = json.loads(message)
-            # 兼容多种数据结构
-            payload = {}
-            if "order_book" in data:
-                payload = data["order_book"]
-            elif "bids" in data:
-                payload = data
-            elif "data" in data:
-                payload = data["data"]
-
-            bids = payload.get('bids', [])
-            asks = payload.get('asks', [])
-
-            if self.order_book_manager and (bids or asks):
-                # 提取最优价格
-                bb = self._extract_price(bids[0]) if bids else None
-                ba = self._extract_price(asks[0]) if asks else None
-                
-                if bb and ba:
-                    self.order_book_manager.update_lighter_bbo(bb, ba)
-        except:
-            pass
-
-    def _extract_price(self, item):
-        # 兼容字典 {'price': '100', ...} 或 列表 ['100', '1']
-        if isinstance(item, dict):
-            return item.get('price') or item.get('p')
-        if isinstance(item, (list, tuple)):
-            return item[0]
-        return item
+            try:
+                msg = decode_lighter(message, depth=self.book_depth)
+            except Exception:
+                feed = self._book_feed_for_frame(message)
+                raise
+
+            if isinstance(msg, ControlMessage):
+                if msg.type == "ping":
+                    self._pong_due = True
+                return
+
+            if isinstance(msg, OrderEvent):
+                try:
+                    self._handle_account_orders(msg.orders)
+                except Exception as e:
+                    self.logger.error(f"Lighter order update handler error: {e}")
+                return
+
+            if isinstance(msg, BookUpdate):
+                feed = self._feed_for(msg.market)
+                if feed is None or not feed.order_book_manager:
+                    return
+                if not self._check_sequence(feed, msg):
+                    return
+                # 首条订阅消息为全量快照，之后为增量更新 (size 为 0 表示删除档位)
+                if msg.snapshot:
+                    feed.order_book_manager.apply_book_snapshot(
+                        "lighter", msg.bids, msg.asks, msg.timestamp, msg.offset)
+                else:
+                    # 空增量也会刷新接收时间, 表明连接和订单簿仍然是最新的
+                    feed.order_book_manager.apply_book_delta(
+                        "lighter", msg.bids, msg.asks, msg.timestamp, msg.offset)
+        except Exception as e:
+            self.logger.error(f"Lighter WS message error: {e}")
+            # 只有确认属于某个已订阅市场的订单簿消息才会让该市场的盘口失效;
+            # 其他无法解析的消息记录后跳过
+            if feed is not None and feed.order_book_manager:
+                self._request_resync(feed, f"failed to process message: {e}")
 
     def disconnect(self):
         self.stop_flag = True
+        if self.ws is not None:
+            try:
+                asyncio.ensure_future(self.ws.close())
+            except Exception:
+                pass
@@ -0,0 +1,266 @@
+"""Local market metadata store for Lighter, edgeX and Extended, with a persistent disk cache."""
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+LIGHTER_BASE_URL = "https://mainnet.zklighter.elliot.ai"
+EXTENDED_BASE_URL = "https://api.starknet.extended.exchange"
+
+
+def _decimals_of(increment) -> int:
+    exponent = Decimal(str(increment)).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+def _optional_decimal(value):
+    return Decimal(str(value)) if value not in (None, "") else None
+
+
+@dataclass(frozen=True)
+class MarketInfo:
+    """Trading rules of one market on one venue."""
+    venue: str
+    symbol: str                     # base asset, e.g. BTC
+    market_id: Any                  # Lighter market index, edgeX contract id, Extended market name
+    tick_size: Decimal
+    lot_size: Optional[Decimal]
+    min_size: Optional[Decimal]
+    price_decimals: int
+    size_decimals: int
+    raw: Dict[str, Any] = field(default=None, compare=False, repr=False)
+
+
+def _lighter_market(market) -> MarketInfo:
+    price_decimals = market["supported_price_decimals"]
+    size_decimals = market["supported_size_decimals"]
+    return MarketInfo(
+        venue="lighter", symbol=market["symbol"], market_id=market["market_id"],
+        tick_size=Decimal(1).scaleb(-price_decimals), lot_size=Decimal(1).scaleb(-size_decimals),
+        min_size=_optional_decimal(market.get("min_base_amount")),
+        price_decimals=price_decimals, size_decimals=size_decimals, raw=market)
+
+
+def _edgex_market(contract) -> MarketInfo:
+    name = contract.get("contractName", "")
+    tick_size = Decimal(contract.get("tickSize"))
+    lot_size = _optional_decimal(contract.get("stepSize"))
+    return MarketInfo(
+        venue="edgex", symbol=name[:-3] if name.endswith("USD") else name,
+        market_id=contract.get("contractId"),
+        tick_size=tick_size, lot_size=lot_size,
+        min_size=_optional_decimal(contract.get("minOrderSize")),
+        price_decimals=_decimals_of(tick_size),
+        size_decimals=_decimals_of(lot_size) if lot_size else 0, raw=contract)
+
+
+def _extended_market(market) -> MarketInfo:
+    name = market.get("name", "")
+    config = market.get("tradingConfig") or {}
+    tick_size = Decimal(str(config.get("minPriceChange")))
+    lot_size = _optional_decimal(config.get("minOrderSizeChange"))
+    return MarketInfo(
+        venue="extended", symbol=name.split("-")[0], market_id=name,
+        tick_size=tick_size, lot_size=lot_size,
+        min_size=_optional_decimal(config.get("minOrderSize")),
+        price_decimals=_decimals_of(tick_size),
+        size_decimals=_decimals_of(lot_size) if lot_size else 0, raw=market)
+
+
+_NORMALIZERS = {"lighter": _lighter_market, "edgex": _edgex_market, "extended": _extended_market}
+
+
+class MarketMetadataService:
+    """Tick/lot/min sizes, decimals and market ids of every venue, indexed by symbol.
+
+    Each venue's market list is kept in ``cache_dir`` as JSON and loaded from
+    there first, so a restart does not wait on the network: an entry younger
+    than ``ttl`` is used as is, an older one is used immediately while a
+    background refresh replaces it, and only a missing entry (or one older
+    than ``max_age``) is fetched before returning. Lighter and Extended are
+    fetched over one pooled aiohttp session, edgeX through the SDK client.
+    Concurrent callers share one in-flight fetch per venue.
+    """
+
+    VENUES = tuple(_NORMALIZERS)
+
+    def __init__(self, lighter_base_url: str = LIGHTER_BASE_URL, edgex_client=None,
+                 cache_dir: str = "cache", ttl: float = 3600, max_age: float = 7 * 86400,
+                 logger=None, session: aiohttp.ClientSession = None,
+                 extended_base_url: str = EXTENDED_BASE_URL):
+        self.lighter_base_url = lighter_base_url
+        self.extended_base_url = extended_base_url
+        self.edgex_client = edgex_client
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_age = max_age
+        self.logger = logger or logging.getLogger(__name__)
+        self.session = session
+        self._owns_session = session is None
+
+        self._fetchers = {"lighter": self._fetch_lighter, "edgex": self._fetch_edgex,
+                          "extended": self._fetch_extended}
+        # venue -> fetched_at, venue -> {symbol: MarketInfo}
+        self._fetched_at: Dict[str, float] = {}
+        self._index: Dict[str, Dict[str, MarketInfo]] = {}
+        self._locks = {venue: asyncio.Lock() for venue in self.VENUES}
+        self._background = {}
+        self._refresh_task = None
+
+    # --- Lookup ---
+
+    def lookup(self, venue: str, symbol: str) -> Optional[MarketInfo]:
+        """O(1) lookup in what is already loaded; None if unknown."""
+        return self._index.get(venue, {}).get(symbol)
+
+    async def get_market(self, venue: str, symbol: str) -> MarketInfo:
+        """Market info for ``symbol`` (base asset, e.g. BTC), loading ``venue`` if needed."""
+        await self._ensure(venue)
+        info = self.lookup(venue, symbol)
+        if info is None:
+            raise ValueError(f"{venue}: market for ticker {symbol} not found")
+        return info
+
+    async def load(self, *venues):
+        """Load several venues concurrently (all of them by default)."""
+        await asyncio.gather(*(self._ensure(venue) for venue in venues or self.VENUES))
+
+    def start_refresh(self, interval: float = None, venues=None):
+        """Refresh ``venues`` (default: those loaded) in the background every ``interval`` seconds."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop(interval or self.ttl, venues))
+
+    async def close(self):
+        for task in [self._refresh_task, *self._background.values()]:
+            if task:
+                task.cancel()
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # --- Cache ---
+
+    def _cache_path(self, venue):
+        return os.path.join(self.cache_dir, f"{venue}_metadata.json")
+
+    def _read_cache_file(self, venue):
+        try:
+            with open(self._cache_path(venue)) as f:
+                entry = json.load(f)
+            return entry["fetched_at"], entry["data"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache_file(self, venue, fetched_at, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(venue)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": fetched_at, "data": data}, f)
+        os.replace(tmp, path)
+
+    def _install(self, venue, fetched_at, data):
+        normalize = _NORMALIZERS[venue]
+        index = {}
+        for entry in data:
+            try:
+                info = normalize(entry)
+            except Exception:
+                continue  # market without usable trading rules
+            index[info.symbol] = info
+        self._index[venue] = index
+        self._fetched_at[venue] = fetched_at
+
+    async def _ensure(self, venue):
+        async with self._locks[venue]:
+            if venue not in self._index:
+                cached = await asyncio.get_running_loop().run_in_executor(None, self._read_cache_file, venue)
+                if cached is not None:
+                    self._install(venue, *cached)
+
+            age = time.time() - self._fetched_at[venue] if venue in self._fetched_at else None
+            if age is not None and age < self.ttl:
+                return
+            if age is not None and age < self.max_age:
+                # Warm start: serve the cached copy now, refresh behind it
+                self._refresh_in_background(venue)
+                return
+            try:
+                await self._refresh_locked(venue)
+            except Exception as e:
+                if venue not in self._index:
+                    raise
+                self.logger.warning(f"⚠️ {venue} metadata refresh failed, using cached copy: {e}")
+
+    def _refresh_in_background(self, venue):
+        task = self._background.get(venue)
+        if task is None or task.done():
+            self._background[venue] = asyncio.create_task(self.refresh(venue))
+
+    async def refresh(self, venue):
+        """Fetch ``venue`` now and replace its index and cache file."""
+        async with self._locks[venue]:
+            await self._refresh_locked(venue)
+
+    async def _refresh_locked(self, venue):
+        data = await self._fetchers[venue]()
+        fetched_at = time.time()
+        self._install(venue, fetched_at, data)
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_cache_file, venue, fetched_at, data)
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not write {venue} metadata cache: {e}")
+
+    async def _refresh_loop(self, interval, venues):
+        while True:
+            await asyncio.sleep(interval)
+            targets = venues or list(self._index)
+            results = await asyncio.gather(*(self.refresh(venue) for venue in targets),
+                                           return_exceptions=True)
+            for venue, result in zip(targets, results):
+                if isinstance(result, Exception):
+                    self.logger.warning(f"⚠️ {venue} metadata refresh failed: {result}")
+
+    # --- Fetchers ---
+
+    async def _get_json(self, url):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        async with self.session.get(url, headers={"accept": "application/json"}) as response:
+            response.raise_for_status()
+            text = await response.text()
+        if not text.strip():
+            raise Exception(f"Empty response from {url}")
+        return json.loads(text)
+
+    async def _fetch_lighter(self):
+        data = await self._get_json(f"{self.lighter_base_url}/api/v1/orderBooks")
+        if "order_books" not in data:
+            raise Exception("Unexpected response format")
+        return data["order_books"]
+
+    async def _fetch_edgex(self):
+        if not self.edgex_client:
+            raise Exception("EdgeX client not initialized")
+        response = await self.edgex_client.get_metadata()
+        data = response.get('data', {})
+        if not data:
+            raise ValueError("Failed to get EdgeX metadata")
+        contract_list = data.get('contractList', [])
+        if not contract_list:
+            raise ValueError("Failed to get EdgeX contract list")
+        return contract_list
+
+    async def _fetch_extended(self):
+        data = await self._get_json(f"{self.extended_base_url}/api/v1/info/markets")
+        markets = data.get("data") if isinstance(data, dict) else data
+        if not markets:
+            raise Exception("Unexpected Extended markets response")
+        return markets
@@ -0,0 +1,260 @@
+"""Process-wide counters, gauges and histograms, served in the Prometheus text format."""
+import logging
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _label_text(names, values, extra=()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from ``function()`` at scrape time."""
+        self.function = function
+
+    def get(self):
+        if self.function is None:
+            return self.value
+        return self.function()
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)  # first bucket with value <= bound
+        with self._lock:
+            if index < len(self.counts):
+                self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **labels):
+        """Child series for these label values; bind it once on hot paths."""
+        if labels:
+            values = tuple(str(labels[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def remove(self, *values, **labels):
+        if labels:
+            values = tuple(str(labels[name]) for name in self.labelnames)
+        self._children.pop(tuple(str(value) for value in values), None)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1, **labels):
+        self.labels(**labels).inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_label_text(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value, **labels):
+        self.labels(**labels).set(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            try:
+                value = child.get()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            yield f"{self.name}{_label_text(self.labelnames, values)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float, **labels):
+        self.labels(**labels).observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(child.bounds, child.counts):
+                cumulative += count
+                labels = _label_text(self.labelnames, values, (("le", _format_value(bound)),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _label_text(self.labelnames, values, (("le", "+Inf"),))
+            yield f"{self.name}_bucket{labels} {child.count}"
+            yield f"{self.name}_sum{_label_text(self.labelnames, values)} {_format_value(child.sum)}"
+            yield f"{self.name}_count{_label_text(self.labelnames, values)} {child.count}"
+
+
+class MetricsRegistry:
+    """Named metrics of this process; ``render`` produces the /metrics page."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"metric {name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=()) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Metrics shared by the exchange clients and the strategy ---
+
+BBO_UPDATES = REGISTRY.counter(
+    "arb_bbo_updates_total", "Top-of-book changes applied to the local order books", ("venue",))
+POST_ONLY_RETRIES = REGISTRY.counter(
+    "arb_post_only_retries_total", "Post-only orders re-placed after the exchange rejected them", ("venue",))
+QUERY_RETRIES = REGISTRY.counter(
+    "arb_query_retries_total", "REST calls retried by query_retry", ("operation",))
+QUERY_FAILURES = REGISTRY.counter(
+    "arb_query_failures_total", "REST calls that failed after every query_retry attempt", ("operation",))
+WS_RECONNECTS = REGISTRY.counter(
+    "arb_ws_reconnects_total", "WebSocket reconnections after a dropped connection", ("venue", "stream"))
+POSITION = REGISTRY.gauge(
+    "arb_position", "Current position in base asset units (PositionTracker)", ("venue", "ticker"))
+SPREAD_BPS = REGISTRY.histogram(
+    "arb_spread_bps", "Cross-venue spread at each top-of-book change, in bps of the Lighter mid",
+    ("ticker", "direction"),
+    buckets=(-50, -20, -10, -5, -2, -1, 0, 1, 2, 5, 10, 20, 50))
+
+
+class MetricsServer:
+    """Serves ``registry`` at ``http://host:port/metrics`` from the running event loop."""
+
+    def __init__(self, port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY,
+                 logger=None):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self.logger = logger or logging.getLogger(__name__)
+        self._runner = None
+
+    async def _handle(self, request):
+        from aiohttp import web
+        return web.Response(body=self.registry.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def start(self):
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"📊 Metrics at http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
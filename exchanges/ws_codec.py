@@ -0,0 +1,321 @@
+"""
+WebSocket frame decoding for the market-data and order streams.
+
+Book frames are decoded with msgspec typed structs when installed (only the
+fields below are decoded, everything else in the frame is skipped); every
+other frame, or a book of an unexpected shape, goes through orjson, msgspec or
+the stdlib json module and a plain dict walk. Every backend returns the same
+normalized messages.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import msgspec
+except ImportError:  # optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+# BACKEND names the decoder behind loads(); the typed msgspec structs below
+# are used for Lighter/Extended frames whenever msgspec is installed.
+if orjson is not None:
+    _loads = orjson.loads
+    BACKEND = 'orjson'
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+elif msgspec is not None:
+    _loads = msgspec.json.decode
+    BACKEND = 'msgspec'
+
+    def dumps(obj) -> str:
+        return msgspec.json.encode(obj).decode()
+else:
+    _loads = json.loads
+    BACKEND = 'json'
+    dumps = json.dumps
+
+
+def loads(data):
+    """Decode a JSON frame (str or bytes) with the fastest available backend."""
+    return _loads(data)
+
+
+Level = Tuple[Any, Any]
+
+
+@dataclass
+class BookUpdate:
+    """Order book snapshot or delta with (price, size) levels as received on the wire."""
+    snapshot: bool
+    bids: List[Level]
+    asks: List[Level]
+    offset: Optional[int] = None
+    nonce: Optional[int] = None
+    begin_nonce: Optional[int] = None
+    timestamp: Optional[int] = None
+    # Market the frame belongs to when one connection carries several
+    # (Lighter market index, edgeX contract id)
+    market: Any = None
+
+
+@dataclass
+class OrderEvent:
+    """Order status updates from a private stream."""
+    orders: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class ControlMessage:
+    """Connection-level frames (ping, subscribed acks, errors)."""
+    type: str
+    data: Optional[Dict[str, Any]] = None
+
+
+def _truncate(levels, depth):
+    return levels if depth is None else levels[:depth]
+
+
+def _channel_market(channel):
+    # 'order_book:1' / 'order_book/1' -> 1
+    suffix = channel.replace('/', ':').rpartition(':')[2] if channel else ''
+    return int(suffix) if suffix.isdigit() else None
+
+
+# ---------------------------
+# Lighter
+# ---------------------------
+
+def _lighter_level(item) -> Level:
+    # 兼容字典 {'price': '100', 'size': '1'} 或 列表 ['100', '1']
+    if isinstance(item, dict):
+        return item.get('price') or item.get('p'), item.get('size') or item.get('q') or '0'
+    return item[0], item[1]
+
+
+def _lighter_from_dict(data, depth=None):
+    msg_type = data.get('type', '')
+    if msg_type.endswith('account_orders'):
+        orders = []
+        for market_orders in (data.get('orders') or {}).values():
+            orders.extend(market_orders)
+        return OrderEvent(orders)
+
+    # 兼容多种数据结构
+    if 'order_book' in data:
+        payload = data['order_book']
+    elif 'bids' in data:
+        payload = data
+    elif 'data' in data and isinstance(data['data'], dict):
+        payload = data['data']
+    else:
+        return ControlMessage(msg_type, data)
+
+    bids = payload.get('bids') or []
+    asks = payload.get('asks') or []
+    snapshot = not msg_type.startswith('update')
+    if snapshot:
+        bids = _truncate(bids, depth)
+        asks = _truncate(asks, depth)
+    return BookUpdate(
+        snapshot=snapshot,
+        bids=[_lighter_level(b) for b in bids],
+        asks=[_lighter_level(a) for a in asks],
+        offset=payload.get('offset', data.get('offset')),
+        nonce=payload.get('nonce'),
+        begin_nonce=payload.get('begin_nonce'),
+        timestamp=data.get('timestamp'),
+        market=_channel_market(data.get('channel')),
+    )
+
+
+# ---------------------------
+# Extended
+# ---------------------------
+
+def _extended_from_dict(data, depth=None):
+    msg_type = data.get('type')
+    payload = data.get('data') or {}
+
+    if msg_type == 'ORDER':
+        return OrderEvent(list(payload.get('orders', [])))
+
+    if msg_type in ('SNAPSHOT', 'DELTA', 'L2_UPDATE') or 'b' in payload:
+        snapshot = msg_type != 'DELTA'
+        bids = payload.get('b') or []
+        asks = payload.get('a') or []
+        if snapshot:
+            bids = _truncate(bids, depth)
+            asks = _truncate(asks, depth)
+        # 适配 {"p": "...", "q": "..."} 格式; DELTA 消息中 "q" 为该档位的数量变化
+        return BookUpdate(
+            snapshot=snapshot,
+            bids=[(b['p'], b['q']) for b in bids],
+            asks=[(a['p'], a['q']) for a in asks],
+            offset=data.get('seq'),
+            timestamp=data.get('ts'),
+        )
+
+    return ControlMessage(str(msg_type), data)
+
+
+# ---------------------------
+# edgeX
+# ---------------------------
+
+def _edgex_from_dict(data, depth=None):
+    content = data.get('content') or {}
+    entries = content.get('data') or []
+    if data.get('type') != 'quote-event' or not str(data.get('channel', '')).startswith('depth.') or not entries:
+        return ControlMessage(str(data.get('type', '')), data)
+
+    entry = entries[0]
+    depth_type = str(entry.get('depthType') or content.get('dataType') or '').upper()
+    snapshot = depth_type == 'SNAPSHOT'
+    bids = entry.get('bids') or []
+    asks = entry.get('asks') or []
+    if snapshot:
+        bids = _truncate(bids, depth)
+        asks = _truncate(asks, depth)
+    end_version = entry.get('endVersion')
+    # channel 格式为 depth.{contractId}.{depth}
+    contract_id = entry.get('contractId') or str(data.get('channel')).split('.')[1]
+    # CHANGED 消息中的 size 为该档位的最新数量, 0 表示删除
+    return BookUpdate(
+        snapshot=snapshot,
+        bids=[(b['price'], b['size']) for b in bids],
+        asks=[(a['price'], a['size']) for a in asks],
+        offset=int(end_version) if end_version is not None else None,
+        timestamp=content.get('ts') or data.get('ts'),
+        market=str(contract_id),
+    )
+
+
+# ---------------------------
+# msgspec typed structs
+# ---------------------------
+
+if msgspec is not None:
+    # Only the hot book frames are typed; order and control frames, and any
+    # book that doesn't match the shapes below, go through the dict walk so
+    # both paths always produce the same messages.
+    class _LighterLevel(msgspec.Struct):
+        price: str
+        size: str
+
+    class _LighterBook(msgspec.Struct):
+        bids: List[_LighterLevel] = []
+        asks: List[_LighterLevel] = []
+        # UNSET (absent) falls back to the frame offset, an explicit null doesn't
+        offset: Union[Optional[int], msgspec.UnsetType] = msgspec.UNSET
+        nonce: Optional[int] = None
+        begin_nonce: Optional[int] = None
+
+    class _LighterFrame(msgspec.Struct):
+        type: str = ''
+        channel: str = ''
+        offset: Optional[int] = None
+        timestamp: Optional[int] = None
+        order_book: Optional[_LighterBook] = None
+
+    class _ExtendedLevel(msgspec.Struct):
+        p: str
+        q: str
+
+    class _ExtendedPayload(msgspec.Struct):
+        # None when the key is absent: a "b" key marks a book frame of any type
+        b: Optional[List[_ExtendedLevel]] = None
+        a: Optional[List[_ExtendedLevel]] = None
+
+    class _ExtendedFrame(msgspec.Struct):
+        type: str = ''
+        ts: Optional[int] = None
+        seq: Optional[int] = None
+        data: Optional[_ExtendedPayload] = None
+
+    _lighter_decoder = msgspec.json.Decoder(_LighterFrame)
+    _extended_decoder = msgspec.json.Decoder(_ExtendedFrame)
+
+    def _lighter_from_struct(frame, depth=None):
+        """BookUpdate for an ``order_book`` frame, None for anything else."""
+        book = frame.order_book
+        if book is None or frame.type.endswith('account_orders'):
+            return None
+        snapshot = not frame.type.startswith('update')
+        bids = _truncate(book.bids, depth) if snapshot else book.bids
+        asks = _truncate(book.asks, depth) if snapshot else book.asks
+        return BookUpdate(
+            snapshot=snapshot,
+            bids=[(lv.price, lv.size) for lv in bids],
+            asks=[(lv.price, lv.size) for lv in asks],
+            offset=frame.offset if book.offset is msgspec.UNSET else book.offset,
+            nonce=book.nonce,
+            begin_nonce=book.begin_nonce,
+            timestamp=frame.timestamp,
+            market=_channel_market(frame.channel),
+        )
+
+    def _extended_from_struct(frame, depth=None):
+        """BookUpdate for a book frame, None for anything else."""
+        payload = frame.data
+        if frame.type == 'ORDER' or payload is None:
+            return None
+        if frame.type not in ('SNAPSHOT', 'DELTA', 'L2_UPDATE') and payload.b is None:
+            return None
+        snapshot = frame.type != 'DELTA'
+        bids = payload.b or []
+        asks = payload.a or []
+        if snapshot:
+            bids = _truncate(bids, depth)
+            asks = _truncate(asks, depth)
+        return BookUpdate(
+            snapshot=snapshot,
+            bids=[(lv.p, lv.q) for lv in bids],
+            asks=[(lv.p, lv.q) for lv in asks],
+            offset=frame.seq,
+            timestamp=frame.ts,
+        )
+
+
+def decode_lighter(message, depth=None):
+    """Decode a Lighter stream frame into BookUpdate / OrderEvent / ControlMessage.
+
+    ``depth`` caps the number of levels kept from snapshots; deltas are never
+    truncated since every changed level must be applied.
+    """
+    if msgspec is not None:
+        try:
+            update = _lighter_from_struct(_lighter_decoder.decode(message), depth)
+        except msgspec.ValidationError:
+            update = None  # unexpected shape: fall back to the generic dict walk
+        if update is not None:
+            return update
+    return _lighter_from_dict(loads(message), depth)
+
+
+def decode_edgex(message, depth=None):
+    """Decode an edgeX public ``depth.*`` frame into BookUpdate / ControlMessage.
+
+    The SDK hands over raw strings (or already-parsed dicts).
+    """
+    data = message if isinstance(message, dict) else loads(message)
+    return _edgex_from_dict(data, depth)
+
+
+def decode_extended(message, depth=None):
+    """Decode an Extended stream frame into BookUpdate / OrderEvent / ControlMessage."""
+    if msgspec is not None:
+        try:
+            update = _extended_from_struct(_extended_decoder.decode(message), depth)
+        except msgspec.ValidationError:
+            update = None
+        if update is not None:
+            return update
+    return _extended_from_dict(loads(message), depth)
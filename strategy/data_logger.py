@@ -1,18 +1,43 @@
 """Data logging module for trade and BBO data."""
+import asyncio
 import csv
 import json
 import os
 import logging
+import threading
+import time
+from collections import deque
 from decimal import Decimal
 from datetime import datetime
 import pytz
 
+# What to do with a BBO row when max_pending rows are already queued
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'wait')
+
 
 class DataLogger:
-    """Handles CSV and JSON logging for trades and BBO data."""
+    """Handles CSV and JSON logging for trades and BBO data.
+
+    The log_* methods only append a tuple of raw values to an in-memory queue;
+    a background thread formats the rows, writes them in batches every
+    ``flush_interval`` seconds and flushes the files, so neither the trading
+    loop nor a fill callback ever waits on file I/O. The log_* calls never
+    block. BBO rows are bounded by ``max_pending``: past it ``overflow``
+    drops the oldest or the newest row (counted in ``dropped``); with
+    'wait', a caller on the event loop applies backpressure by awaiting
+    ``wait_for_room()`` before logging (rows logged without it are dropped
+    as the newest). Trade rows are bounded by ``max_pending_trades`` and
+    only the newest are dropped past it (counted in ``dropped_trades``).
+    The writer thread owns the files and closes them once it has drained;
+    stop it with ``aclose()`` on the event loop (``close()`` elsewhere).
+    """
 
-    def __init__(self, exchange: str, ticker: str, logger: logging.Logger):
+    def __init__(self, exchange: str, ticker: str, logger: logging.Logger,
+                 max_pending: int = 100000, overflow: str = 'drop_oldest', flush_interval: float = 0.25,
+                 max_pending_trades: int = 10000):
         """Initialize data logger with file paths."""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
         self.exchange = exchange
         self.ticker = ticker
         self.logger = logger
@@ -22,21 +47,38 @@ class DataLogger:
         self.bbo_csv_filename = f"logs/{exchange}_{ticker}_bbo_data.csv"
         self.thresholds_json_filename = f"logs/{exchange}_{ticker}_thresholds.json"
 
-        # CSV file handles for efficient writing (kept open)
+        # CSV file handles (kept open, written only by the writer thread)
         self.bbo_csv_file = None
         self.bbo_csv_writer = None
-        self.bbo_write_counter = 0
-        self.bbo_flush_interval = 10  # Flush every N writes
+        self.trade_csv_file = None
+        self.trade_csv_writer = None
+
+        # Pending rows: plain deques (append/popleft are atomic) drained by the writer
+        self.max_pending = max_pending
+        self.max_pending_trades = max_pending_trades
+        self.overflow = overflow
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.dropped_trades = 0
+        self._bbo_rows = deque()
+        self._trade_rows = deque()
+        self._wake = threading.Event()
+        self._stopping = False
 
         self._initialize_csv_file()
         self._initialize_bbo_csv_file()
 
+        self._writer = threading.Thread(target=self._writer_loop, name=f"data-logger-{ticker}", daemon=True)
+        self._writer.start()
+
     def _initialize_csv_file(self):
         """Initialize CSV file with headers if it doesn't exist."""
         if not os.path.exists(self.csv_filename):
             with open(self.csv_filename, 'w', newline='') as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(['exchange', 'timestamp', 'side', 'price', 'quantity'])
+        self.trade_csv_file = open(self.csv_filename, 'a', newline='')
+        self.trade_csv_writer = csv.writer(self.trade_csv_file)
 
     def _initialize_bbo_csv_file(self):
         """Initialize BBO CSV file with headers if it doesn't exist."""
@@ -64,31 +106,56 @@ class DataLogger:
             self.bbo_csv_file.flush()  # Ensure header is written immediately
 
     def log_trade_to_csv(self, exchange: str, side: str, price: str, quantity: str):
-        """Log trade details to CSV file."""
-        timestamp = datetime.now(pytz.UTC).isoformat()
-
-        with open(self.csv_filename, 'a', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                exchange,
-                timestamp,
-                side,
-                price,
-                quantity
-            ])
-
-        self.logger.info(f"📊 Trade logged to CSV: {exchange} {side} {quantity} @ {price}")
+        """Queue a trade row (written and logged by the writer thread)."""
+        if len(self._trade_rows) >= self.max_pending_trades:
+            self.dropped_trades += 1
+            return
+        self._trade_rows.append((time.time(), exchange, side, price, quantity))
+        self._wake.set()
 
     def log_bbo_to_csv(self, maker_bid: Decimal, maker_ask: Decimal, lighter_bid: Decimal,
                        lighter_ask: Decimal, long_maker: bool, short_maker: bool,
                        long_maker_threshold: Decimal, short_maker_threshold: Decimal):
-        """Log BBO data to CSV file using buffered writes."""
-        if not self.bbo_csv_file or not self.bbo_csv_writer:
-            # Fallback: reinitialize if file handle is lost
-            self._initialize_bbo_csv_file()
+        """Queue a BBO row given as Decimal prices."""
+        self._push_bbo((self._format_bbo, time.time(), maker_bid, maker_ask, lighter_bid, lighter_ask,
+                        long_maker, short_maker, long_maker_threshold, short_maker_threshold))
 
-        timestamp = datetime.now(pytz.UTC).isoformat()
+    def log_bbo_ticks_to_csv(self, scale, maker_bid: int, maker_ask: int, lighter_bid: int,
+                             lighter_ask: int, long_maker: bool, short_maker: bool,
+                             long_maker_threshold: int, short_maker_threshold: int):
+        """Queue a BBO row given as integer price units of ``scale`` (see FixedPointScale)."""
+        self._push_bbo((self._format_bbo_ticks, time.time(), scale, maker_bid, maker_ask, lighter_bid,
+                        lighter_ask, long_maker, short_maker, long_maker_threshold, short_maker_threshold))
 
+    def _push_bbo(self, item):
+        rows = self._bbo_rows
+        if len(rows) >= self.max_pending:
+            if self.overflow != 'drop_oldest':
+                self.dropped += 1
+                return
+            try:
+                rows.popleft()
+            except IndexError:
+                pass
+            self.dropped += 1
+        rows.append(item)
+
+    async def wait_for_room(self):
+        """Backpressure for overflow='wait': suspend (never block the loop) until the BBO queue has room."""
+        if self.overflow != 'wait':
+            return
+        while len(self._bbo_rows) >= self.max_pending and self._writer.is_alive():
+            self._wake.set()
+            await asyncio.sleep(self.flush_interval / 10)
+
+    # --- Writer thread: formatting and file I/O ---
+
+    @staticmethod
+    def _timestamp(ts):
+        return datetime.fromtimestamp(ts, pytz.UTC).isoformat()
+
+    def _format_bbo(self, ts, maker_bid, maker_ask, lighter_bid, lighter_ask, long_maker, short_maker,
+                    long_maker_threshold, short_maker_threshold):
         # Calculate spreads
         long_maker_spread = (lighter_bid - maker_bid
                              if lighter_bid and lighter_bid > 0 and maker_bid > 0
@@ -96,39 +163,121 @@ class DataLogger:
         short_maker_spread = (maker_ask - lighter_ask
                               if maker_ask > 0 and lighter_ask and lighter_ask > 0
                               else Decimal('0'))
+        return [
+            self._timestamp(ts),
+            float(maker_bid),
+            float(maker_ask),
+            float(lighter_bid) if lighter_bid and lighter_bid > 0 else 0.0,
+            float(lighter_ask) if lighter_ask and lighter_ask > 0 else 0.0,
+            float(long_maker_spread),
+            float(short_maker_spread),
+            long_maker,
+            short_maker,
+            float(long_maker_threshold),
+            float(short_maker_threshold)
+        ]
 
-        try:
-            self.bbo_csv_writer.writerow([
-                timestamp,
-                float(maker_bid),
-                float(maker_ask),
-                float(lighter_bid) if lighter_bid and lighter_bid > 0 else 0.0,
-                float(lighter_ask) if lighter_ask and lighter_ask > 0 else 0.0,
-                float(long_maker_spread),
-                float(short_maker_spread),
-                long_maker,
-                short_maker,
-                float(long_maker_threshold),
-                float(short_maker_threshold)
-            ])
+    def _format_bbo_ticks(self, ts, scale, maker_bid, maker_ask, lighter_bid, lighter_ask, long_maker,
+                          short_maker, long_maker_threshold, short_maker_threshold):
+        # Spreads in integer units; a single float division per column for output
+        long_maker_spread = lighter_bid - maker_bid if lighter_bid > 0 and maker_bid > 0 else 0
+        short_maker_spread = maker_ask - lighter_ask if maker_ask > 0 and lighter_ask > 0 else 0
+        to_float = scale.price_to_float
+        return [
+            self._timestamp(ts),
+            to_float(maker_bid),
+            to_float(maker_ask),
+            to_float(lighter_bid),
+            to_float(lighter_ask),
+            to_float(long_maker_spread),
+            to_float(short_maker_spread),
+            long_maker,
+            short_maker,
+            to_float(long_maker_threshold),
+            to_float(short_maker_threshold)
+        ]
+
+    def _writer_loop(self):
+        reported = (0, 0)
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            self._drain()
+            drops = (self.dropped, self.dropped_trades)
+            if drops != reported:
+                reported = drops
+                self.logger.warning(f"📊 Log queue full: {drops[0]} BBO rows and {drops[1]} trade rows dropped so far")
+            if stopping:
+                self._close_files()
+                return
 
-            # Increment counter and flush periodically
-            self.bbo_write_counter += 1
-            if self.bbo_write_counter >= self.bbo_flush_interval:
+    def _drain(self):
+        """Write every queued row and flush; runs on the writer thread."""
+        trades = self._trade_rows
+        if trades:
+            try:
+                while trades:
+                    ts, exchange, side, price, quantity = trades.popleft()
+                    self.trade_csv_writer.writerow([exchange, self._timestamp(ts), side, price, quantity])
+                    self.logger.info(f"📊 Trade logged to CSV: {exchange} {side} {quantity} @ {price}")
+                self.trade_csv_file.flush()
+            except Exception as e:
+                self.logger.error(f"Error writing to trade CSV: {e}")
+
+        rows = self._bbo_rows
+        if rows:
+            try:
+                writerow = self.bbo_csv_writer.writerow
+                while rows:
+                    item = rows.popleft()
+                    writerow(item[0](*item[1:]))
                 self.bbo_csv_file.flush()
-                self.bbo_write_counter = 0
-        except Exception as e:
-            self.logger.error(f"Error writing to BBO CSV: {e}")
-            # Try to reinitialize on error
+            except Exception as e:
+                self.logger.error(f"Error writing to BBO CSV: {e}")
+                # Try to reinitialize on error
+                try:
+                    if self.bbo_csv_file:
+                        self.bbo_csv_file.close()
+                except Exception:
+                    pass
+                self._initialize_bbo_csv_file()
+
+    def _request_stop(self):
+        if self._stopping:
+            return False
+        self._stopping = True
+        self._wake.set()
+        return True
+
+    def _check_stopped(self):
+        if self._writer.is_alive():
+            self.logger.warning("📊 Data logger still writing; its files are closed once it finishes")
+
+    def close(self):
+        """Stop the writer thread; it writes out everything still queued, then closes the files.
+
+        Blocks for up to 5 seconds; from the event loop use ``aclose()``.
+        """
+        if self._request_stop():
+            self._writer.join(timeout=5)
+            self._check_stopped()
+
+    async def aclose(self):
+        """close() for the event loop: the writer thread is joined in an executor."""
+        if self._request_stop():
+            await asyncio.get_running_loop().run_in_executor(None, self._writer.join, 5)
+            self._check_stopped()
+
+    def _close_files(self):
+        """Close file handles; only called by the writer thread after its last drain."""
+        if self.trade_csv_file:
             try:
-                if self.bbo_csv_file:
-                    self.bbo_csv_file.close()
+                self.trade_csv_file.close()
             except Exception:
                 pass
-            self._initialize_bbo_csv_file()
-
-    def close(self):
-        """Close file handles."""
+            self.trade_csv_file = None
+            self.trade_csv_writer = None
         if self.bbo_csv_file:
             try:
                 self.bbo_csv_file.flush()
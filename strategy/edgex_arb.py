@@ -5,17 +5,22 @@ import logging
 import os
 import sys
 import time
-import requests
 import traceback
 from decimal import Decimal
 from typing import Tuple
 
-from lighter.signer_client import SignerClient
 from edgex_sdk import Client, WebSocketManager
+from exchanges.http_transport import ConnectionWarmer, HttpTransport
+from exchanges.lighter import LighterClient
+from exchanges.market_metadata import MarketMetadataService
+from exchanges.metrics import POSITION, SPREAD_BPS, MetricsServer
 
 from .data_logger import DataLogger
+from .fixed_point import FixedPointScale
+from .latency import LatencyRecorder, now_ns, seconds_to_ns
 from .order_book_manager import OrderBookManager
 from .websocket_manager import WebSocketManagerWrapper
+from .market_data_process import MarketDataProcess
 from .order_manager import OrderManager
 from .position_tracker import PositionTracker
 
@@ -33,7 +38,10 @@ class EdgexArb:
     def __init__(self, ticker: str, order_quantity: Decimal,
                  fill_timeout: int = 5, max_position: Decimal = Decimal('0'),
                  long_ex_threshold: Decimal = Decimal('10'),
-                 short_ex_threshold: Decimal = Decimal('10')):
+                 short_ex_threshold: Decimal = Decimal('10'),
+                 inline_hedge: bool = False, max_book_age: float = 2.0,
+                 ladder_levels: int = 1, ladder_step_ticks: int = 1,
+                 market_data_process: bool = False, metrics_port: int = None):
         """Initialize the arbitrage trading bot."""
         self.ticker = ticker
         self.order_quantity = order_quantity
@@ -45,6 +53,28 @@ class EdgexArb:
         self.long_ex_threshold = long_ex_threshold
         self.short_ex_threshold = short_ex_threshold
 
+        # Upper bound on how long the loop sleeps without a BBO change
+        # (keeps the REST fallback and stop_flag checks alive)
+        self.bbo_wait_timeout = 1.0
+        # Skip trade decisions when a venue's book is older than this (seconds, 0 disables)
+        self.max_book_age = max_book_age
+        self.stale_skips = 0
+        self._last_stale_log = 0.0
+
+        # Ladder mode (ladder_levels > 1): rest several maker orders per side at
+        # ladder_step_ticks spacing without blocking the loop; each fill hedges alone
+        self.ladder_levels = ladder_levels
+        self.ladder_step_ticks = ladder_step_ticks
+        self._ladder_tasks = {}
+
+        # Decode the public book streams in a separate process (MarketDataProcess)
+        self.market_data_process = market_data_process
+        self.market_data = None
+
+        # Local Prometheus endpoint (owner of the connections only; None disables)
+        self.metrics_port = metrics_port
+        self.metrics_server = None
+
         # Setup logger
         self._setup_logger()
 
@@ -52,12 +82,29 @@ class EdgexArb:
         self.data_logger = DataLogger(exchange="edgex", ticker=ticker, logger=self.logger)
         self.order_book_manager = OrderBookManager(self.logger)
         self.ws_manager = WebSocketManagerWrapper(self.order_book_manager, self.logger)
-        self.order_manager = OrderManager(self.order_book_manager, self.logger)
-
-        # Initialize clients (will be set later)
+        self.order_manager = OrderManager(self.order_book_manager, self.logger,
+                                          fill_timeout=fill_timeout, inline_hedge=inline_hedge)
+        self.order_manager.edgex_book_max_age = max_book_age
+        # Tick-to-trade latency histograms, dumped every minute and on shutdown
+        self.latency = LatencyRecorder(f"edgex_{ticker}", self.logger)
+        self.order_manager.latency = self.latency
+        # md_recv/decision stamps of the signal that triggered the current trade
+        self.signal_stamps = {}
+
+        # Initialize clients (will be set later, or injected by MultiMarketRunner)
         self.edgex_client = None
         self.edgex_ws_manager = None
         self.lighter_client = None
+        # False when the clients/streams are shared with other markets and closed by their owner
+        self.owns_connections = True
+        # Cross-process limits (RiskClient), set by the sharded supervisor's workers
+        self.risk_client = None
+        # Market metadata (MarketMetadataService); shared when injected by MultiMarketRunner
+        self.metadata = None
+        # Pooled keep-alive HTTP session for every REST client (shared when injected)
+        self.http_transport = None
+        # Keep-warm pings on the order-entry hosts (owner of the transport only)
+        self.connection_warmer = None
 
         # Configuration
         self.lighter_base_url = "https://mainnet.zklighter.elliot.ai"
@@ -71,11 +118,17 @@ class EdgexArb:
         # Contract/market info (will be set during initialization)
         self.edgex_contract_id = None
         self.edgex_tick_size = None
+        self.edgex_step_size = None
         self.lighter_market_index = None
         self.base_amount_multiplier = None
         self.price_multiplier = None
         self.tick_size = None
 
+        # Fixed-point scale and integer thresholds (set once market info is known)
+        self.price_scale = None
+        self.long_ex_threshold_ticks = None
+        self.short_ex_threshold_ticks = None
+
         # Position tracker (will be initialized after clients)
         self.position_tracker = None
 
@@ -129,6 +182,9 @@ class EdgexArb:
     def _handle_lighter_order_filled(self, order_data: dict):
         """Handle Lighter order fill."""
         try:
+            if not self.order_manager.record_lighter_fill(order_data):
+                return  # duplicate FILLED event
+
             order_data["avg_filled_price"] = (
                 Decimal(order_data["filled_quote_amount"]) /
                 Decimal(order_data["filled_base_amount"])
@@ -160,8 +216,7 @@ class EdgexArb:
             )
 
             # Mark execution as complete
-            self.order_manager.lighter_order_filled = True
-            self.order_manager.order_execution_complete = True
+            self.order_manager.handle_lighter_order_filled(order_data)
 
         except Exception as e:
             self.logger.error(f"Error handling Lighter order result: {e}")
@@ -172,7 +227,8 @@ class EdgexArb:
             if order.get('contractId') != self.edgex_contract_id:
                 return
 
-            if order.get('clientOrderId') != self.order_manager.get_edgex_client_order_id():
+            tracked = self.order_manager.lookup_edgex_order(order.get('clientOrderId'), order.get('id'))
+            if tracked is None:
                 return
 
             order_id = order.get('id')
@@ -190,8 +246,11 @@ class EdgexArb:
             if status == 'CANCELED' and filled_size > 0:
                 status = 'FILLED'
 
+            if not self.order_manager.order_registry.apply_update(tracked, status, filled_size):
+                return  # duplicate or out-of-order update
+
             # Update order status
-            self.order_manager.update_edgex_order_status(status)
+            self.order_manager.update_edgex_order_status(status, tracked)
 
             # Handle filled orders
             if status == 'FILLED' and filled_size > 0:
@@ -202,28 +261,28 @@ class EdgexArb:
                     if self.position_tracker:
                         self.position_tracker.update_edgex_position(-filled_size)
 
+                # Trigger Lighter order placement first; logging follows the hedge
+                self.order_manager.handle_edgex_order_update({
+                    'order_id': order_id,
+                    'side': side,
+                    'status': status,
+                    'size': size,
+                    'price': price,
+                    'contract_id': self.edgex_contract_id,
+                    'filled_size': filled_size
+                }, tracked)
+
                 self.logger.info(
                     f"[{order_id}] [{order_type}] [EdgeX] [{status}]: {filled_size} @ {price}")
 
                 if filled_size > 0.0001:
-                    # Log EdgeX trade to CSV
+                    # Log EdgeX trade to CSV (queued; written by the DataLogger thread)
                     self.data_logger.log_trade_to_csv(
                         exchange='edgeX',
                         side=side,
                         price=str(price),
                         quantity=str(filled_size)
                     )
-
-                # Trigger Lighter order placement
-                self.order_manager.handle_edgex_order_update({
-                    'order_id': order_id,
-                    'side': side,
-                    'status': status,
-                    'size': size,
-                    'price': price,
-                    'contract_id': self.edgex_contract_id,
-                    'filled_size': filled_size
-                })
             elif status != 'FILLED':
                 if status == 'OPEN':
                     self.logger.info(f"[{order_id}] [{order_type}] [EdgeX] [{status}]: {size} @ {price}")
@@ -254,12 +313,12 @@ class EdgexArb:
         except Exception as e:
             self.logger.error(f"Error shutting down WebSocket manager: {e}")
 
-        # Close data logger
+        # Final latency report (before the log handlers close)
         try:
-            if self.data_logger:
-                self.data_logger.close()
+            self.latency.stop()
+            self.latency.dump()
         except Exception as e:
-            self.logger.error(f"Error closing data logger: {e}")
+            self.logger.error(f"Error writing latency report: {e}")
 
         # Close logging handlers
         for handler in self.logger.handlers[:]:
@@ -278,9 +337,51 @@ class EdgexArb:
 
         self._cleanup_done = True
 
-        # Close EdgeX client (closes aiohttp sessions) with timeout
+        if self.market_data:
+            try:
+                self.market_data.stop()
+            except Exception as e:
+                self.logger.error(f"Error stopping market data process: {e}")
+
+        # Pull maker orders still resting (e.g. unfilled ladder rungs)
+        for order in self.order_manager.order_registry.open_orders('edgex'):
+            if order.order_id is None:
+                continue
+            try:
+                await asyncio.wait_for(self.order_manager.cancel_edgex_order(order.order_id), timeout=1.0)
+            except Exception as e:
+                self.logger.error(f"Error cancelling EdgeX order {order.order_id}: {e}")
+
+        # Write out the queued CSV rows without blocking the loop
+        try:
+            if self.data_logger:
+                await self.data_logger.aclose()
+        except Exception as e:
+            self.logger.error(f"Error closing data logger: {e}")
+
+        if not self.owns_connections:
+            return
+
+        if self.connection_warmer:
+            await self.connection_warmer.stop()
+
+        if self.metrics_server:
+            try:
+                await self.metrics_server.stop()
+            except Exception as e:
+                self.logger.error(f"Error stopping metrics server: {e}")
+
+        if self.metadata:
+            try:
+                await self.metadata.close()
+            except Exception as e:
+                self.logger.error(f"Error closing metadata service: {e}")
+
+        # Close EdgeX client with timeout; the shared HTTP session is closed after it
         try:
             if self.edgex_client:
+                if self.http_transport:
+                    self.http_transport.detach_edgex(self.edgex_client)
                 await asyncio.wait_for(
                     self.edgex_client.close(),
                     timeout=2.0
@@ -291,6 +392,14 @@ class EdgexArb:
         except Exception as e:
             self.logger.error(f"Error closing EdgeX client: {e}")
 
+        await self._close_lighter_client()
+
+        if self.http_transport:
+            try:
+                await self.http_transport.close()
+            except Exception as e:
+                self.logger.error(f"Error closing HTTP transport: {e}")
+
         # Close EdgeX WebSocket manager connections
         try:
             if self.edgex_ws_manager:
@@ -310,14 +419,15 @@ class EdgexArb:
             if not api_key_private_key:
                 raise Exception("API_KEY_PRIVATE_KEY environment variable not set")
 
-            self.lighter_client = SignerClient(
-                url=self.lighter_base_url,
+            self.lighter_client = LighterClient(
+                api_key=None,
                 private_key=api_key_private_key,
-                account_index=self.account_index,
                 api_key_index=self.api_key_index,
+                logger=self.logger,
+                account_index=self.account_index,
             )
 
-            err = self.lighter_client.check_client()
+            err = self.lighter_client.client.check_client()
             if err is not None:
                 raise Exception(f"CheckClient error: {err}")
 
@@ -326,6 +436,8 @@ class EdgexArb:
 
     def initialize_edgex_client(self):
         """Initialize the EdgeX client."""
+        if self.edgex_client is not None:
+            return self.edgex_client
         if not self.edgex_account_id or not self.edgex_stark_private_key:
             raise ValueError(
                 "EDGEX_ACCOUNT_ID and EDGEX_STARK_PRIVATE_KEY must be set in environment variables")
@@ -345,68 +457,47 @@ class EdgexArb:
         self.logger.info("✅ EdgeX client initialized successfully")
         return self.edgex_client
 
-    def get_lighter_market_config(self) -> Tuple[int, int, int, Decimal]:
-        """Get Lighter market configuration."""
-        url = f"{self.lighter_base_url}/api/v1/orderBooks"
-        headers = {"accept": "application/json"}
-
+    async def _close_lighter_client(self):
+        """Hand the Lighter SDK its own pool back, then close it (the shared session stays open)."""
+        if not self.lighter_client:
+            return
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-
-            if not response.text.strip():
-                raise Exception("Empty response from Lighter API")
-
-            data = response.json()
-
-            if "order_books" not in data:
-                raise Exception("Unexpected response format")
+            if self.http_transport:
+                self.http_transport.detach_lighter(self.lighter_client.client)
+            await asyncio.wait_for(self.lighter_client.close(), timeout=2.0)
+        except Exception as e:
+            self.logger.error(f"Error closing Lighter client: {e}")
 
-            for market in data["order_books"]:
-                if market["symbol"] == self.ticker:
-                    price_multiplier = pow(10, market["supported_price_decimals"])
-                    return (market["market_id"],
-                            pow(10, market["supported_size_decimals"]),
-                            price_multiplier,
-                            Decimal("1") / (Decimal("10") ** market["supported_price_decimals"]))
-            raise Exception(f"Ticker {self.ticker} not found")
+    def create_connection_warmer(self) -> ConnectionWarmer:
+        """Keep-warm pings through the clients that send orders: an edgeX position read
+        and a Lighter next-nonce lookup on the signer's REST client (the sendTx pool)."""
+        warmer = ConnectionWarmer(logger=self.logger)
+        warmer.add_probe("edgex", self.edgex_client.get_account_positions)
+        warmer.add_probe("lighter", self.lighter_client.ping)
+        return warmer
 
+    async def get_lighter_market_config(self) -> Tuple[int, int, int, Decimal]:
+        """Get Lighter market configuration."""
+        try:
+            market = await self.metadata.get_market("lighter", self.ticker)
+            return (market.market_id,
+                    pow(10, market.size_decimals),
+                    pow(10, market.price_decimals),
+                    market.tick_size)
         except Exception as e:
             self.logger.error(f"⚠️ Error getting market config: {e}")
             raise
 
     async def get_edgex_contract_info(self) -> Tuple[str, Decimal]:
         """Get EdgeX contract ID and tick size."""
-        if not self.edgex_client:
-            raise Exception("EdgeX client not initialized")
-
-        response = await self.edgex_client.get_metadata()
-        data = response.get('data', {})
-        if not data:
-            raise ValueError("Failed to get EdgeX metadata")
-
-        contract_list = data.get('contractList', [])
-        if not contract_list:
-            raise ValueError("Failed to get EdgeX contract list")
-
-        current_contract = None
-        for c in contract_list:
-            if c.get('contractName') == self.ticker + 'USD':
-                current_contract = c
-                break
-
-        if not current_contract:
-            raise ValueError(f"Failed to get contract ID for ticker {self.ticker}")
-
-        contract_id = current_contract.get('contractId')
-        min_quantity = Decimal(current_contract.get('minOrderSize'))
-        tick_size = Decimal(current_contract.get('tickSize'))
+        contract = await self.metadata.get_market("edgex", self.ticker)
+        self.edgex_step_size = contract.lot_size
 
-        if self.order_quantity < min_quantity:
+        if contract.min_size is not None and self.order_quantity < contract.min_size:
             raise ValueError(
-                f"Order quantity is less than min quantity: {self.order_quantity} < {min_quantity}")
+                f"Order quantity is less than min quantity: {self.order_quantity} < {contract.min_size}")
 
-        return contract_id, tick_size
+        return contract.market_id, contract.tick_size
 
     async def trading_loop(self):
         """Main trading loop implementing the strategy."""
@@ -416,11 +507,24 @@ class EdgexArb:
         try:
             self.initialize_lighter_client()
             self.initialize_edgex_client()
-
-            # Get contract info
-            self.edgex_contract_id, self.edgex_tick_size = await self.get_edgex_contract_info()
+            if self.http_transport is None:
+                # Order entry, position queries and metadata share warm connections
+                self.http_transport = HttpTransport(logger=self.logger)
+                await self.http_transport.attach_edgex(self.edgex_client)
+                await self.http_transport.attach_lighter(self.lighter_client.client)
+                self.connection_warmer = self.create_connection_warmer()
+                self.connection_warmer.start()
+            if self.metadata is None:
+                self.metadata = MarketMetadataService(
+                    self.lighter_base_url, self.edgex_client, logger=self.logger,
+                    session=self.http_transport.session)
+                self.metadata.start_refresh()
+
+            # Get contract info (both venues concurrently, warm-started from the disk cache)
+            (self.edgex_contract_id, self.edgex_tick_size), lighter_config = await asyncio.gather(
+                self.get_edgex_contract_info(), self.get_lighter_market_config())
             (self.lighter_market_index, self.base_amount_multiplier,
-             self.price_multiplier, self.tick_size) = self.get_lighter_market_config()
+             self.price_multiplier, self.tick_size) = lighter_config
 
             self.logger.info(
                 f"Contract info loaded - EdgeX: {self.edgex_contract_id}, "
@@ -430,6 +534,15 @@ class EdgexArb:
             self.logger.error(f"❌ Failed to initialize: {e}")
             return
 
+        # Integer price/size scale fine enough for both venues' tick and lot sizes;
+        # must be set before any book data arrives
+        self.price_scale = FixedPointScale.from_increments(
+            price_increments=[self.tick_size, self.edgex_tick_size],
+            size_increments=[Decimal(1) / self.base_amount_multiplier, self.edgex_step_size])
+        self.order_book_manager.set_scale(self.price_scale)
+        self.long_ex_threshold_ticks = self.price_scale.price_to_int(self.long_ex_threshold)
+        self.short_ex_threshold_ticks = self.price_scale.price_to_int(self.short_ex_threshold)
+
         # Initialize position tracker
         self.position_tracker = PositionTracker(
             self.ticker,
@@ -439,6 +552,17 @@ class EdgexArb:
             self.account_index,
             self.logger
         )
+        tracker = self.position_tracker
+        POSITION.labels(venue='edgex', ticker=self.ticker).set_function(lambda: tracker.edgex_position)
+        POSITION.labels(venue='lighter', ticker=self.ticker).set_function(lambda: tracker.lighter_position)
+
+        if self.metrics_port and self.owns_connections:
+            try:
+                self.metrics_server = MetricsServer(self.metrics_port, logger=self.logger)
+                await self.metrics_server.start()
+            except OSError as e:
+                self.logger.error(f"❌ Failed to start metrics server on port {self.metrics_port}: {e}")
+                self.metrics_server = None
 
         # Configure modules
         self.order_manager.set_edgex_config(
@@ -451,6 +575,17 @@ class EdgexArb:
         self.ws_manager.set_lighter_config(
             self.lighter_client, self.lighter_market_index, self.account_index)
 
+        if self.market_data_process:
+            try:
+                self.market_data = MarketDataProcess(
+                    {"lighter": self.lighter_market_index, "edgex": self.edgex_contract_id},
+                    self.price_scale, self.logger)
+                self.market_data.start(self.order_book_manager)
+                self.ws_manager.external_market_data = True
+            except Exception as e:
+                self.logger.error(f"❌ Failed to start market data process: {e}")
+                return
+
         # Setup EdgeX websocket
         try:
             await self.ws_manager.setup_edgex_websocket()
@@ -507,45 +642,84 @@ class EdgexArb:
         # Get initial positions
         self.position_tracker.edgex_position = await self.position_tracker.get_edgex_position()
         self.position_tracker.lighter_position = await self.position_tracker.get_lighter_position()
+        await self._release_risk()
+        self.latency.start()
 
-        # Main trading loop
+        spread_long = SPREAD_BPS.labels(ticker=self.ticker, direction='long')
+        spread_short = SPREAD_BPS.labels(ticker=self.ticker, direction='short')
+
+        # Main trading loop: wake only when either venue's top of book changes
+        bbo_version = self.order_book_manager.bbo_version
         while not self.stop_flag:
-            try:
-                ex_best_bid, ex_best_ask = await asyncio.wait_for(
-                    self.order_manager.fetch_edgex_bbo_prices(),
-                    timeout=5.0
-                )
-            except asyncio.TimeoutError:
-                self.logger.warning("⚠️ Timeout fetching EdgeX BBO prices")
-                await asyncio.sleep(0.5)
+            bbo_version = await self.order_book_manager.wait_for_bbo_change(
+                bbo_version, timeout=self.bbo_wait_timeout)
+            if self.stop_flag:
+                break
+
+            # Never quote against a book that may have missed updates
+            if self.order_book_manager.is_book_stale("lighter"):
                 continue
-            except Exception as e:
-                self.logger.error(f"⚠️ Error fetching EdgeX BBO prices: {e}")
-                await asyncio.sleep(0.5)
+
+            if self.max_book_age and not self.order_book_manager.is_fresh(self.max_book_age, "lighter"):
+                self._log_stale_skip()
                 continue
 
-            lighter_bid, lighter_ask = self.order_book_manager.get_lighter_bbo()
+            # Streamed edgeX book when it is live, REST depth only as a fallback
+            edgex_from_ws = self.order_book_manager.edgex_order_book_ready and (
+                not self.max_book_age or self.order_book_manager.is_fresh(self.max_book_age, "edgex"))
+
+            if edgex_from_ws:
+                ex_best_bid, ex_best_ask = self.order_book_manager.get_bbo_ticks("edgex")
+            else:
+                try:
+                    rest_bid, rest_ask = await asyncio.wait_for(
+                        self.order_manager.fetch_edgex_bbo_prices(),
+                        timeout=5.0
+                    )
+                    ex_best_bid = self.price_scale.price_to_int(rest_bid)
+                    ex_best_ask = self.price_scale.price_to_int(rest_ask)
+                except asyncio.TimeoutError:
+                    self.logger.warning("⚠️ Timeout fetching EdgeX BBO prices")
+                    await asyncio.sleep(0.5)
+                    continue
+                except Exception as e:
+                    self.logger.error(f"⚠️ Error fetching EdgeX BBO prices: {e}")
+                    await asyncio.sleep(0.5)
+                    continue
+
+            # All spread math below is in integer price units
+            lighter_bid, lighter_ask = self.order_book_manager.get_bbo_ticks("lighter")
+
+            if lighter_bid and lighter_ask and ex_best_bid and ex_best_ask:
+                lighter_mid = (lighter_bid + lighter_ask) / 2
+                spread_long.observe((lighter_bid - ex_best_bid) * 10000 / lighter_mid)
+                spread_short.observe((ex_best_ask - lighter_ask) * 10000 / lighter_mid)
 
             # Determine if we should trade
             long_ex = False
             short_ex = False
             if (lighter_bid and ex_best_bid and
-                    lighter_bid - ex_best_bid > self.long_ex_threshold):
+                    lighter_bid - ex_best_bid > self.long_ex_threshold_ticks):
                 long_ex = True
             elif (ex_best_ask and lighter_ask and
-                  ex_best_ask - lighter_ask > self.short_ex_threshold):
+                  ex_best_ask - lighter_ask > self.short_ex_threshold_ticks):
                 short_ex = True
 
-            # Log BBO data
-            self.data_logger.log_bbo_to_csv(
+            if long_ex or short_ex:
+                self.signal_stamps = self._signal_stamps(edgex_from_ws)
+
+            # Log BBO data (with overflow='wait' a full queue holds the loop here)
+            await self.data_logger.wait_for_room()
+            self.data_logger.log_bbo_ticks_to_csv(
+                self.price_scale,
                 maker_bid=ex_best_bid,
                 maker_ask=ex_best_ask,
-                lighter_bid=lighter_bid if lighter_bid else Decimal('0'),
-                lighter_ask=lighter_ask if lighter_ask else Decimal('0'),
+                lighter_bid=lighter_bid or 0,
+                lighter_ask=lighter_ask or 0,
                 long_maker=long_ex,
                 short_maker=short_ex,
-                long_maker_threshold=self.long_ex_threshold,
-                short_maker_threshold=self.short_ex_threshold
+                long_maker_threshold=self.long_ex_threshold_ticks,
+                short_maker_threshold=self.short_ex_threshold_ticks
             )
 
             if self.stop_flag:
@@ -554,156 +728,171 @@ class EdgexArb:
             # Execute trades
             if (self.position_tracker.get_current_edgex_position() < self.max_position and
                     long_ex):
-                await self._execute_long_trade()
+                if self.ladder_levels > 1:
+                    self._start_ladder('buy')
+                else:
+                    await self._execute_long_trade()
             elif (self.position_tracker.get_current_edgex_position() > -1 * self.max_position and
                   short_ex):
-                await self._execute_short_trade()
-            else:
-                await asyncio.sleep(0.05)
+                if self.ladder_levels > 1:
+                    self._start_ladder('sell')
+                else:
+                    await self._execute_short_trade()
+
+    def _signal_stamps(self, edgex_from_ws: bool):
+        """md_recv (receive time of the newest book update behind the signal) and decision stamps."""
+        recv_time = self.order_book_manager.recv_time
+        received = [t for t in (recv_time["lighter"], recv_time["edgex"] if edgex_from_ws else None) if t]
+        stamps = {'decision': now_ns()}
+        if received:
+            stamps['md_recv'] = seconds_to_ns(max(received))
+        return stamps
+
+    def _log_stale_skip(self):
+        self.stale_skips += 1
+        now = time.monotonic()
+        if now - self._last_stale_log < 5:
+            return
+        self._last_stale_log = now
+        ages = {venue: self.order_book_manager.get_book_age(venue) for venue in ("lighter", "edgex")}
+        self.logger.warning(
+            f"⏸️ Book older than {self.max_book_age}s, skipping trade decisions "
+            f"(ages: {ages}, skipped {self.stale_skips} ticks)")
 
     async def _execute_long_trade(self):
         """Execute a long trade (buy on EdgeX, sell on Lighter)."""
-        if self.stop_flag:
-            return
+        await self._execute_trade('buy')
 
-        # Update positions
-        try:
-            self.position_tracker.edgex_position = await asyncio.wait_for(
-                self.position_tracker.get_edgex_position(),
-                timeout=3.0
-            )
-            if self.stop_flag:
-                return
-            self.position_tracker.lighter_position = await asyncio.wait_for(
-                self.position_tracker.get_lighter_position(),
-                timeout=3.0
-            )
-        except asyncio.TimeoutError:
-            if self.stop_flag:
-                return
-            self.logger.warning("⚠️ Timeout getting positions")
-            return
-        except Exception as e:
-            if self.stop_flag:
-                return
-            self.logger.error(f"⚠️ Error getting positions: {e}")
-            return
+    async def _execute_short_trade(self):
+        """Execute a short trade (sell on EdgeX, buy on Lighter)."""
+        await self._execute_trade('sell')
 
-        if self.stop_flag:
+    async def _execute_trade(self, side: str):
+        """Place the EdgeX maker order for ``side`` and hedge its fill on Lighter."""
+        if not await self._refresh_positions():
             return
 
-        self.logger.info(
-            f"EdgeX position: {self.position_tracker.edgex_position} | "
-            f"Lighter position: {self.position_tracker.lighter_position}")
-
-        if abs(self.position_tracker.get_net_position()) > self.order_quantity * 2:
-            self.logger.error(
-                f"❌ Position diff is too large: {self.position_tracker.get_net_position()}")
-            sys.exit(1)
+        reservation = await self._reserve_risk(side, self.order_quantity)
+        if reservation is False:
+            return
 
-        self.order_manager.order_execution_complete = False
-        self.order_manager.waiting_for_lighter_fill = False
+        trade = self.order_manager.begin_trade(side, self.order_quantity)
+        trade.stamps.update(self.signal_stamps)
 
         try:
-            side = 'buy'
-            order_filled = await self.order_manager.place_edgex_post_only_order(
-                side, self.order_quantity, self.stop_flag)
-            if not order_filled or self.stop_flag:
-                return
-        except Exception as e:
-            if self.stop_flag:
-                return
-            self.logger.error(f"⚠️ Error in trading loop: {e}")
-            self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
-            sys.exit(1)
-
-        start_time = time.time()
-        while not self.order_manager.order_execution_complete and not self.stop_flag:
-            if self.order_manager.waiting_for_lighter_fill:
-                await self.order_manager.place_lighter_market_order(
-                    self.order_manager.current_lighter_side,
-                    self.order_manager.current_lighter_quantity,
-                    self.order_manager.current_lighter_price,
-                    self.stop_flag
-                )
-                break
-
-            await asyncio.sleep(0.01)
-            if time.time() - start_time > 180:
-                self.logger.error("❌ Timeout waiting for trade completion")
-                break
+            try:
+                order_filled = await self.order_manager.place_edgex_post_only_order(
+                    side, self.order_quantity, self.stop_flag, trade=trade)
+                if not order_filled or self.stop_flag:
+                    return
+            except Exception as e:
+                if self.stop_flag:
+                    return
+                self.logger.error(f"⚠️ Error in trading loop: {e}")
+                self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
+                sys.exit(1)
+
+            # The maker fill future resolved: hedge immediately (no-op if already sent inline)
+            await self.order_manager.hedge_trade(trade, self.stop_flag, timeout=180)
+        finally:
+            self.latency.record_trade(trade, 'edgex')
+            await self._release_risk(reservation)
+
+    def _risk_price(self):
+        bid, ask = self.order_book_manager.get_bbo_ticks("lighter")
+        if bid is None or ask is None:
+            return None
+        return self.price_scale.price_to_decimal((bid + ask) // 2)
+
+    async def _reserve_risk(self, side: str, quantity: Decimal):
+        """Reservation id from the risk service, None when there is none, False if over a limit."""
+        if self.risk_client is None:
+            return None
+        price = self._risk_price()
+        if price is None:
+            return False
+        reservation = await self.risk_client.reserve(self.ticker, side, quantity, price)
+        return False if reservation is None else reservation
+
+    async def _release_risk(self, reservation=None):
+        """Release ``reservation`` (if any) and report the current positions."""
+        if self.risk_client is None:
+            return
+        await self.risk_client.release(
+            reservation, self.ticker, self.position_tracker.edgex_position,
+            self.position_tracker.lighter_position, self._risk_price())
 
-    async def _execute_short_trade(self):
-        """Execute a short trade (sell on EdgeX, buy on Lighter)."""
+    async def _refresh_positions(self) -> bool:
+        """Reload both venue positions; False if trading should not go ahead."""
         if self.stop_flag:
-            return
+            return False
 
-        # Update positions
         try:
             self.position_tracker.edgex_position = await asyncio.wait_for(
                 self.position_tracker.get_edgex_position(),
                 timeout=3.0
             )
             if self.stop_flag:
-                return
+                return False
             self.position_tracker.lighter_position = await asyncio.wait_for(
                 self.position_tracker.get_lighter_position(),
                 timeout=3.0
             )
         except asyncio.TimeoutError:
             if self.stop_flag:
-                return
+                return False
             self.logger.warning("⚠️ Timeout getting positions")
-            return
+            return False
         except Exception as e:
             if self.stop_flag:
-                return
+                return False
             self.logger.error(f"⚠️ Error getting positions: {e}")
-            return
+            return False
 
         if self.stop_flag:
-            return
+            return False
 
         self.logger.info(
             f"EdgeX position: {self.position_tracker.edgex_position} | "
             f"Lighter position: {self.position_tracker.lighter_position}")
 
-        if abs(self.position_tracker.get_net_position()) > self.order_quantity * 2:
+        # Each resting ladder rung can have a hedge in flight, so the allowed
+        # imbalance grows with ladder_levels (unchanged in single-order mode)
+        if abs(self.position_tracker.get_net_position()) > self.order_quantity * 2 * self.ladder_levels:
             self.logger.error(
                 f"❌ Position diff is too large: {self.position_tracker.get_net_position()}")
             sys.exit(1)
+        return True
 
-        self.order_manager.order_execution_complete = False
-        self.order_manager.waiting_for_lighter_fill = False
-
+    async def _run_ladder(self, side: str, stamps=None):
+        """Rest a ladder of maker orders on ``side``; each fill is hedged on its own."""
         try:
-            side = 'sell'
-            order_filled = await self.order_manager.place_edgex_post_only_order(
-                side, self.order_quantity, self.stop_flag)
-            if not order_filled or self.stop_flag:
+            if not await self._refresh_positions():
                 return
-        except Exception as e:
-            if self.stop_flag:
+            position = self.position_tracker.get_current_edgex_position()
+            room = self.max_position - position if side == 'buy' else self.max_position + position
+            levels = min(self.ladder_levels, int(room / self.order_quantity))
+            if levels < 1:
+                return
+            reservation = await self._reserve_risk(side, self.order_quantity * levels)
+            if reservation is False:
                 return
-            self.logger.error(f"⚠️ Error in trading loop: {e}")
+            try:
+                filled = await self.order_manager.run_edgex_ladder(
+                    side, self.order_quantity, levels, self.ladder_step_ticks, self.stop_flag,
+                    stamps=stamps)
+            finally:
+                await self._release_risk(reservation)
+            self.logger.info(f"EdgeX {side} ladder done: {filled}/{levels} rungs filled and hedged")
+        except Exception as e:
+            self.logger.error(f"⚠️ Error in {side} ladder: {e}")
             self.logger.error(f"⚠️ Full traceback: {traceback.format_exc()}")
-            sys.exit(1)
 
-        start_time = time.time()
-        while not self.order_manager.order_execution_complete and not self.stop_flag:
-            if self.order_manager.waiting_for_lighter_fill:
-                await self.order_manager.place_lighter_market_order(
-                    self.order_manager.current_lighter_side,
-                    self.order_manager.current_lighter_quantity,
-                    self.order_manager.current_lighter_price,
-                    self.stop_flag
-                )
-                break
-
-            await asyncio.sleep(0.01)
-            if time.time() - start_time > 180:
-                self.logger.error("❌ Timeout waiting for trade completion")
-                break
+    def _start_ladder(self, side: str):
+        """Start a ladder on ``side`` unless one is already resting there."""
+        task = self._ladder_tasks.get(side)
+        if task is None or task.done():
+            self._ladder_tasks[side] = asyncio.create_task(self._run_ladder(side, dict(self.signal_stamps)))
 
     async def run(self):
         """Run the arbitrage bot."""
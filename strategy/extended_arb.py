@@ -1,9 +1,12 @@
 import asyncio
 import logging
+import time
 from decimal import Decimal
 import datetime
 from exchanges.extended import ExtendedClient
+from exchanges.http_transport import ConnectionWarmer, HttpTransport
 from exchanges.lighter import LighterClient
+from exchanges.market_metadata import MarketMetadataService
 from strategy.order_book_manager import OrderBookManager
 from strategy.websocket_manager import WebSocketManagerWrapper
 from strategy.position_tracker import PositionTracker
@@ -22,7 +25,8 @@ class ExtendedArb:
                  long_ex_threshold, 
                  short_ex_threshold, 
                  fill_timeout=60, 
-                 ticker="BTC"):
+                 ticker="BTC",
+                 lighter_account_index=0):
         
         self.logger = logging.getLogger(__name__)
         
@@ -33,6 +37,7 @@ class ExtendedArb:
         self.short_ex_threshold = Decimal(str(short_ex_threshold))
         self.fill_timeout = fill_timeout
         self.ticker = ticker
+        self.lighter_account_index = int(lighter_account_index)
         
         self.order_book_manager = OrderBookManager(self.logger)
         self.ws_wrapper = WebSocketManagerWrapper(self.order_book_manager, self.logger)
@@ -45,14 +50,24 @@ class ExtendedArb:
         })
         
         contract_id = 1 
-        self.lighter_client = LighterClient(lighter_api_key, lighter_private_key, lighter_api_key_index, self.logger)
+        self.lighter_client = LighterClient(lighter_api_key, lighter_private_key, lighter_api_key_index, self.logger,
+                                            account_index=self.lighter_account_index)
+
+        # 两个交易所的 REST 请求共用一个 keep-alive 连接池
+        self.http_transport = HttpTransport(logger=self.logger)
+        self.extended_client.set_http_transport(self.http_transport)
+        # 市场规则 (tick/最小下单量) 由 bot 持有的一个元数据服务提供, 在 run() 中创建
+        self.metadata = None
+        # 空闲期间定时 ping 下单域名, 保持连接常热并记录 RTT
+        self.connection_warmer = ConnectionWarmer(logger=self.logger)
         
         self.ws_wrapper.set_extended_config(ticker, extended_vault, extended_api_key)
         self.ws_wrapper.set_lighter_config(self.lighter_client, contract_id, 0)
         
         self.position_tracker = PositionTracker(
             ticker, self.extended_client, contract_id, 
-            "https://mainnet.zklighter.elliot.ai", 0, self.logger, maker_exchange='extended'
+            "https://mainnet.zklighter.elliot.ai", self.lighter_account_index, self.logger,
+            maker_exchange='extended'
         )
         self.data_logger = DataLogger('extended', ticker, self.logger)
 
@@ -63,44 +78,95 @@ class ExtendedArb:
         
         self.logger.info(f"🚀 Starting Extended-Lighter Arb for {self.ticker}")
         
-        await self.extended_client.connect()
-        await self.ws_wrapper.setup_extended_websocket()
-        self.ws_wrapper.start_lighter_websocket()
+        try:
+            await self.http_transport.attach_lighter(self.lighter_client.client)
+            self.metadata = MarketMetadataService(logger=self.logger, session=self.http_transport.session)
+            self.extended_client.set_metadata(self.metadata)
+            await self.extended_client.connect()
+            self.connection_warmer.add_url(
+                "extended", self.http_transport.session,
+                f"{self.extended_client.base_url}/account/{self.extended_client.vault_id}/positions",
+                headers=self.extended_client.headers)
+            # Lighter 通过签名客户端自身的 REST 连接池预热 (与 sendTx 相同)
+            self.connection_warmer.add_probe("lighter", self.lighter_client.ping)
+            self.connection_warmer.start()
+            await self.ws_wrapper.setup_extended_websocket()
+            self.ws_wrapper.start_lighter_websocket()
         
-        self.logger.info("⏳ Waiting for Order Books...")
-        while not self.order_book_manager.extended_order_book_ready:
-            await asyncio.sleep(1)
-        self.logger.info("✅ Extended Book Ready")
+            self.logger.info("⏳ Waiting for Order Books...")
+            while not self.order_book_manager.extended_order_book_ready:
+                await asyncio.sleep(1)
+            self.logger.info("✅ Extended Book Ready")
 
-        while not self.order_book_manager.lighter_order_book_ready:
-            await asyncio.sleep(1)
-        self.logger.info("✅ Lighter Book Ready")
+            while not self.order_book_manager.lighter_order_book_ready:
+                await asyncio.sleep(1)
+            self.logger.info("✅ Lighter Book Ready")
         
-        self.logger.info("✅ Trading Loop Started")
+            self.logger.info("✅ Trading Loop Started")
         
-        while True:
-            await asyncio.sleep(1)
-            try:
-                ex_bid, ex_ask = self.order_book_manager.get_extended_bbo()
-                l_bid, l_ask = self.order_book_manager.get_lighter_bbo()
+            # 仅在任一交易所盘口变化时唤醒, 监控输出限制为每秒一次
+            bbo_version = self.order_book_manager.bbo_version
+            last_print = 0.0
+            while True:
+                bbo_version = await self.order_book_manager.wait_for_bbo_change(bbo_version, timeout=1)
+                try:
+                    ex_bid, ex_ask = self.order_book_manager.get_extended_bbo()
+                    l_bid, l_ask = self.order_book_manager.get_lighter_bbo()
                 
-                t_now = datetime.datetime.now().strftime('%H:%M:%S')
+                    now = time.monotonic()
+                    should_print = now - last_print >= 1
+                    if should_print:
+                        last_print = now
+                    t_now = datetime.datetime.now().strftime('%H:%M:%S')
                 
-                if ex_bid and l_bid:
-                    # 全 Decimal 运算
-                    s_long = l_bid - ex_bid
-                    s_short = ex_ask - l_ask
+                    if self.order_book_manager.is_book_stale("lighter"):
+                        if should_print:
+                            print(f"[监控] {t_now} | Lighter 订单簿重新同步中...")
+                    elif ex_bid and l_bid:
+                        # 全 Decimal 运算
+                        s_long = l_bid - ex_bid
+                        s_short = ex_ask - l_ask
                     
-                    print(f"[监控] {t_now} | EX: {ex_bid}/{ex_ask} | LI: {l_bid}/{l_ask} | 差价: {s_long:.1f} / {s_short:.1f}")
+                        if should_print:
+                            print(f"[监控] {t_now} | EX: {ex_bid}/{ex_ask} | LI: {l_bid}/{l_ask} | 差价: {s_long:.1f} / {s_short:.1f}")
                     
-                    if s_long > self.long_ex_threshold:
-                         self.logger.info(f"📈 Long Opportunity! Spread: {s_long} > {self.long_ex_threshold}")
-                         # TODO: 添加实际下单调用
-                    elif s_short > self.short_ex_threshold:
-                         self.logger.info(f"📉 Short Opportunity! Spread: {s_short} > {self.short_ex_threshold}")
-                         # TODO: 添加实际下单调用
-                else:
-                    print(f"[监控] {t_now} | 等待数据... EX: {ex_bid} | LI: {l_bid}")
+                        if s_long > self.long_ex_threshold:
+                             self.logger.info(f"📈 Long Opportunity! Spread: {s_long} > {self.long_ex_threshold}")
+                             # TODO: 添加实际下单调用
+                        elif s_short > self.short_ex_threshold:
+                             self.logger.info(f"📉 Short Opportunity! Spread: {s_short} > {self.short_ex_threshold}")
+                             # TODO: 添加实际下单调用
+                    elif should_print:
+                        print(f"[监控] {t_now} | 等待数据... EX: {ex_bid} | LI: {l_bid}")
 
+                except Exception as e:
+                    self.logger.error(f"Loop Error: {e}")
+        finally:
+            await self._async_cleanup()
+
+    async def _async_cleanup(self):
+        """Stop the keep-warm pings and streams, then close the HTTP clients and the shared session."""
+        await self.connection_warmer.stop()
+        try:
+            self.ws_wrapper.shutdown()
+        except Exception as e:
+            self.logger.error(f"Error stopping WebSockets: {e}")
+        try:
+            await self.extended_client.disconnect()
+        except Exception as e:
+            self.logger.error(f"Error closing Extended client: {e}")
+        if self.metadata:
+            try:
+                await self.metadata.close()
             except Exception as e:
-                self.logger.error(f"Loop Error: {e}")
+                self.logger.error(f"Error closing metadata service: {e}")
+        try:
+            self.http_transport.detach_lighter(self.lighter_client.client)
+            await asyncio.wait_for(self.lighter_client.close(), timeout=2.0)
+        except Exception as e:
+            self.logger.error(f"Error closing Lighter client: {e}")
+        try:
+            await self.http_transport.close()
+        except Exception as e:
+            self.logger.error(f"Error closing HTTP transport: {e}")
+        await self.data_logger.aclose()
@@ -0,0 +1,93 @@
+"""Fixed-point integer prices and sizes for the market-data hot path."""
+from decimal import Decimal
+
+
+def _decimals_of(increment) -> int:
+    """Number of decimal places in a tick/lot increment such as Decimal('0.01')."""
+    exponent = Decimal(str(increment)).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+def _parse_scaled(value, decimals: int, multiplier: int) -> int:
+    """Parse ``value`` into an integer count of 10**-decimals units (truncating extra digits)."""
+    if type(value) is str:
+        if 'e' in value or 'E' in value:
+            return int(Decimal(value).scaleb(decimals))
+        negative = value.startswith('-')
+        if negative:
+            value = value[1:]
+        whole, _, frac = value.partition('.')
+        units = int(whole or '0') * multiplier
+        if frac and decimals:
+            units += int(frac[:decimals].ljust(decimals, '0'))
+        return -units if negative else units
+    if type(value) is int:
+        return value * multiplier
+    if type(value) is float:
+        return int(round(value * multiplier))
+    return int(Decimal(value).scaleb(decimals))
+
+
+class FixedPointScale:
+    """Integer representation of one market's prices and sizes.
+
+    A price of ``p`` is stored as ``p * price_multiplier`` (and likewise for
+    sizes), so book updates, spread math and threshold checks are plain int
+    operations. Decimals are only built at the API boundary.
+    """
+
+    __slots__ = ('price_decimals', 'size_decimals', 'price_multiplier', 'size_multiplier')
+
+    def __init__(self, price_decimals: int = 8, size_decimals: int = 8):
+        self.price_decimals = price_decimals
+        self.size_decimals = size_decimals
+        self.price_multiplier = 10 ** price_decimals
+        self.size_multiplier = 10 ** size_decimals
+
+    @classmethod
+    def from_increments(cls, price_increments, size_increments):
+        """Build a scale fine enough for every venue's tick and lot size.
+
+        Increments that are None are ignored, so partially known markets still
+        get a usable scale.
+        """
+        price_decimals = max((_decimals_of(i) for i in price_increments if i), default=8)
+        size_decimals = max((_decimals_of(i) for i in size_increments if i), default=8)
+        return cls(price_decimals, size_decimals)
+
+    def __repr__(self):
+        return f"FixedPointScale(price_decimals={self.price_decimals}, size_decimals={self.size_decimals})"
+
+    # --- to integer units ---
+
+    def price_to_int(self, value):
+        if value is None:
+            return None
+        return _parse_scaled(value, self.price_decimals, self.price_multiplier)
+
+    def size_to_int(self, value):
+        if value is None:
+            return None
+        return _parse_scaled(value, self.size_decimals, self.size_multiplier)
+
+    # --- back to Decimal / float (API boundary) ---
+
+    def price_to_decimal(self, units):
+        if units is None:
+            return None
+        return Decimal(units).scaleb(-self.price_decimals)
+
+    def size_to_decimal(self, units):
+        if units is None:
+            return None
+        return Decimal(units).scaleb(-self.size_decimals)
+
+    def price_to_float(self, units):
+        return units / self.price_multiplier if units else 0.0
+
+    def size_to_float(self, units):
+        return units / self.size_multiplier if units else 0.0
+
+    def rescale_price(self, units, multiplier: int) -> int:
+        """Convert price units to another venue's integer price (e.g. Lighter's price_multiplier)."""
+        return units * multiplier // self.price_multiplier
@@ -0,0 +1,188 @@
+"""Tick-to-trade latency recording: monotonic nanosecond stage stamps and HDR-style histograms."""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Tuple
+
+# Stage stamps a TradeState collects, in lifecycle order
+STAGES = ('md_recv', 'decision', 'order_send', 'order_ack', 'maker_fill',
+          'hedge_send', 'hedge_ack', 'hedge_fill')
+
+# (venue role, operation, from stage, to stage) recorded when a trade finishes.
+# Per-request round trips (order_ack, hedge_ack, cancel_ack) are recorded as they happen.
+TRADE_INTERVALS = (
+    ('strategy', 'tick_to_decision', 'md_recv', 'decision'),
+    ('strategy', 'decision_to_send', 'decision', 'order_send'),
+    ('maker', 'tick_to_trade', 'md_recv', 'order_send'),
+    ('maker', 'ack_to_fill', 'order_ack', 'maker_fill'),
+    ('hedge', 'fill_to_hedge_send', 'maker_fill', 'hedge_send'),
+    ('hedge', 'send_to_fill', 'hedge_send', 'hedge_fill'),
+    ('strategy', 'tick_to_hedge_fill', 'md_recv', 'hedge_fill'),
+)
+
+_PERCENTILES = (50, 90, 99, 99.9)
+
+
+def now_ns() -> int:
+    return time.monotonic_ns()
+
+
+def seconds_to_ns(monotonic_seconds) -> int:
+    """A time.monotonic() reading (e.g. a book receive time) on the monotonic_ns clock."""
+    return int(monotonic_seconds * 1_000_000_000)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond values, in the style of HdrHistogram.
+
+    Values below ``2 ** (sub_bucket_bits + 1)`` ns are counted exactly; above
+    that each power of two is split into ``2 ** sub_bucket_bits`` buckets, so
+    every reported value is within 1 / 2 ** sub_bucket_bits of the truth
+    (0.8% by default) over any range, with a bucket count that only grows
+    with the log of the largest value seen.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub_count = 1 << sub_bucket_bits
+        self._linear_limit = self._sub_count << 1
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value < self._linear_limit:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits - 1
+        return self._linear_limit + (shift - 1) * self._sub_count + (value >> shift) - self._sub_count
+
+    def _value_at(self, index):
+        """Highest value that falls into bucket ``index``."""
+        if index < self._linear_limit:
+            return index
+        shift, sub = divmod(index - self._linear_limit, self._sub_count)
+        shift += 1
+        return ((sub + self._sub_count + 1) << shift) - 1
+
+    def record(self, value_ns: int):
+        value_ns = max(0, int(value_ns))
+        index = self._index(value_ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ns
+        if self.min is None or value_ns < self.min:
+            self.min = value_ns
+        if self.max is None or value_ns > self.max:
+            self.max = value_ns
+
+    def percentile(self, p: float):
+        """Value at percentile ``p`` (0-100), None when empty."""
+        if not self.count:
+            return None
+        target = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self._value_at(index), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def summary(self) -> Dict:
+        """Count, min/mean/max and percentiles, all in microseconds."""
+        def us(ns):
+            return None if ns is None else round(ns / 1000, 1)
+        result = {'count': self.count, 'min_us': us(self.min), 'mean_us': us(self.mean)}
+        for p in _PERCENTILES:
+            result[f'p{p:g}_us'] = us(self.percentile(p))
+        result['max_us'] = us(self.max)
+        return result
+
+    def reset(self):
+        self.buckets.clear()
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+
+class LatencyRecorder:
+    """Histograms keyed by (venue, operation), dumped to the log and a JSON file.
+
+    ``record`` and ``record_trade`` are called from the event loop thread;
+    stage stamps themselves (``TradeState.stamp``) may be taken on any thread.
+    """
+
+    def __init__(self, name: str, logger=None, path: str = None, interval: float = 60.0):
+        self.name = name
+        self.logger = logger or logging.getLogger(__name__)
+        self.path = path or f"logs/{name}_latency.json"
+        self.interval = interval
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._task = None
+
+    def histogram(self, venue: str, operation: str) -> LatencyHistogram:
+        key = (venue, operation)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+    def record(self, venue: str, operation: str, elapsed_ns: int):
+        self.histogram(venue, operation).record(elapsed_ns)
+
+    def record_since(self, venue: str, operation: str, start_ns: int):
+        """Record the time from ``start_ns`` (a now_ns() stamp) until now."""
+        self.record(venue, operation, now_ns() - start_ns)
+
+    def record_trade(self, trade, maker_venue: str, hedge_venue: str = 'lighter'):
+        """Record the stage-to-stage intervals a finished trade has stamps for."""
+        stamps = trade.stamps
+        venues = {'strategy': 'strategy', 'maker': maker_venue, 'hedge': hedge_venue}
+        for role, operation, start, end in TRADE_INTERVALS:
+            if start in stamps and end in stamps:
+                self.record(venues[role], operation, stamps[end] - stamps[start])
+
+    def snapshot(self) -> Dict:
+        return {f"{venue}.{operation}": histogram.summary()
+                for (venue, operation), histogram in sorted(self.histograms.items())}
+
+    def dump(self):
+        """Log every histogram and write the snapshot to ``path``."""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return
+        for key, stats in snapshot.items():
+            self.logger.info(
+                f"⏱️ {key}: n={stats['count']} p50={stats['p50_us']}us p99={stats['p99_us']}us "
+                f"p99.9={stats['p99.9_us']}us max={stats['max_us']}us")
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'name': self.name, 'time': time.time(), 'histograms': snapshot}, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not write latency report {self.path}: {e}")
+
+    def start(self):
+        """Dump every ``interval`` seconds in the background."""
+        if self.interval and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.dump()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
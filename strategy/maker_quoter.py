@@ -0,0 +1,88 @@
+"""Post-only quote management: target pricing, requote decisions and queue tracking."""
+import time
+
+
+class MakerQuote:
+    """One resting post-only order, with prices and sizes in book integer units."""
+
+    __slots__ = ('side', 'price', 'size', 'order_id', 'placed_at', 'queue_ahead')
+
+    def __init__(self, side: str, price: int, size: int, order_id=None, queue_ahead: int = 0):
+        self.side = side
+        self.price = price
+        self.size = size
+        self.order_id = order_id
+        self.placed_at = time.monotonic()
+        # Size resting ahead of us at our price (estimated from the local book)
+        self.queue_ahead = queue_ahead
+
+
+class MakerQuoter:
+    """Keeps one resting maker order per side pinned to the top of the local book.
+
+    The quote target is one tick inside the opposite side (``best_ask - tick``
+    for a buy, ``best_bid + tick`` for a sell), the same rule the placement path has always used.
+    A resting order is only replaced when the target has moved by at least
+    ``requote_ticks``, not more often than ``min_requote_interval`` seconds and
+    at most ``max_requotes`` times per quote, which bounds the order rate.
+    """
+
+    def __init__(self, order_book_manager, venue: str = "edgex", requote_ticks: int = 1,
+                 min_requote_interval: float = 0.25, max_requotes: int = 20):
+        self.order_book_manager = order_book_manager
+        self.venue = venue
+        self.requote_ticks = requote_ticks
+        self.min_requote_interval = min_requote_interval
+        self.max_requotes = max_requotes
+
+        self.quotes = {'buy': None, 'sell': None}
+        self.requotes = {'buy': 0, 'sell': 0}
+
+    def _resting_side(self, side: str):
+        # A maker buy rests on the bids, a maker sell on the asks
+        book = self.order_book_manager.get_book(self.venue)
+        return book.bids if side == 'buy' else book.asks
+
+    def target_price(self, side: str, tick: int):
+        """Best non-crossing post-only price for ``side`` in price units, None if the book is empty."""
+        bid, ask = self.order_book_manager.get_bbo_ticks(self.venue)
+        if bid is None or ask is None:
+            return None
+        return ask - tick if side == 'buy' else bid + tick
+
+    def start(self, side: str, price: int, size: int, order_id=None) -> MakerQuote:
+        """Track a freshly placed order; everything already at ``price`` is queued ahead of it."""
+        quote = MakerQuote(side, price, size, order_id, self._resting_side(side).size_at(price))
+        if self.quotes[side] is None:
+            self.requotes[side] = 0
+        self.quotes[side] = quote
+        return quote
+
+    def update_queue(self, quote: MakerQuote) -> int:
+        """Shrink the queue-ahead estimate as the level trades or cancels; returns it."""
+        level = self._resting_side(quote.side).size_at(quote.price)
+        # Once our order is in the book the level includes it; the rest may be ahead
+        others = level - quote.size if level >= quote.size else level
+        if others < quote.queue_ahead:
+            quote.queue_ahead = max(0, others)
+        return quote.queue_ahead
+
+    def requote_price(self, quote: MakerQuote, tick: int, now=None):
+        """New price if ``quote`` should be replaced, otherwise None."""
+        if self.requotes[quote.side] >= self.max_requotes:
+            return None
+        now = now or time.monotonic()
+        if now - quote.placed_at < self.min_requote_interval:
+            return None
+        target = self.target_price(quote.side, tick)
+        if target is None or abs(target - quote.price) < self.requote_ticks * tick:
+            return None
+        return target
+
+    def record_requote(self, side: str):
+        self.requotes[side] += 1
+
+    def finish(self, side: str):
+        """Forget the resting order on ``side`` (filled, cancelled or abandoned)."""
+        self.quotes[side] = None
+        self.requotes[side] = 0
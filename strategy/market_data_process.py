@@ -0,0 +1,195 @@
+"""Decode the public order book streams in a separate process and share the books via shared memory."""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import uuid
+
+from .fixed_point import FixedPointScale
+from .order_book_manager import OrderBookManager
+from .shared_book import SharedBookReader, SharedBookWriter
+
+
+def _publisher_main(name, venues, depth, price_decimals, size_decimals, notify):
+    """Entry point of the market-data process."""
+    logger = logging.getLogger("market_data")
+    logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+    logger.addHandler(handler)
+    logger.propagate = False
+    # The parent decides when we stop (SIGTERM); Ctrl+C reaches the whole process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_run_publisher(name, venues, depth, FixedPointScale(price_decimals, size_decimals), logger,
+                               notify))
+
+
+async def _run_publisher(name, venues, depth, scale, logger, notify):
+    from .websocket_manager import EdgexStreamHub, WebSocketManagerWrapper
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+
+    writer = SharedBookWriter(name, venues, depth, create=False)
+    order_book_manager = OrderBookManager(logger, scale)
+
+    # One wakeup byte per loop iteration with updates, however many were published in it
+    notify_fd = notify.fileno()
+    os.set_blocking(notify_fd, False)
+    wake_pending = False
+
+    def wake():
+        nonlocal wake_pending
+        wake_pending = False
+        try:
+            os.write(notify_fd, b'\0')
+        except BlockingIOError:
+            pass  # pipe full: the parent has unread wakeups already
+        except OSError:
+            stop.set()  # parent gone
+
+    def publish(venue):
+        nonlocal wake_pending
+        writer.publish(venue, order_book_manager.books[venue], order_book_manager.recv_time[venue],
+                       order_book_manager.exchange_ts[venue], order_book_manager.update_seq[venue],
+                       order_book_manager.stale[venue])
+        if not wake_pending:
+            wake_pending = True
+            loop.call_soon(wake)
+    order_book_manager.on_book_update = publish
+
+    streams = WebSocketManagerWrapper(order_book_manager, logger)
+    if "lighter" in venues:
+        streams.set_lighter_config(None, venues["lighter"], None)
+        streams.start_lighter_websocket()
+    if "edgex" in venues:
+        from edgex_sdk import WebSocketManager
+        ws_manager = WebSocketManager(
+            base_url=os.getenv('EDGEX_WS_URL', 'wss://quote.edgex.exchange'),
+            account_id=int(os.getenv('EDGEX_ACCOUNT_ID')),
+            stark_pri_key=os.getenv('EDGEX_STARK_PRIVATE_KEY'))
+        streams.set_edgex_ws_manager(ws_manager, venues["edgex"])
+        streams.edgex_hub = EdgexStreamHub(ws_manager, logger)
+        streams.setup_edgex_depth_stream(loop)
+    if "extended" in venues:
+        streams.set_extended_config(venues["extended"])
+        await streams.setup_extended_websocket()
+
+    logger.info(f"✅ Market data process publishing {', '.join(venues)} to {name}")
+    try:
+        await stop.wait()
+    finally:
+        streams.shutdown()
+        writer.close()
+
+
+class MarketDataProcess:
+    """Runs the book decoders for ``venues`` in a child process and mirrors the books locally.
+
+    ``venues`` maps venue name to its market id (Lighter market index, edgeX
+    contract id, Extended ticker). The parent owns the shared segment; the
+    child publishes every applied update into it and writes a wakeup byte to
+    a pipe. ``start`` registers that pipe with the event loop (add_reader);
+    on each wakeup the mirror checks the segment's seqlock sequences and
+    loads changed books into the given OrderBookManager, so the strategy
+    keeps using its usual book API while decoding happens on another core,
+    and an idle market costs no wakeups. The child is checked for liveness
+    every ``check_interval`` seconds.
+    """
+
+    def __init__(self, venues, scale: FixedPointScale, logger=None, depth: int = 10,
+                 check_interval: float = 1.0):
+        self.venues = dict(venues)
+        self.scale = scale
+        self.depth = depth
+        self.check_interval = check_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.name = f"arb_md_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self.writer = None
+        self.reader = None
+        self.process = None
+        self.mirror_task = None
+        self.stop_flag = False
+        self._notify = None
+        self._wakeup = None
+
+    def start(self, order_book_manager):
+        self.writer = SharedBookWriter(self.name, self.venues, self.depth, self.scale)
+        ctx = multiprocessing.get_context('spawn')
+        self._notify, child_notify = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=_publisher_main, name="arb-market-data",
+            args=(self.name, self.venues, self.depth, self.scale.price_decimals, self.scale.size_decimals,
+                  child_notify))
+        self.process.start()
+        child_notify.close()
+        self.reader = SharedBookReader(self.name, self.venues, self.depth)
+
+        self._wakeup = asyncio.Event()
+        os.set_blocking(self._notify.fileno(), False)
+        asyncio.get_running_loop().add_reader(self._notify.fileno(), self._on_notify)
+        self.mirror_task = asyncio.create_task(self._mirror(order_book_manager))
+        self.logger.info(f"✅ Market data process started (pid {self.process.pid})")
+
+    def _on_notify(self):
+        try:
+            data = os.read(self._notify.fileno(), 4096)  # drain every pending wakeup
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            # EOF: the child exited; stop watching and let the mirror notice
+            asyncio.get_running_loop().remove_reader(self._notify.fileno())
+        self._wakeup.set()
+
+    async def _mirror(self, order_book_manager):
+        reader = self.reader
+        wakeup = self._wakeup
+        versions = dict.fromkeys(self.venues, 0)
+        while not self.stop_flag:
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            for venue in self.venues:
+                version = reader.version(venue)
+                if version == versions[venue] or version & 1:
+                    continue
+                view = reader.read(venue)
+                if view is None:
+                    continue
+                versions[venue] = view.version
+                order_book_manager.load_book(venue, view.bids, view.asks, view.recv_time,
+                                             view.exchange_ts, view.update_seq, view.stale)
+            if not self.process.is_alive():
+                self.logger.error(f"❌ Market data process exited with code {self.process.exitcode}")
+                for venue in self.venues:
+                    order_book_manager.mark_book_stale(venue, "market data process exited")
+                return
+
+    def stop(self):
+        self.stop_flag = True
+        if self.mirror_task:
+            self.mirror_task.cancel()
+        if self._notify is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(self._notify.fileno())
+            except (RuntimeError, ValueError, OSError):
+                pass
+            self._notify.close()
+            self._notify = None
+        if self.process and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=3)
+            if self.process.is_alive():
+                self.process.kill()
+        if self.reader:
+            self.reader.close()
+        if self.writer:
+            self.writer.close(unlink=True)
+            self.writer = None
@@ -0,0 +1,185 @@
+"""Run the edgeX/Lighter arbitrage for several tickers in one process over shared connections."""
+import asyncio
+import logging
+import signal
+import sys
+from typing import List
+
+from exchanges.http_transport import HttpTransport
+from exchanges.lighter_custom_websocket import LighterCustomWebSocketManager
+from exchanges.market_metadata import MarketMetadataService
+from exchanges.metrics import MetricsServer
+
+from .edgex_arb import EdgexArb
+from .websocket_manager import EdgexStreamHub
+
+
+class MultiMarketRunner:
+    """One EdgexArb per ticker sharing a single set of exchange connections.
+
+    The edgeX REST client, the edgeX private/public stream pair, the Lighter
+    signer (and so its nonce sequence) and one Lighter stream connection are
+    created once and injected into every per-ticker bot. Each bot keeps its own
+    order books, order manager, position tracker and logs.
+
+    With more than one ticker the Lighter hedges are signed when they are
+    sent instead of pre-signed while the maker order rests (see
+    OrderManager.stage_hedges), since the markets share one nonce sequence.
+    """
+
+    def __init__(self, tickers: List[str], **bot_kwargs):
+        self.tickers = tickers
+        self.bots = [EdgexArb(ticker=ticker, **bot_kwargs) for ticker in tickers]
+        self.metrics_port = bot_kwargs.get('metrics_port')
+        self.metrics_server = None
+        self.stop_flag = False
+        self.edgex_hub = None
+        self.metadata = None
+        self.http_transport = None
+        self.connection_warmer = None
+        self.lighter_ws = None
+        self.lighter_ws_task = None
+
+        self.logger = logging.getLogger("arbitrage_multi")
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+            self.logger.addHandler(handler)
+            self.logger.propagate = False
+
+    async def _setup_shared_connections(self):
+        """Create the shared clients on the first bot and hand them to the others."""
+        owner = self.bots[0]
+        lighter_client = owner.initialize_lighter_client()
+        edgex_client = owner.initialize_edgex_client()
+
+        self.edgex_hub = EdgexStreamHub(owner.edgex_ws_manager, self.logger)
+        # One keep-alive connection pool for every market's REST traffic
+        self.http_transport = HttpTransport(logger=self.logger)
+        await self.http_transport.attach_edgex(edgex_client)
+        await self.http_transport.attach_lighter(lighter_client.client)
+        # One metadata fetch (and disk cache) for all tickers
+        self.metadata = MarketMetadataService(owner.lighter_base_url, edgex_client, logger=self.logger,
+                                              session=self.http_transport.session)
+        self.metadata.start_refresh()
+
+        class Config:
+            multi_market = True
+            account_index = owner.account_index
+            lighter_client = owner.lighter_client
+        self.lighter_ws = LighterCustomWebSocketManager(Config())
+        self.lighter_ws.set_logger(self.logger)
+
+        for bot in self.bots:
+            bot.lighter_client = lighter_client
+            bot.edgex_client = edgex_client
+            bot.edgex_ws_manager = owner.edgex_ws_manager
+            bot.owns_connections = False
+            bot.metadata = self.metadata
+            bot.http_transport = self.http_transport
+            bot.ws_manager.set_shared_streams(self.edgex_hub, self.lighter_ws)
+            if len(self.bots) > 1:
+                # One Lighter nonce sequence for every market: a hedge staged by one
+                # market would hold a nonce while the others keep signing past it
+                bot.order_manager.stage_hedges = False
+
+        self.lighter_ws_task = asyncio.create_task(self.lighter_ws.connect())
+        self.connection_warmer = owner.create_connection_warmer()
+        self.connection_warmer.start()
+
+        if self.metrics_port:
+            # One endpoint for every market in this process
+            try:
+                self.metrics_server = MetricsServer(self.metrics_port, logger=self.logger)
+                await self.metrics_server.start()
+            except OSError as e:
+                self.logger.error(f"❌ Failed to start metrics server on port {self.metrics_port}: {e}")
+                self.metrics_server = None
+        self.logger.info(f"✅ Shared connections ready for {', '.join(self.tickers)}")
+
+    def shutdown(self, signum=None, frame=None):
+        if self.stop_flag:
+            return
+        self.stop_flag = True
+        self.logger.info("🛑 Stopping all markets...")
+        for bot in self.bots:
+            bot.shutdown()
+
+    def setup_signal_handlers(self):
+        signal.signal(signal.SIGINT, self.shutdown)
+        signal.signal(signal.SIGTERM, self.shutdown)
+
+    async def _async_cleanup(self):
+        # Per-market cleanup first (cancels resting maker orders), then the shared connections
+        await asyncio.gather(*(bot._async_cleanup() for bot in self.bots), return_exceptions=True)
+
+        if self.connection_warmer:
+            await self.connection_warmer.stop()
+
+        if self.metrics_server:
+            await self.metrics_server.stop()
+
+        if self.lighter_ws:
+            self.lighter_ws.disconnect()
+        if self.lighter_ws_task:
+            self.lighter_ws_task.cancel()
+
+        if self.metadata:
+            try:
+                await self.metadata.close()
+            except Exception as e:
+                self.logger.error(f"Error closing metadata service: {e}")
+
+        owner = self.bots[0]
+        try:
+            if owner.edgex_client:
+                self.http_transport.detach_edgex(owner.edgex_client)
+                await asyncio.wait_for(owner.edgex_client.close(), timeout=2.0)
+                self.logger.info("🔌 EdgeX client closed")
+        except asyncio.TimeoutError:
+            self.logger.warning("⚠️ Timeout closing EdgeX client, forcing shutdown")
+        except Exception as e:
+            self.logger.error(f"Error closing EdgeX client: {e}")
+
+        await owner._close_lighter_client()
+
+        if self.http_transport:
+            try:
+                await self.http_transport.close()
+            except Exception as e:
+                self.logger.error(f"Error closing HTTP transport: {e}")
+
+        try:
+            if self.edgex_hub:
+                self.edgex_hub.disconnect()
+        except Exception as e:
+            self.logger.error(f"Error disconnecting EdgeX WebSocket manager: {e}")
+
+    async def run(self):
+        """Run every market's trading loop until interrupted."""
+        self.setup_signal_handlers()
+
+        try:
+            await self._setup_shared_connections()
+        except Exception as e:
+            self.logger.error(f"❌ Failed to initialize shared connections: {e}")
+            return
+
+        try:
+            results = await asyncio.gather(*(bot.trading_loop() for bot in self.bots),
+                                           return_exceptions=True)
+            for ticker, result in zip(self.tickers, results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"❌ {ticker} trading loop failed: {result}")
+        except asyncio.CancelledError:
+            self.logger.info("\n🛑 Task cancelled...")
+        finally:
+            self.logger.info("🔄 Cleaning up...")
+            self.shutdown()
+            try:
+                await asyncio.wait_for(self._async_cleanup(), timeout=5.0)
+            except asyncio.TimeoutError:
+                self.logger.warning("⚠️ Cleanup timeout, forcing exit")
+            except Exception as e:
+                self.logger.error(f"Error during cleanup: {e}")
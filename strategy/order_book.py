@@ -0,0 +1,170 @@
+"""Incremental L2 order book with sorted price-level storage."""
+from bisect import bisect_left, bisect_right
+
+
+class BookSide:
+    """One side of an L2 book.
+
+    Prices are kept in an ascending list (binary search on every update) and
+    sizes in a dict keyed by price, so a size change on an existing level is a
+    dict write and only level insertion/removal touches the sorted list. That
+    insert/delete is an O(n) memmove rather than O(log n), but for the few
+    hundred levels a venue streams it is cheaper than any pure-Python tree.
+    """
+
+    __slots__ = ('is_bid', '_prices', '_sizes')
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self._prices = []
+        self._sizes = {}
+
+    def __len__(self):
+        return len(self._prices)
+
+    def clear(self):
+        self._prices.clear()
+        self._sizes.clear()
+
+    def set_level(self, price, size):
+        """Insert, update or (size <= 0) remove one price level."""
+        sizes = self._sizes
+        if size <= 0:
+            if price in sizes:
+                del sizes[price]
+                prices = self._prices
+                del prices[bisect_left(prices, price)]
+            return
+
+        if price not in sizes:
+            prices = self._prices
+            prices.insert(bisect_left(prices, price), price)
+        sizes[price] = size
+
+    def add_to_level(self, price, change):
+        """Adjust one level by a signed size ``change`` (for streams that send size diffs)."""
+        self.set_level(price, self._sizes.get(price, 0) + change)
+
+    def best(self):
+        """Return (price, size) of the best level, or None if the side is empty."""
+        prices = self._prices
+        if not prices:
+            return None
+        price = prices[-1] if self.is_bid else prices[0]
+        return price, self._sizes[price]
+
+    def best_price(self):
+        prices = self._prices
+        if not prices:
+            return None
+        return prices[-1] if self.is_bid else prices[0]
+
+    def levels(self, n=None):
+        """Return up to ``n`` levels as (price, size), best first."""
+        prices = self._prices
+        count = len(prices)
+        if n is None or n > count:
+            n = count
+        selected = prices[count - n:][::-1] if self.is_bid else prices[:n]
+        sizes = self._sizes
+        return [(p, sizes[p]) for p in selected]
+
+    def size_at(self, price):
+        return self._sizes.get(price, 0)
+
+    def depth_to(self, limit_price):
+        """Total size available at prices equal to or better than ``limit_price``."""
+        prices = self._prices
+        sizes = self._sizes
+        if self.is_bid:
+            selected = prices[bisect_left(prices, limit_price):]
+        else:
+            selected = prices[:bisect_right(prices, limit_price)]
+        return sum((sizes[p] for p in selected), 0)
+
+    def vwap(self, quantity):
+        """Notional needed to fill ``quantity`` against this side.
+
+        Returns (notional, worst_price) or None when the book is not deep enough;
+        the VWAP is ``notional / quantity``.
+        """
+        if quantity <= 0:
+            return None
+        prices = self._prices
+        sizes = self._sizes
+        order = reversed(prices) if self.is_bid else prices
+
+        remaining = quantity
+        notional = 0
+        for price in order:
+            take = sizes[price]
+            if take > remaining:
+                take = remaining
+            notional += price * take
+            remaining -= take
+            if remaining <= 0:
+                return notional, price
+        return None
+
+
+class L2OrderBook:
+    """Per-venue L2 book that applies snapshots and incremental deltas."""
+
+    __slots__ = ('venue', 'bids', 'asks')
+
+    def __init__(self, venue: str):
+        self.venue = venue
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+
+    @property
+    def ready(self):
+        return len(self.bids) > 0 and len(self.asks) > 0
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
+
+    def apply_snapshot(self, bids, asks):
+        """Replace the whole book with ``bids``/``asks`` iterables of (price, size)."""
+        self.clear()
+        self.apply_delta(bids, asks)
+
+    def apply_delta(self, bids, asks):
+        """Apply changed levels; a size of zero removes the level."""
+        set_bid = self.bids.set_level
+        for price, size in bids:
+            set_bid(price, size)
+        set_ask = self.asks.set_level
+        for price, size in asks:
+            set_ask(price, size)
+
+    def apply_increments(self, bids, asks):
+        """Apply signed size changes; a level whose size drops to zero is removed."""
+        add_bid = self.bids.add_to_level
+        for price, change in bids:
+            add_bid(price, change)
+        add_ask = self.asks.add_to_level
+        for price, change in asks:
+            add_ask(price, change)
+
+    def best_bid(self):
+        return self.bids.best_price()
+
+    def best_ask(self):
+        return self.asks.best_price()
+
+    def side(self, side: str):
+        """Book side hit by a taker order: 'buy' walks the asks, 'sell' walks the bids."""
+        return self.asks if side.lower() == 'buy' else self.bids
+
+    def vwap(self, side: str, quantity):
+        """VWAP for a taker order of ``quantity`` on ``side`` ('buy' or 'sell')."""
+        result = self.side(side).vwap(quantity)
+        return result[0] / quantity if result else None
+
+    def to_dict(self, depth=None):
+        return {
+            'bids': self.bids.levels(depth),
+            'asks': self.asks.levels(depth),
+        }
@@ -1,59 +1,311 @@
+import asyncio
+import threading
+import time
 from decimal import Decimal
 import logging
 
+from exchanges.metrics import BBO_UPDATES
+
+from .fixed_point import FixedPointScale
+from .order_book import L2OrderBook
+
+
 class OrderBookManager:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, scale=None):
+        # Books and BBOs hold integer price/size units of ``self.scale``;
+        # the get_*_bbo() accessors convert back to Decimal.
+        self.scale = scale or FixedPointScale()
         self.extended_bbo = {"bid": None, "ask": None}
         self.lighter_bbo = {"bid": None, "ask": None}
         self.edgex_bbo = {"bid": None, "ask": None}
         self.logger = logger or logging.getLogger(__name__)
 
+        # Full-depth books, fed by snapshot/delta streams
+        self.books = {
+            "extended": L2OrderBook("extended"),
+            "lighter": L2OrderBook("lighter"),
+            "edgex": L2OrderBook("edgex"),
+        }
+        self._bbos = {
+            "extended": self.extended_bbo,
+            "lighter": self.lighter_bbo,
+            "edgex": self.edgex_bbo,
+        }
+        # Venues whose book may have missed updates (sequence gap, bad frame).
+        # Deltas are dropped until the next full snapshot resyncs the book.
+        self.stale = {"extended": False, "lighter": False, "edgex": False}
+
+        # Freshness per venue: local monotonic receive time of the last update,
+        # the exchange's own timestamp (ms) and the stream sequence number.
+        self.recv_time = {"extended": None, "lighter": None, "edgex": None}
+        self.exchange_ts = {"extended": None, "lighter": None, "edgex": None}
+        self.update_seq = {"extended": None, "lighter": None, "edgex": None}
+
+        # BBO change notifications: per-venue sequence numbers plus a global
+        # version that waiters block on until either top of book moves.
+        self.bbo_seq = {"extended": 0, "lighter": 0, "edgex": 0}
+        self.bbo_version = 0
+        self._bbo_counters = {venue: BBO_UPDATES.labels(venue=venue) for venue in self.bbo_seq}
+        self._bbo_waiters = []
+        self._loop = None
+        self._loop_thread_id = None
+
+        # Called with the venue after every applied update or stale flag change
+        # (the market-data process publishes the book to shared memory from here)
+        self.on_book_update = None
+
     @property
     def extended_order_book_ready(self):
-        return self.extended_bbo["bid"] is not None and self.extended_bbo["ask"] is not None
+        return (self.extended_bbo["bid"] is not None and self.extended_bbo["ask"] is not None
+                and not self.stale["extended"])
 
     @property
     def lighter_order_book_ready(self):
-        return self.lighter_bbo["bid"] is not None and self.lighter_bbo["ask"] is not None
+        return (self.lighter_bbo["bid"] is not None and self.lighter_bbo["ask"] is not None
+                and not self.stale["lighter"])
 
     @property
     def edgex_order_book_ready(self):
-        return self.edgex_bbo["bid"] is not None and self.edgex_bbo["ask"] is not None
+        return (self.edgex_bbo["bid"] is not None and self.edgex_bbo["ask"] is not None
+                and not self.stale["edgex"])
 
-    def _to_decimal(self, value):
-        if value is None:
-            return None
-        try:
-            return Decimal(str(value))
-        except:
+    def set_scale(self, scale):
+        """Switch to a market-specific fixed-point scale; clears all books."""
+        self.scale = scale
+        for venue, book in self.books.items():
+            book.clear()
+            self._bbos[venue]["bid"] = None
+            self._bbos[venue]["ask"] = None
+
+    # --- Staleness ---
+
+    def mark_book_stale(self, venue, reason=""):
+        """Flag ``venue``'s book as untrustworthy until the next snapshot."""
+        if self.stale[venue]:
+            return
+        self.stale[venue] = True
+        self.logger.warning(f"⚠️ {venue} order book marked stale: {reason}")
+        # Wake the trading loops so they stop acting on this venue immediately
+        self._notify_bbo_change(venue)
+        if self.on_book_update:
+            self.on_book_update(venue)
+
+    def is_book_stale(self, venue):
+        return self.stale[venue]
+
+    # --- Freshness ---
+
+    def _stamp(self, venue, exchange_ts, seq):
+        self.recv_time[venue] = time.monotonic()
+        self.exchange_ts[venue] = exchange_ts
+        self.update_seq[venue] = seq
+
+    def get_book_age(self, venue, now=None):
+        """Seconds since ``venue`` last delivered an update, None if it never did."""
+        recv = self.recv_time[venue]
+        if recv is None:
             return None
+        return (now or time.monotonic()) - recv
 
-    def update_extended_bbo(self, bid, ask):
-        try:
-            self.extended_bbo["bid"] = self._to_decimal(bid)
-            self.extended_bbo["ask"] = self._to_decimal(ask)
-        except Exception:
-            pass
+    def is_fresh(self, max_age, *venues, now=None):
+        """True if every venue in ``venues`` updated within the last ``max_age`` seconds."""
+        now = now or time.monotonic()
+        recv_time = self.recv_time
+        for venue in venues:
+            recv = recv_time[venue]
+            if recv is None or now - recv > max_age:
+                return False
+        return True
+
+    def get_update_info(self, venue):
+        """(monotonic receive time, exchange timestamp, sequence) of ``venue``'s last update."""
+        return self.recv_time[venue], self.exchange_ts[venue], self.update_seq[venue]
+
+    def _convert_levels(self, levels):
+        """Convert raw (price, size) pairs to integer units, skipping malformed entries."""
+        price_to_int = self.scale.price_to_int
+        size_to_int = self.scale.size_to_int
+        converted = []
+        for price, size in levels:
+            try:
+                converted.append((price_to_int(price), size_to_int(size)))
+            except (TypeError, ValueError, ArithmeticError):
+                continue
+        return converted
+
+    # --- L2 book updates ---
+
+    def apply_book_snapshot(self, venue, bids, asks, exchange_ts=None, seq=None):
+        """Replace ``venue``'s book with full-depth (price, size) levels."""
+        book = self.books[venue]
+        book.apply_snapshot(self._convert_levels(bids), self._convert_levels(asks))
+        if self.stale[venue]:
+            self.stale[venue] = False
+            self.logger.info(f"✅ {venue} order book resynced from snapshot")
+            self._notify_bbo_change(venue)
+        self._stamp(venue, exchange_ts, seq)
+        self._sync_bbo(venue, book)
+        if self.on_book_update:
+            self.on_book_update(venue)
+
+    def apply_book_delta(self, venue, bids, asks, exchange_ts=None, seq=None):
+        """Apply changed (price, size) levels to ``venue``'s book; size 0 removes a level."""
+        if self.stale[venue]:
+            return
+        book = self.books[venue]
+        book.apply_delta(self._convert_levels(bids), self._convert_levels(asks))
+        self._stamp(venue, exchange_ts, seq)
+        self._sync_bbo(venue, book)
+        if self.on_book_update:
+            self.on_book_update(venue)
+
+    def apply_book_increments(self, venue, bids, asks, exchange_ts=None, seq=None):
+        """Apply signed (price, size change) levels to ``venue``'s book."""
+        if self.stale[venue]:
+            return
+        book = self.books[venue]
+        book.apply_increments(self._convert_levels(bids), self._convert_levels(asks))
+        self._stamp(venue, exchange_ts, seq)
+        self._sync_bbo(venue, book)
+        if self.on_book_update:
+            self.on_book_update(venue)
 
-    def update_lighter_bbo(self, bid, ask):
+    def load_book(self, venue, bids, asks, recv_time=None, exchange_ts=None, seq=None, stale=False):
+        """Replace ``venue``'s book with levels already in integer units (e.g. from a
+        SharedBookReader), keeping the publisher's receive time and stale flag."""
+        book = self.books[venue]
+        book.apply_snapshot(bids, asks)
+        if self.stale[venue] != stale:
+            self.stale[venue] = stale
+            self._notify_bbo_change(venue)
+        self.recv_time[venue] = recv_time
+        self.exchange_ts[venue] = exchange_ts
+        self.update_seq[venue] = seq
+        self._sync_bbo(venue, book)
+
+    def _sync_bbo(self, venue, book):
+        self._set_bbo(venue, book.best_bid(), book.best_ask())
+
+    def _set_bbo(self, venue, bid, ask):
+        bbo = self._bbos[venue]
+        if bbo["bid"] == bid and bbo["ask"] == ask:
+            return
+        bbo["bid"] = bid
+        bbo["ask"] = ask
+        self._notify_bbo_change(venue)
+
+    # --- BBO change notifications ---
+
+    def _notify_bbo_change(self, venue):
+        self.bbo_seq[venue] += 1
+        self.bbo_version += 1
+        self._bbo_counters[venue].inc()
+        if not self._bbo_waiters:
+            return
+        # The edgeX SDK delivers WebSocket callbacks on its own threads
+        if self._loop is not None and threading.get_ident() != self._loop_thread_id:
+            self._loop.call_soon_threadsafe(self._wake_bbo_waiters)
+        else:
+            self._wake_bbo_waiters()
+
+    def _wake_bbo_waiters(self):
+        waiters = self._bbo_waiters
+        self._bbo_waiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait_for_bbo_change(self, last_version, timeout=None):
+        """Wait until the BBO of any venue changes after ``last_version``.
+
+        Returns the current version immediately if it already differs, otherwise
+        blocks until the next change or ``timeout`` seconds and returns the
+        (possibly unchanged) version.
+        """
+        if self.bbo_version != last_version:
+            return self.bbo_version
+
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+
+        waiter = self._loop.create_future()
+        self._bbo_waiters.append(waiter)
         try:
-            self.lighter_bbo["bid"] = self._to_decimal(bid)
-            self.lighter_bbo["ask"] = self._to_decimal(ask)
-        except Exception:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
             pass
+        finally:
+            if waiter in self._bbo_waiters:
+                self._bbo_waiters.remove(waiter)
+        return self.bbo_version
 
-    def update_edgex_bbo(self, bid, ask):
+    # --- Top-of-book updates (BBO-only feeds) ---
+
+    def _update_bbo(self, venue, bid, ask, exchange_ts, seq):
+        # 先转换价格再记录接收时间和序号: 错误的价格不能让旧盘口显得是最新的
+        # (None 表示该侧没有报价)
+        price_to_int = self.scale.price_to_int
         try:
-            self.edgex_bbo["bid"] = self._to_decimal(bid)
-            self.edgex_bbo["ask"] = self._to_decimal(ask)
-        except Exception:
-            pass
+            bid_units = None if bid is None else price_to_int(bid)
+            ask_units = None if ask is None else price_to_int(ask)
+        except Exception as e:
+            self.logger.warning(f"Ignoring {venue} BBO update {bid}/{ask}: {e}")
+            return
+        self._stamp(venue, exchange_ts, seq)
+        self._set_bbo(venue, bid_units, ask_units)
+
+    def update_extended_bbo(self, bid, ask, exchange_ts=None, seq=None):
+        self._update_bbo("extended", bid, ask, exchange_ts, seq)
+
+    def update_lighter_bbo(self, bid, ask, exchange_ts=None, seq=None):
+        self._update_bbo("lighter", bid, ask, exchange_ts, seq)
+
+    def update_edgex_bbo(self, bid, ask, exchange_ts=None, seq=None):
+        self._update_bbo("edgex", bid, ask, exchange_ts, seq)
+
+    def get_bbo_ticks(self, venue):
+        """(bid, ask) of ``venue`` in integer price units, for hot-path comparisons."""
+        bbo = self._bbos[venue]
+        return bbo["bid"], bbo["ask"]
+
+    def _bbo_as_decimal(self, venue):
+        bbo = self._bbos[venue]
+        to_decimal = self.scale.price_to_decimal
+        return to_decimal(bbo["bid"]), to_decimal(bbo["ask"])
 
     def get_extended_bbo(self):
-        return self.extended_bbo["bid"], self.extended_bbo["ask"]
+        return self._bbo_as_decimal("extended")
 
     def get_lighter_bbo(self):
-        return self.lighter_bbo["bid"], self.lighter_bbo["ask"]
+        return self._bbo_as_decimal("lighter")
 
     def get_edgex_bbo(self):
-        return self.edgex_bbo["bid"], self.edgex_bbo["ask"]
+        return self._bbo_as_decimal("edgex")
+
+    # --- Depth queries ---
+
+    def get_book(self, venue):
+        return self.books[venue]
+
+    def get_vwap(self, venue, side, quantity):
+        """VWAP for a taker ``side`` order of ``quantity`` on ``venue``, None if too thin."""
+        qty_units = self.scale.size_to_int(quantity)
+        result = self.books[venue].side(side).vwap(qty_units)
+        if result is None:
+            return None
+        # notional is in price units * size units
+        return (Decimal(result[0]) / Decimal(qty_units)).scaleb(-self.scale.price_decimals)
+
+    def get_depth(self, venue, side, limit_price):
+        """Size a taker ``side`` order could fill on ``venue`` without crossing ``limit_price``."""
+        units = self.books[venue].side(side).depth_to(self.scale.price_to_int(limit_price))
+        return self.scale.size_to_decimal(units)
+
+    def get_levels(self, venue, depth=5):
+        """Top ``depth`` levels of ``venue``'s book as {'bids': [...], 'asks': [...]} of Decimals."""
+        scale = self.scale
+        return {
+            key: [(scale.price_to_decimal(p), scale.size_to_decimal(q)) for p, q in levels]
+            for key, levels in self.books[venue].to_dict(depth).items()
+        }
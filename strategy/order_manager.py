@@ -1,17 +1,50 @@
 import time
 import asyncio
+import itertools
 import traceback
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 import logging
 
+from edgex_sdk import OrderSide, CancelOrderParams, GetOrderBookDepthParams
+from exchanges.base import OrderResult
+from exchanges.metrics import POST_ONLY_RETRIES
+
+from .latency import now_ns
+from .maker_quoter import MakerQuoter
+from .order_registry import OrderRegistry
+from .trade_state import TradeState
+
 class OrderManager:
     """
     Manages order placement and lifecycle for EdgeX, Extended, and Lighter.
     """
-    def __init__(self, order_book_manager, logger):
+    def __init__(self, order_book_manager, logger, fill_timeout=5, inline_hedge=False):
         self.order_book_manager = order_book_manager
         self.logger = logger
-        
+        self.fill_timeout = fill_timeout
+        # When set, the maker-fill callback itself schedules the Lighter hedge
+        # instead of leaving it to the trading loop.
+        self.inline_hedge = inline_hedge
+
+        # EdgeX config
+        self.edgex_client = None
+        self.edgex_contract_id = None
+        self.edgex_tick_size = None
+        self.edgex_max_retries = 15
+        # Price maker orders from the streamed edgeX book while it is younger than this (seconds)
+        self.edgex_book_max_age = 2.0
+        # Keeps the resting maker order at the top of the edgeX book
+        self.maker_quoter = MakerQuoter(order_book_manager, "edgex")
+
+        # Pre-sign the Lighter hedge while the maker order rests. Each staged pair
+        # holds a nonce until it is sent or released, so this must be off when
+        # several order managers sign with one Lighter client (nonce sequence).
+        self.stage_hedges = True
+
+        # Every order we place, keyed by client and exchange order id
+        self.order_registry = OrderRegistry()
+        self._client_order_seq = itertools.count()
+
         # Extended config
         self.extended_client = None
         self.extended_contract_id = None
@@ -26,23 +59,30 @@ class OrderManager:
 
         # State
         self.current_maker_order_id = None
+        self.current_trade = None
         self.waiting_for_lighter_fill = False
         self.order_execution_complete = False
-        
+        self.edgex_order_status = None
+
         # Hedging State
         self.current_lighter_side = None
         self.current_lighter_quantity = None
         self.current_lighter_price = None
-        
+
         # Callbacks
         self.on_order_filled = None
-        
-        # Events
-        self.extended_fill_event = asyncio.Event()
+
+        # Tick-to-trade histograms (LatencyRecorder), optional
+        self.latency = None
 
     def set_callbacks(self, on_order_filled):
         self.on_order_filled = on_order_filled
 
+    def set_edgex_config(self, client, contract_id, tick_size):
+        self.edgex_client = client
+        self.edgex_contract_id = contract_id
+        self.edgex_tick_size = tick_size
+
     def set_extended_config(self, client, contract_id, tick_size):
         self.extended_client = client
         self.extended_contract_id = contract_id
@@ -55,6 +95,399 @@ class OrderManager:
         self.price_multiplier = price_mult
         self.lighter_tick_size = tick_size
 
+    # --- Trade Lifecycle ---
+
+    def begin_trade(self, side: str, quantity: Decimal) -> TradeState:
+        """Start a new maker -> hedge round trip and hand out its state object."""
+        if self.current_trade is not None:
+            self.current_trade.cancel()
+            self.release_staged_hedge(self.current_trade)
+        self.current_trade = TradeState(side, quantity)
+        self.current_maker_order_id = None
+        self.edgex_order_status = None
+        self.waiting_for_lighter_fill = False
+        self.order_execution_complete = False
+        return self.current_trade
+
+    def get_hedge_price(self, lighter_side: str):
+        """Aggressive taker price for a Lighter hedge, from the current Lighter BBO."""
+        l_bid, l_ask = self.order_book_manager.get_lighter_bbo()
+        if lighter_side == 'buy':
+            # Buying on Lighter (Short on Maker) -> Pay Ask
+            return l_ask * Decimal('1.05') if l_ask else None
+        # Selling on Lighter (Long on Maker) -> Sell into Bid
+        return l_bid * Decimal('0.95') if l_bid else None
+
+    def _set_hedge_params(self, trade, maker_side: str, quantity: Decimal):
+        """Derive the Lighter hedge (opposite side, aggressive taker price) for a maker fill."""
+        lighter_side = 'sell' if maker_side.lower() == 'buy' else 'buy'
+        price = self.get_hedge_price(lighter_side)
+
+        self.current_lighter_side = lighter_side
+        self.current_lighter_quantity = quantity
+        self.current_lighter_price = price
+        if trade is not None:
+            trade.set_hedge_params(lighter_side, quantity, price)
+
+        self.waiting_for_lighter_fill = True
+        self.order_execution_complete = False
+
+    async def wait_for_maker_result(self, trade: TradeState, timeout) -> str:
+        """Wait for the maker order to reach FILLED/CANCELED; returns None on timeout."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(trade.maker_filled), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _schedule_inline_hedge(self, trade):
+        """Queue the hedge on the trade's loop straight from the fill callback."""
+        if trade is None or trade.hedge_scheduled:
+            return
+        trade.hedge_scheduled = True
+        trade.call_soon(self._start_hedge_task, trade)
+
+    def _start_hedge_task(self, trade):
+        trade.hedge_task = trade.loop.create_task(self.place_lighter_market_order(
+            trade.hedge_side, trade.hedge_quantity, trade.hedge_price, False, trade=trade))
+
+    async def hedge_trade(self, trade: TradeState, stop_flag: bool, timeout=180) -> bool:
+        """Send the Lighter hedge for a filled trade (unless already sent inline) and wait for its fill."""
+        if not trade.hedge_scheduled:
+            trade.hedge_scheduled = True
+            await self.place_lighter_market_order(
+                trade.hedge_side, trade.hedge_quantity, trade.hedge_price, stop_flag, trade=trade)
+
+        # A rejected or failed send never fills; give up now instead of waiting out the timeout
+        deadline = time.monotonic() + timeout
+        try:
+            result = await asyncio.wait_for(asyncio.shield(trade.hedge_submitted), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.error("❌ Timeout waiting for Lighter hedge submission")
+            return False
+        if not getattr(result, 'success', False):
+            self.logger.error(f"❌ Lighter hedge not placed: {getattr(result, 'error_message', result)}")
+            return False
+
+        try:
+            await asyncio.wait_for(asyncio.shield(trade.hedge_filled),
+                                   timeout=max(0, deadline - time.monotonic()))
+            return True
+        except asyncio.TimeoutError:
+            self.logger.error("❌ Timeout waiting for Lighter hedge fill")
+            return False
+
+    # --- Latency ---
+
+    def _stamp(self, trade, stage):
+        if trade is not None:
+            trade.stamp(stage)
+
+    def _record_ack(self, trade, venue, sent_stage, ack_stage):
+        """Stamp ``ack_stage`` and record its round trip from ``sent_stage``."""
+        if trade is None:
+            return
+        trade.stamp(ack_stage)
+        if self.latency is not None and sent_stage in trade.stamps:
+            self.latency.record(venue, ack_stage, trade.stamps[ack_stage] - trade.stamps[sent_stage])
+
+    # --- EdgeX Order Logic ---
+
+    def round_to_tick(self, price: Decimal) -> Decimal:
+        return price.quantize(self.edgex_tick_size, rounding=ROUND_HALF_UP)
+
+    def new_client_order_id(self) -> int:
+        """Client order id unique across orders placed in the same millisecond."""
+        return int(time.time() * 1000) * 100 + next(self._client_order_seq) % 100
+
+    def get_edgex_client_order_id(self):
+        if self.current_trade is None:
+            return None
+        return self.current_trade.client_order_id
+
+    async def fetch_edgex_bbo_prices(self):
+        """Fetch EdgeX best bid/ask over REST."""
+        depth_params = GetOrderBookDepthParams(contract_id=self.edgex_contract_id, limit=15)
+        order_book = await self.edgex_client.quote.get_order_book_depth(depth_params)
+        order_book_entry = order_book['data'][0]
+
+        bids = order_book_entry.get('bids', [])
+        asks = order_book_entry.get('asks', [])
+        best_bid = Decimal(bids[0]['price']) if bids else Decimal('0')
+        best_ask = Decimal(asks[0]['price']) if asks else Decimal('0')
+        return best_bid, best_ask
+
+    def _edgex_book_live(self):
+        obm = self.order_book_manager
+        return obm.edgex_order_book_ready and (
+            not self.edgex_book_max_age or obm.is_fresh(self.edgex_book_max_age, "edgex"))
+
+    async def get_edgex_bbo_prices(self):
+        """EdgeX best bid/ask from the local book; REST only when the stream is down or stale."""
+        if self._edgex_book_live():
+            return self.order_book_manager.get_edgex_bbo()
+        return await self.fetch_edgex_bbo_prices()
+
+    async def get_edgex_quote_price(self, side: str):
+        """Post-only price for ``side``: one tick inside the opposite best, None if no BBO."""
+        if self._edgex_book_live():
+            scale = self.order_book_manager.scale
+            target = self.maker_quoter.target_price(side, scale.price_to_int(self.edgex_tick_size))
+            return scale.price_to_decimal(target) if target is not None else None
+
+        best_bid, best_ask = await self.fetch_edgex_bbo_prices()
+        if best_bid <= 0 or best_ask <= 0:
+            return None
+        return best_ask - self.edgex_tick_size if side == 'buy' else best_bid + self.edgex_tick_size
+
+    async def place_edgex_post_only_order(self, side: str, quantity: Decimal, stop_flag: bool,
+                                          trade: TradeState = None):
+        """Quote a post-only order on EdgeX and keep it at the top of the book until it fills.
+
+        While the order rests, it is replaced whenever the quote target moves
+        (see MakerQuoter), and cancelled once ``fill_timeout`` seconds have
+        passed since the first placement. Post-only rejections re-quote up to
+        ``edgex_max_retries`` times. Returns True once the maker order is filled,
+        including a fill that races the cancel; False only once it is final.
+        """
+        if not self.edgex_client:
+            raise ValueError("EdgeX client not configured")
+
+        if trade is None:
+            trade = self.begin_trade(side, quantity)
+
+        quoter = self.maker_quoter
+        scale = self.order_book_manager.scale
+        tick = scale.price_to_int(self.edgex_tick_size)
+        order_side = OrderSide.BUY if side == 'buy' else OrderSide.SELL
+        deadline = time.monotonic() + self.fill_timeout
+        rejections = 0
+
+        try:
+            while rejections < self.edgex_max_retries:
+                if stop_flag:
+                    return False
+
+                order_price = await self.get_edgex_quote_price(side)
+                if order_price is None:
+                    self.logger.warning("EdgeX BBO not ready")
+                    return False
+                order_price = self.round_to_tick(order_price)
+
+                trade.new_maker_attempt(str(self.new_client_order_id()))
+                self.edgex_order_status = None
+                tracked = self.order_registry.register(
+                    'edgex', side, quantity, order_price, client_order_id=trade.client_order_id, trade=trade)
+
+                trade.stamp('order_send')
+                order_result = await self.edgex_client.create_limit_order(
+                    contract_id=self.edgex_contract_id,
+                    size=str(quantity),
+                    price=str(order_price),
+                    side=order_side,
+                    post_only=True,
+                    client_order_id=trade.client_order_id
+                )
+                self._record_ack(trade, 'edgex', 'order_send', 'order_ack')
+                if not order_result or 'data' not in order_result:
+                    self.logger.error("EdgeX order failed: no data in response")
+                    self.order_registry.apply_update(tracked, 'CANCELED')
+                    return False
+
+                trade.maker_order_id = order_result['data'].get('orderId')
+                self.order_registry.bind_order_id(tracked, trade.maker_order_id)
+                self.current_maker_order_id = trade.maker_order_id
+                if trade.prepared_hedge is None:
+                    self.stage_hedge_orders(trade, quantity)
+
+                quote = quoter.start(side, scale.price_to_int(order_price), scale.size_to_int(quantity),
+                                     trade.maker_order_id)
+                status = await self._rest_edgex_quote(trade, quote, tick, deadline)
+                if status == 'FILLED':
+                    return True
+                if status == 'CANCELED':
+                    # Rejected as post-only (would have crossed); re-quote
+                    rejections += 1
+                    POST_ONLY_RETRIES.inc(venue='edgex')
+                    continue
+
+                if status == 'REQUOTE':
+                    self.logger.info(f"EdgeX book moved, replacing order {trade.maker_order_id} "
+                                     f"@ {order_price} (queue ahead {quote.queue_ahead})")
+                else:
+                    self.logger.info(f"EdgeX order timeout, cancelling: {trade.maker_order_id}")
+                # A fill can race the cancel; trust the final WebSocket status. Until it
+                # arrives the order may still fill, so keep the trade live (the caller
+                # hedges a late FILLED) and re-send the cancel meanwhile
+                final = None
+                while final is None:
+                    await self.cancel_edgex_order(trade.maker_order_id)
+                    final = await self.wait_for_maker_result(trade, 2)
+                    if final is None:
+                        self.logger.warning(f"EdgeX order {trade.maker_order_id}: cancel not confirmed yet, "
+                                            f"waiting for its final status")
+                if final == 'FILLED':
+                    return True
+                if status != 'REQUOTE':
+                    return False
+                quoter.record_requote(side)
+
+            self.logger.warning(f"EdgeX order rejected after {self.edgex_max_retries} attempts")
+            return False
+        finally:
+            quoter.finish(side)
+
+    async def _rest_edgex_quote(self, trade: TradeState, quote, tick: int, deadline: float):
+        """Wait on a resting quote until it fills/cancels ('FILLED'/'CANCELED'), needs
+        replacing ('REQUOTE') or ``deadline`` passes (None)."""
+        obm = self.order_book_manager
+        version = obm.bbo_version
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if trade.maker_filled.done():
+                return await self.wait_for_maker_result(trade, 0)
+
+            # Wake on a fill or a top-of-book change; the short timeout re-checks
+            # targets that moved while the requote interval was still running
+            bbo_wait = asyncio.ensure_future(obm.wait_for_bbo_change(
+                version, timeout=min(remaining, self.maker_quoter.min_requote_interval)))
+            await asyncio.wait({bbo_wait, trade.maker_filled}, return_when=asyncio.FIRST_COMPLETED)
+            if not bbo_wait.done():
+                bbo_wait.cancel()
+                continue
+            version = bbo_wait.result()
+
+            if not self._edgex_book_live():
+                continue
+            self.maker_quoter.update_queue(quote)
+            if self.maker_quoter.requote_price(quote, tick) is not None:
+                return 'REQUOTE'
+
+    # --- EdgeX Ladder ---
+
+    async def run_edgex_ladder(self, side: str, quantity: Decimal, levels: int,
+                               step_ticks: int = 1, stop_flag: bool = False, hedge_timeout=180,
+                               stamps=None) -> int:
+        """Rest ``levels`` post-only orders of ``quantity`` on ``side`` at once.
+
+        Rung ``i`` is priced ``i * step_ticks`` ticks behind the top quote. Each
+        rung is its own trade: its fill is hedged on Lighter independently while
+        the other rungs keep resting, and unfilled rungs are cancelled after
+        ``fill_timeout``. Returns the number of rungs that filled and hedged.
+        ``stamps`` (signal stage stamps) are copied into every rung's trade.
+        """
+        if not self.edgex_client:
+            raise ValueError("EdgeX client not configured")
+
+        top = await self.get_edgex_quote_price(side)
+        if top is None:
+            self.logger.warning("EdgeX BBO not ready")
+            return 0
+        step = self.edgex_tick_size * step_ticks
+        prices = [self.round_to_tick(top - step * i if side == 'buy' else top + step * i)
+                  for i in range(levels)]
+        deadline = time.monotonic() + self.fill_timeout
+
+        results = await asyncio.gather(
+            *(self._run_ladder_rung(side, quantity, price, deadline, stop_flag, hedge_timeout, stamps)
+              for price in prices),
+            return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"EdgeX ladder rung error: {result}")
+        return sum(1 for result in results if result is True)
+
+    async def _run_ladder_rung(self, side, quantity, price, deadline, stop_flag, hedge_timeout,
+                               stamps=None) -> bool:
+        trade = TradeState(side, quantity)
+        if stamps:
+            trade.stamps.update(stamps)
+        try:
+            return await self._rest_ladder_rung(trade, side, quantity, price, deadline, stop_flag, hedge_timeout)
+        finally:
+            if self.latency is not None:
+                self.latency.record_trade(trade, 'edgex')
+
+    async def _rest_ladder_rung(self, trade, side, quantity, price, deadline, stop_flag, hedge_timeout) -> bool:
+        trade.new_maker_attempt(str(self.new_client_order_id()))
+        tracked = self.order_registry.register(
+            'edgex', side, quantity, price, client_order_id=trade.client_order_id, trade=trade)
+
+        trade.stamp('order_send')
+        order_result = await self.edgex_client.create_limit_order(
+            contract_id=self.edgex_contract_id,
+            size=str(quantity),
+            price=str(price),
+            side=OrderSide.BUY if side == 'buy' else OrderSide.SELL,
+            post_only=True,
+            client_order_id=trade.client_order_id
+        )
+        self._record_ack(trade, 'edgex', 'order_send', 'order_ack')
+        if not order_result or 'data' not in order_result:
+            self.order_registry.apply_update(tracked, 'CANCELED')
+            self.logger.error(f"EdgeX ladder order @ {price} failed: no data in response")
+            return False
+        trade.maker_order_id = order_result['data'].get('orderId')
+        self.order_registry.bind_order_id(tracked, trade.maker_order_id)
+
+        status = await self.wait_for_maker_result(trade, max(0, deadline - time.monotonic()))
+        while status is None:
+            # Until a final status arrives the order can still fill, so the trade
+            # stays live (a late FILLED is hedged below); re-send the cancel meanwhile
+            await self.cancel_edgex_order(trade.maker_order_id)
+            status = await self.wait_for_maker_result(trade, 2)
+            if status is None:
+                self.logger.warning(f"EdgeX ladder order {trade.maker_order_id} @ {price}: "
+                                    f"cancel not confirmed yet, waiting for its final status")
+        if status != 'FILLED' or stop_flag:
+            trade.cancel()
+            return False
+
+        self.logger.info(f"EdgeX ladder rung filled @ {price}, hedging on Lighter")
+        return await self.hedge_trade(trade, stop_flag, timeout=hedge_timeout)
+
+    async def cancel_edgex_order(self, order_id):
+        start = now_ns()
+        try:
+            await self.edgex_client.cancel_order(CancelOrderParams(order_id=order_id))
+        except Exception as e:
+            self.logger.error(f"Error cancelling EdgeX order {order_id}: {e}")
+            return
+        if self.latency is not None:
+            self.latency.record_since('edgex', 'cancel_ack', start)
+
+    def lookup_edgex_order(self, client_order_id=None, order_id=None):
+        """Registry entry for an edgeX order update, None if the order is not ours."""
+        return self.order_registry.lookup('edgex', client_order_id, order_id)
+
+    def update_edgex_order_status(self, status, tracked=None):
+        trade = tracked.trade if tracked is not None else self.current_trade
+        if tracked is not None and trade is not None and tracked.client_order_id != trade.client_order_id:
+            # Late update for an order this trade has already replaced
+            return
+        self.edgex_order_status = status
+        # FILLED is resolved by handle_edgex_order_update once the hedge is derived
+        if status == 'CANCELED' and trade is not None:
+            trade.set_maker_status(status)
+
+    def handle_edgex_order_update(self, order_data, tracked=None):
+        """Handle a filled EdgeX maker order: record fill and derive the Lighter hedge."""
+        trade = tracked.trade if tracked is not None else self.current_trade
+        side = order_data.get('side', '')
+        filled_size = Decimal(str(order_data.get('filled_size', 0)))
+
+        if trade is not None:
+            trade.stamp('maker_fill')
+            trade.maker_filled_size = filled_size
+            trade.maker_fill_price = order_data.get('price')
+
+        self._set_hedge_params(trade, side, filled_size)
+        if self.inline_hedge:
+            self._schedule_inline_hedge(trade)
+        if trade is not None:
+            trade.set_maker_status('FILLED')
+
     # --- Extended Order Logic ---
 
     async def place_extended_post_only_order(self, side: str, quantity: Decimal, stop_flag: bool):
@@ -69,36 +502,44 @@ class OrderManager:
 
         # Maker Price Logic
         price = best_bid if side == 'buy' else best_ask
-        
+
         self.logger.info(f"Creating Extended {side} order: {quantity} @ {price}")
-        
+
         try:
+            trade = self.begin_trade(side, quantity)
+
+            trade.stamp('order_send')
             result = await self.extended_client.place_open_order(
                 contract_id=self.extended_contract_id,
                 quantity=quantity,
                 direction=side.lower(),
                 price=price
             )
-            
+            self._record_ack(trade, 'extended', 'order_send', 'order_ack')
+
             if not result.success:
                 self.logger.error(f"Extended order failed: {result.error_message}")
                 return False
-            
+
             self.current_maker_order_id = result.order_id
+            trade.maker_order_id = result.order_id
+            tracked = self.order_registry.register('extended', side, quantity, price, trade=trade)
+            parked = self.order_registry.bind_order_id(tracked, result.order_id)
+            if parked is not None:
+                # The WebSocket update beat the REST response
+                self.handle_extended_order_update(parked)
+            self.stage_hedge_orders(trade, quantity)
             self.logger.info(f"Extended Order Placed ID: {self.current_maker_order_id}")
-            
-            # Reset event
-            self.extended_fill_event.clear()
-            
-            # Wait for fill event or timeout
-            try:
-                await asyncio.wait_for(self.extended_fill_event.wait(), timeout=10)
+
+            # Wait for fill or timeout
+            status = await self.wait_for_maker_result(trade, 10)
+            if status == 'FILLED':
                 self.logger.info("Extended Order Fill Detected via Event!")
                 return True
-            except asyncio.TimeoutError:
+            if status is None:
                 self.logger.info(f"Extended order timeout, cancelling: {self.current_maker_order_id}")
                 await self.extended_client.cancel_order(self.current_maker_order_id)
-                return False
+            return False
 
         except Exception as e:
             self.logger.error(f"Error placing Extended order: {e}")
@@ -109,54 +550,196 @@ class OrderManager:
         """Handle order update from Extended WebSocket."""
         oid = order_data.get('order_id')
         status = order_data.get('status')
-        
-        if oid == self.current_maker_order_id and status == 'FILLED':
+
+        tracked = self.order_registry.lookup('extended', order_id=oid)
+        if tracked is None:
+            self.order_registry.park('extended', oid, order_data)
+            return
+        filled = Decimal(str(order_data.get('filled_size') or 0))
+        if not self.order_registry.apply_update(tracked, status, filled):
+            return  # duplicate or out-of-order update
+        trade = tracked.trade
+
+        if status == 'FILLED':
+            self._stamp(trade, 'maker_fill')
             self.logger.info(f"Extended Order {oid} FILLED")
-            side = order_data.get('side')
-            qty = Decimal(str(order_data.get('filled_size', 0)))
-            
+            side = order_data.get('side') or tracked.side
+
             # Setup Lighter Hedge Params
-            self.current_lighter_side = 'sell' if side.upper() == 'BUY' else 'buy'
-            self.current_lighter_quantity = qty
-            
-            # Calculate aggressive taker price
-            l_bid, l_ask = self.order_book_manager.get_lighter_bbo()
-            
-            if self.current_lighter_side == 'buy':
-                # Buying on Lighter (Short on Maker) -> Pay Ask
-                self.current_lighter_price = l_ask * Decimal('1.05') if l_ask else None
-            else:
-                # Selling on Lighter (Long on Maker) -> Sell into Bid
-                self.current_lighter_price = l_bid * Decimal('0.95') if l_bid else None
+            self._set_hedge_params(trade, side, filled)
+            if self.inline_hedge:
+                self._schedule_inline_hedge(trade)
 
-            self.waiting_for_lighter_fill = True
-            self.order_execution_complete = False
-            
             # Signal the main loop to proceed
-            self.extended_fill_event.set()
+            if trade is not None:
+                trade.maker_filled_size = filled
+                trade.set_maker_status('FILLED')
+        elif status == 'CANCELED':
+            if trade is not None:
+                trade.set_maker_status('CANCELED')
 
     # --- Lighter Logic ---
-    async def place_lighter_market_order(self, side, quantity, price, stop_flag):
+    async def place_lighter_market_order(self, side, quantity, price, stop_flag, trade=None):
         """Execute Lighter Hedge"""
         self.logger.info(f"Placing Lighter Hedge: {side} {quantity} @ {price}")
+        if trade is None:
+            trade = self.current_trade
         if not self.lighter_client:
+            if trade is not None:
+                trade.set_hedge_submitted(OrderResult(success=False, error_message='Lighter client not configured'))
+            return
+
+        prepared = self._take_staged_hedge(trade, side, quantity)
+        if prepared is not None:
+            # Registered before sending so an early fill event still finds its trade
+            tracked = self.order_registry.register(
+                'lighter', side, quantity, price,
+                client_order_id=prepared.get(side).client_order_index, trade=trade)
+            trade.stamp('hedge_send')
+            res = await self.lighter_client.send_prepared_order(prepared, side)
+            self._record_ack(trade, 'lighter', 'hedge_send', 'hedge_ack')
+            if res.success:
+                self.logger.info(f"Lighter Hedge Placed (pre-signed): {res.order_id}")
+                trade.set_hedge_submitted(res)
+                return
+            self.order_registry.apply_update(tracked, 'CANCELED')
+            self.logger.warning(f"Pre-signed Lighter hedge failed, re-signing: {res.error_message}")
+        elif trade is not None:
+            # Free the reserved nonce before the SDK signs a fresh order
+            self.release_staged_hedge(trade)
+
+        if price is None:
+            # No Lighter BBO when the fill was seen; price from the book as it is now
+            price = self.get_hedge_price(side)
+            if price is None:
+                self.logger.error("Lighter Hedge Failed: no Lighter bid/ask to price the hedge")
+                if trade is not None:
+                    trade.set_hedge_submitted(OrderResult(success=False, error_message='No Lighter BBO'))
+                return
+
+        if (hasattr(self.lighter_client, 'place_ioc_order') and
+                self.base_amount_multiplier is not None and self.price_multiplier is not None):
+            # Sign now with our own client order index so the fill routes back to this trade
+            # From the Lighter client so pre-signed, IOC and other markets' hedges never share an index
+            client_order_index = (self.lighter_client.new_client_order_index()
+                                   if hasattr(self.lighter_client, 'new_client_order_index')
+                                   else self.new_client_order_id())
+            tracked = self.order_registry.register(
+                'lighter', side, quantity, price, client_order_id=client_order_index, trade=trade)
+            try:
+                self._stamp(trade, 'hedge_send')
+                res = await self.lighter_client.place_ioc_order(
+                    self.lighter_market_index, side,
+                    int(quantity * self.base_amount_multiplier),
+                    int(price * self.price_multiplier),
+                    client_order_index)
+                self._record_ack(trade, 'lighter', 'hedge_send', 'hedge_ack')
+            except Exception as e:
+                self.logger.error(f"Lighter Hedge Exception: {e}")
+                res = OrderResult(success=False, error_message=str(e))
+            if res.success:
+                self.logger.info(f"Lighter Hedge Placed: {res.order_id}")
+            else:
+                self.order_registry.apply_update(tracked, 'CANCELED')
+                self.logger.error(f"Lighter Hedge Failed: {res.error_message}")
+            if trade is not None:
+                trade.set_hedge_submitted(res)
             return
 
         try:
             # Call Lighter Place Order (implementation depends on LighterClient in exchanges/lighter.py)
             # Assuming it supports place_limit_order or place_market_order
             # Here we use limit order with aggressive price as market order
+            self._stamp(trade, 'hedge_send')
             res = await self.lighter_client.place_limit_order(
                 contract_id=self.lighter_market_index,
                 quantity=quantity,
                 price=price,
                 side=side
             )
-            
+            self._record_ack(trade, 'lighter', 'hedge_send', 'hedge_ack')
+
             if res.success:
                  self.logger.info(f"Lighter Hedge Placed: {res.order_id}")
             else:
                  self.logger.error(f"Lighter Hedge Failed: {res.error_message}")
+            if trade is not None:
+                trade.set_hedge_submitted(res)
 
         except Exception as e:
             self.logger.error(f"Lighter Hedge Exception: {e}")
+            if trade is not None:
+                trade.set_hedge_submitted(OrderResult(success=False, error_message=str(e)))
+
+    # --- Lighter Hedge Pre-staging ---
+
+    def stage_hedge_orders(self, trade, quantity: Decimal):
+        """Pre-sign both possible Lighter hedges for ``quantity`` while the maker order rests.
+
+        Prices are signed at the same protective band used for live hedges; the
+        pair is only used at fill time if that band still crosses the book.
+        """
+        if (trade is None or not self.stage_hedges or
+                not hasattr(self.lighter_client, 'prepare_hedge_orders') or
+                self.base_amount_multiplier is None or self.price_multiplier is None):
+            return
+
+        buy_price = self.get_hedge_price('buy')
+        sell_price = self.get_hedge_price('sell')
+        if buy_price is None or sell_price is None:
+            return
+
+        self.release_staged_hedge(trade)
+        try:
+            trade.prepared_hedge = self.lighter_client.prepare_hedge_orders(
+                self.lighter_market_index,
+                int(quantity * self.base_amount_multiplier),
+                int(buy_price * self.price_multiplier),
+                int(sell_price * self.price_multiplier))
+        except Exception as e:
+            self.logger.error(f"Error staging Lighter hedge orders: {e}")
+
+    def _take_staged_hedge(self, trade, side, quantity):
+        """Return the staged pair if its ``side`` order still matches this hedge."""
+        if trade is None or trade.prepared_hedge is None or trade.prepared_hedge.used:
+            return None
+        order = trade.prepared_hedge.get(side)
+        if order is None or order.base_amount != int(quantity * self.base_amount_multiplier):
+            return None
+
+        # Compare in integer units: book ticks rescaled to Lighter's price multiplier
+        scale = self.order_book_manager.scale
+        l_bid, l_ask = self.order_book_manager.get_bbo_ticks("lighter")
+        if side == 'buy':
+            if l_ask is None or order.price < scale.rescale_price(l_ask, self.price_multiplier):
+                return None
+        elif l_bid is None or order.price > scale.rescale_price(l_bid, self.price_multiplier):
+            return None
+        return trade.prepared_hedge
+
+    def release_staged_hedge(self, trade):
+        if trade is None or trade.prepared_hedge is None:
+            return
+        try:
+            self.lighter_client.release_prepared_orders(trade.prepared_hedge)
+        except Exception as e:
+            self.logger.error(f"Error releasing staged Lighter hedge: {e}")
+        trade.prepared_hedge = None
+
+    def record_lighter_fill(self, order_data) -> bool:
+        """Apply a Lighter FILLED event to its registry entry; False if it is a duplicate."""
+        tracked = self.order_registry.lookup('lighter', client_order_id=order_data.get('client_order_id'))
+        if tracked is None:
+            return True
+        return self.order_registry.apply_update(
+            tracked, 'FILLED', order_data.get('filled_base_amount'))
+
+    def handle_lighter_order_filled(self, order_data):
+        """Mark the hedge of the trade this fill belongs to as filled."""
+        self.waiting_for_lighter_fill = False
+        self.order_execution_complete = True
+        tracked = self.order_registry.lookup('lighter', client_order_id=order_data.get('client_order_id'))
+        trade = tracked.trade if tracked is not None else self.current_trade
+        if trade is not None:
+            trade.stamp('hedge_fill')
+            trade.set_hedge_filled(order_data)
@@ -0,0 +1,120 @@
+"""Per-order lifecycle tracking keyed by client order id and exchange order id."""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+FINAL_STATUSES = ('FILLED', 'CANCELED')
+
+
+@dataclass
+class TrackedOrder:
+    """One order on one venue, from placement to its final status."""
+    venue: str
+    side: str
+    size: Decimal
+    price: Optional[Decimal] = None
+    client_order_id: Optional[str] = None
+    order_id: Optional[str] = None
+    status: str = 'PENDING'
+    filled_size: Decimal = Decimal('0')
+    trade: Any = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: Optional[float] = None
+
+    @property
+    def is_final(self):
+        return self.status in FINAL_STATUSES
+
+
+class OrderRegistry:
+    """O(1) routing of exchange order updates to the order (and trade) they belong to.
+
+    Updates are applied monotonically: fills never shrink, a final status
+    (FILLED/CANCELED) is never overwritten by a late OPEN, and a repeated
+    FILLED is reported as a duplicate so callers act on each fill once.
+    Updates for exchange ids that are not bound yet (the WebSocket beat the
+    REST response) are parked and handed back by ``bind_order_id``.
+    """
+
+    def __init__(self, max_finished: int = 1000, max_parked: int = 256):
+        self._by_client: Dict[Tuple[str, str], TrackedOrder] = {}
+        self._by_order: Dict[Tuple[str, str], TrackedOrder] = {}
+        self._parked: Dict[Tuple[str, str], Any] = {}
+        self._finished = deque()
+        self.max_finished = max_finished
+        self.max_parked = max_parked
+
+    def register(self, venue: str, side: str, size: Decimal, price=None,
+                 client_order_id=None, order_id=None, trade=None) -> TrackedOrder:
+        order = TrackedOrder(venue, side, Decimal(str(size)), price,
+                             client_order_id=None if client_order_id is None else str(client_order_id),
+                             trade=trade)
+        if order.client_order_id is not None:
+            self._by_client[(venue, order.client_order_id)] = order
+        if order_id is not None:
+            self.bind_order_id(order, order_id)
+        return order
+
+    def bind_order_id(self, order: TrackedOrder, order_id):
+        """Attach the exchange order id; returns an update parked for it, if any."""
+        order.order_id = str(order_id)
+        key = (order.venue, order.order_id)
+        self._by_order[key] = order
+        return self._parked.pop(key, None)
+
+    def lookup(self, venue: str, client_order_id=None, order_id=None) -> Optional[TrackedOrder]:
+        order = None
+        if client_order_id is not None:
+            order = self._by_client.get((venue, str(client_order_id)))
+        if order is None and order_id is not None:
+            order = self._by_order.get((venue, str(order_id)))
+        return order
+
+    def park(self, venue: str, order_id, update):
+        """Hold the latest update for an exchange id we have not bound yet."""
+        parked = self._parked
+        parked[(venue, str(order_id))] = update
+        while len(parked) > self.max_parked:
+            parked.pop(next(iter(parked)))
+
+    def apply_update(self, order: TrackedOrder, status: str, filled_size=None) -> bool:
+        """Apply a status/fill update; returns False for duplicate or stale updates."""
+        if order.is_final:
+            return False
+
+        changed = False
+        if filled_size is not None:
+            filled_size = Decimal(str(filled_size))
+            if filled_size > order.filled_size:
+                order.filled_size = filled_size
+                changed = True
+
+        if status and status != order.status:
+            order.status = status
+            changed = True
+            if status in FINAL_STATUSES:
+                self._retire(order)
+
+        if changed:
+            order.updated_at = time.time()
+        return changed
+
+    def open_orders(self, venue: str = None):
+        seen = {}
+        for order in list(self._by_client.values()) + list(self._by_order.values()):
+            if not order.is_final and (venue is None or order.venue == venue):
+                seen[id(order)] = order
+        return list(seen.values())
+
+    def _retire(self, order: TrackedOrder):
+        # Keep recent finished orders so late duplicates are still recognised
+        finished = self._finished
+        finished.append(order)
+        while len(finished) > self.max_finished:
+            old = finished.popleft()
+            if old.client_order_id is not None:
+                self._by_client.pop((old.venue, old.client_order_id), None)
+            if old.order_id is not None:
+                self._by_order.pop((old.venue, old.order_id), None)
@@ -0,0 +1,266 @@
+"""Cross-process position/exposure limits served over a Unix socket.
+
+The supervisor runs one RiskServer; every worker process talks to it through a
+RiskClient. Requests and replies are newline-delimited JSON objects carrying an
+``id`` so several bots in one worker can share a connection.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class RiskLimits:
+    """Global limits; 0 disables a limit."""
+    # Per-ticker edgeX position in base units (the bot's --max-position, enforced across workers)
+    max_position: Decimal = Decimal('0')
+    # Sum over tickers of |edgeX position| * price, in USD
+    max_total_notional: Decimal = Decimal('0')
+    # Sum over tickers of |edgeX + Lighter position| * price (unhedged exposure), in USD
+    max_net_exposure: Decimal = Decimal('0')
+
+
+class RiskBook:
+    """Positions reported by the workers plus the maker orders they are about to rest.
+
+    A reservation is taken before maker orders are placed and released once the
+    trade is done (with the positions after it), so concurrent workers cannot
+    all pass the same check with the same headroom.
+    """
+
+    def __init__(self, limits: RiskLimits):
+        self.limits = limits
+        # ticker -> (edgex_position, lighter_position, price)
+        self.positions: Dict[str, Tuple[Decimal, Decimal, Decimal]] = {}
+        # reservation id -> (ticker, signed quantity, price)
+        self.reservations: Dict[int, Tuple[str, Decimal, Decimal]] = {}
+        self._ids = itertools.count(1)
+
+    def report(self, ticker: str, edgex: Decimal, lighter: Decimal, price: Optional[Decimal] = None):
+        if price is None or price <= 0:
+            price = self.positions.get(ticker, (0, 0, Decimal('0')))[2]
+        self.positions[ticker] = (edgex, lighter, price)
+
+    def _reserved(self, ticker=None):
+        return [(t, qty, price) for t, qty, price in self.reservations.values()
+                if ticker is None or t == ticker]
+
+    def _exposure(self, extra=None):
+        """(total notional, net exposure) in USD from each ticker's projected signed position.
+
+        Every reservation (and ``extra``, a (ticker, signed quantity, price)) may
+        fill before its hedge. Pending buys and sells of a ticker are applied
+        separately and the larger absolute position is kept, so opposite orders
+        never offset each other while an order that reduces a position does.
+        """
+        pending: Dict[str, list] = {}
+        for ticker, qty, price in [*self.reservations.values(), *([extra] if extra else [])]:
+            entry = pending.setdefault(ticker, [Decimal('0'), Decimal('0'), price])
+            entry[0 if qty > 0 else 1] += qty
+
+        total = net = Decimal('0')
+        for ticker in set(self.positions) | set(pending):
+            buys, sells, reserved_price = pending.get(ticker, (Decimal('0'), Decimal('0'), None))
+            edgex, lighter, price = self.positions.get(ticker, (Decimal('0'), Decimal('0'), None))
+            if not price:
+                price = reserved_price or Decimal('0')
+            total += max(abs(edgex + buys), abs(edgex + sells)) * price
+            hedged = edgex + lighter
+            net += max(abs(hedged + buys), abs(hedged + sells)) * price
+        return total, net
+
+    def reserve(self, ticker: str, side: str, quantity: Decimal, price: Decimal):
+        """Return (reservation_id, None) if the order fits all limits, else (None, reason)."""
+        signed = quantity if side == 'buy' else -quantity
+        limits = self.limits
+        edgex, _, _ = self.positions.get(ticker, (Decimal('0'), Decimal('0'), price))
+
+        if limits.max_position:
+            projected = edgex + signed + sum(qty for _, qty, _ in self._reserved(ticker))
+            if abs(projected) > limits.max_position:
+                return None, f"{ticker} position {projected} would exceed {limits.max_position}"
+
+        if limits.max_total_notional or limits.max_net_exposure:
+            # Orders that bring a total down are always allowed, even above the limit
+            before = self._exposure()
+            after = self._exposure((ticker, signed, price))
+            if limits.max_total_notional and after[0] > max(limits.max_total_notional, before[0]):
+                return None, f"total notional {after[0]:.2f} would exceed {limits.max_total_notional}"
+            # A resting maker order is unhedged exposure until its Lighter hedge fills
+            if limits.max_net_exposure and after[1] > max(limits.max_net_exposure, before[1]):
+                return None, f"net exposure {after[1]:.2f} would exceed {limits.max_net_exposure}"
+
+        reservation_id = next(self._ids)
+        self.reservations[reservation_id] = (ticker, signed, price)
+        return reservation_id, None
+
+    def release(self, reservation_id: int):
+        self.reservations.pop(reservation_id, None)
+
+    def snapshot(self):
+        return {
+            "positions": {t: {"edgex": str(e), "lighter": str(l), "price": str(p)}
+                          for t, (e, l, p) in self.positions.items()},
+            "reservations": len(self.reservations),
+        }
+
+
+def _decimal(value):
+    return None if value is None else Decimal(str(value))
+
+
+class RiskServer:
+    """Serves a RiskBook on a Unix socket; runs in the supervisor process."""
+
+    def __init__(self, path: str, limits: RiskLimits, logger=None):
+        self.path = path
+        self.book = RiskBook(limits)
+        self.logger = logger or logging.getLogger(__name__)
+        self.server = None
+        # reservations held by each connection, dropped if the worker goes away
+        self._held: Dict[asyncio.StreamWriter, set] = {}
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        self.logger.info(f"✅ Risk service listening on {self.path}")
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle_client(self, reader, writer):
+        held = self._held.setdefault(writer, set())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    reply = self._dispatch(request, held)
+                except Exception as e:
+                    request, reply = {}, {"ok": False, "error": str(e)}
+                reply["id"] = request.get("id")
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for reservation_id in self._held.pop(writer, ()):
+                self.book.release(reservation_id)
+            writer.close()
+
+    def _dispatch(self, request, held):
+        op = request.get("op")
+        if op == "report" or op == "release":
+            if op == "release":
+                held.discard(request.get("reservation"))
+                self.book.release(request.get("reservation"))
+            if request.get("ticker") is not None:
+                self.book.report(request["ticker"], _decimal(request["edgex"]),
+                                 _decimal(request["lighter"]), _decimal(request.get("price")))
+            return {"ok": True}
+        if op == "reserve":
+            reservation_id, reason = self.book.reserve(
+                request["ticker"], request["side"], _decimal(request["quantity"]), _decimal(request["price"]))
+            if reservation_id is None:
+                return {"ok": False, "error": reason}
+            held.add(reservation_id)
+            return {"ok": True, "reservation": reservation_id}
+        if op == "snapshot":
+            return {"ok": True, "snapshot": self.book.snapshot()}
+        raise ValueError(f"unknown op {op!r}")
+
+
+class RiskClient:
+    """Worker-side connection to the RiskServer; fails closed when it is unreachable."""
+
+    def __init__(self, path: str, logger=None, timeout: float = 1.0):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self._writer is not None:
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            self._reader_task = asyncio.create_task(self._read_replies())
+
+    async def _read_replies(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                future = self._pending.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            self.logger.error(f"Risk service connection error: {e}")
+        finally:
+            self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("risk service disconnected"))
+            self._pending.clear()
+
+    async def _request(self, op, **fields):
+        await self.connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        fields = {k: (str(v) if isinstance(v, Decimal) else v) for k, v in fields.items()}
+        self._writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode() + b"\n")
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def reserve(self, ticker, side, quantity, price) -> Optional[int]:
+        """Reservation id if the order is within the global limits, otherwise None."""
+        try:
+            reply = await self._request("reserve", ticker=ticker, side=side, quantity=quantity, price=price)
+        except Exception as e:
+            self.logger.error(f"Risk service unavailable, not trading: {e}")
+            return None
+        if not reply.get("ok"):
+            self.logger.info(f"⛔ Risk limit: {reply.get('error')}")
+            return None
+        return reply["reservation"]
+
+    async def release(self, reservation_id, ticker=None, edgex=None, lighter=None, price=None):
+        try:
+            await self._request("release", reservation=reservation_id, ticker=ticker,
+                                edgex=edgex, lighter=lighter, price=price)
+        except Exception as e:
+            self.logger.error(f"Error releasing risk reservation {reservation_id}: {e}")
+
+    async def report(self, ticker, edgex, lighter, price=None):
+        try:
+            await self._request("report", ticker=ticker, edgex=edgex, lighter=lighter, price=price)
+        except Exception as e:
+            self.logger.error(f"Error reporting positions to risk service: {e}")
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task:
+            self._reader_task.cancel()
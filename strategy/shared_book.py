@@ -0,0 +1,144 @@
+"""Seqlock-protected order book slots in shared memory: one writer process, any number of readers.
+
+Each venue has a fixed-size slot holding the top ``depth`` levels per side in
+integer units of a FixedPointScale, plus the freshness fields the strategy
+uses (monotonic receive time, exchange timestamp, stream sequence, stale flag).
+Receive times stay comparable across processes because CLOCK_MONOTONIC is
+system-wide.
+
+The writer bumps the slot sequence to an odd value, writes the slot and bumps
+it to the next even value. A reader copies the slot and retries if the
+sequence was odd or changed meanwhile, so it never blocks the writer and
+never sees a torn book. Reads are plain memory accesses, no syscalls.
+"""
+import struct
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+_META = struct.Struct('<4sIII')            # magic, depth, price_decimals, size_decimals
+_SEQ = struct.Struct('<Q')
+# seq, recv_time, exchange_ts, update_seq, stale, bid count, ask count
+_HEADER = struct.Struct('<QdqqIII4x')
+_MAGIC = b'BOK1'
+_NONE = -1
+
+SharedBookView = namedtuple(
+    'SharedBookView', 'version recv_time exchange_ts update_seq stale bids asks')
+
+
+def _slot_size(depth):
+    return _HEADER.size + 2 * depth * 16
+
+
+def _pack_levels(levels, depth):
+    flat = [0] * (2 * depth)
+    for i, (price, size) in enumerate(levels[:depth]):
+        flat[2 * i] = price
+        flat[2 * i + 1] = size
+    return flat
+
+
+class _SharedBookBase:
+    def __init__(self, venues, depth):
+        self.venues = tuple(venues)
+        self.depth = depth
+        self._levels = struct.Struct(f'<{2 * depth}q')
+        slot = _slot_size(depth)
+        self._offsets = {venue: _META.size + i * slot for i, venue in enumerate(self.venues)}
+        self.size = _META.size + len(self.venues) * slot
+        self.shm = None
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+
+class SharedBookWriter(_SharedBookBase):
+    """Publishes venue books into a shared memory segment."""
+
+    def __init__(self, name, venues, depth=10, scale=None, create=True):
+        super().__init__(venues, depth)
+        if create:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=self.size)
+            _META.pack_into(self.shm.buf, 0, _MAGIC, depth,
+                            scale.price_decimals if scale else 0, scale.size_decimals if scale else 0)
+            for offset in self._offsets.values():
+                _HEADER.pack_into(self.shm.buf, offset, 0, 0.0, _NONE, _NONE, 0, 0, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._seq = {venue: _SEQ.unpack_from(self.shm.buf, self._offsets[venue])[0]
+                     for venue in self.venues}
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, venue, book, recv_time=None, exchange_ts=None, update_seq=None, stale=False):
+        """Copy the top ``depth`` levels of ``book`` (an L2OrderBook) into ``venue``'s slot."""
+        buf = self.shm.buf
+        offset = self._offsets[venue]
+        depth = self.depth
+        bids = book.bids.levels(depth)
+        asks = book.asks.levels(depth)
+
+        seq = self._seq[venue] + 1
+        _SEQ.pack_into(buf, offset, seq)  # odd: write in progress
+        _HEADER.pack_into(
+            buf, offset, seq, recv_time or 0.0,
+            _NONE if exchange_ts is None else int(exchange_ts),
+            _NONE if update_seq is None else int(update_seq),
+            1 if stale else 0, len(bids), len(asks))
+        levels = self._levels
+        levels.pack_into(buf, offset + _HEADER.size, *_pack_levels(bids, depth))
+        levels.pack_into(buf, offset + _HEADER.size + levels.size, *_pack_levels(asks, depth))
+        seq += 1
+        _SEQ.pack_into(buf, offset, seq)
+        self._seq[venue] = seq
+
+    def close(self, unlink=False):
+        """Detach from the segment; ``unlink`` also removes it (creator only)."""
+        if self.shm is not None and unlink:
+            self.shm.unlink()
+        super().close()
+
+
+class SharedBookReader(_SharedBookBase):
+    """Lock-free reader of a SharedBookWriter segment."""
+
+    def __init__(self, name, venues, depth=10):
+        super().__init__(venues, depth)
+        self.shm = shared_memory.SharedMemory(name=name)
+        magic, stored_depth, self.price_decimals, self.size_decimals = _META.unpack_from(self.shm.buf, 0)
+        if magic != _MAGIC or stored_depth != depth:
+            raise ValueError(f"shared book {name!r} has an unexpected layout")
+
+    def version(self, venue):
+        """Slot sequence; changes on every publish, odd while a write is in progress."""
+        return _SEQ.unpack_from(self.shm.buf, self._offsets[venue])[0]
+
+    def read(self, venue, retries=1000):
+        """Consistent copy of ``venue``'s slot, or None if the writer kept it busy."""
+        buf = self.shm.buf
+        offset = self._offsets[venue]
+        levels = self._levels
+        for _ in range(retries):
+            seq = _SEQ.unpack_from(buf, offset)[0]
+            if seq & 1:
+                continue
+            header = _HEADER.unpack_from(buf, offset)
+            bids = levels.unpack_from(buf, offset + _HEADER.size)
+            asks = levels.unpack_from(buf, offset + _HEADER.size + levels.size)
+            if _SEQ.unpack_from(buf, offset)[0] != seq:
+                continue
+            _, recv_time, exchange_ts, update_seq, stale, nbids, nasks = header
+            return SharedBookView(
+                seq, recv_time or None,
+                None if exchange_ts == _NONE else exchange_ts,
+                None if update_seq == _NONE else update_seq,
+                bool(stale),
+                list(zip(bids[0:2 * nbids:2], bids[1:2 * nbids:2])),
+                list(zip(asks[0:2 * nasks:2], asks[1:2 * nasks:2])))
+        return None
+
+
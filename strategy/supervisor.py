@@ -0,0 +1,139 @@
+"""Shard tickers across worker processes, with global risk limits served by the supervisor."""
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+from typing import Dict, List
+
+from .risk_service import RiskClient, RiskLimits, RiskServer
+
+
+def _lighter_keys():
+    """(api_key_index, private_key) pairs from comma-separated LIGHTER_API_KEY_INDEX / API_KEY_PRIVATE_KEY."""
+    indexes = [i.strip() for i in os.getenv('LIGHTER_API_KEY_INDEX', '').split(',') if i.strip()]
+    keys = [k.strip() for k in os.getenv('API_KEY_PRIVATE_KEY', '').split(',') if k.strip()]
+    return list(zip(indexes, keys))
+
+
+def _worker_main(worker_id: int, tickers: List[str], bot_kwargs: Dict, socket_path: str,
+                 lighter_key_index: str, lighter_private_key: str):
+    """Entry point of a worker process: run its shard of tickers."""
+    # Each worker signs with its own Lighter API key so nonces never collide across processes
+    os.environ['LIGHTER_API_KEY_INDEX'] = lighter_key_index
+    os.environ['API_KEY_PRIVATE_KEY'] = lighter_private_key
+    if bot_kwargs.get('metrics_port'):
+        # One metrics endpoint per worker: base port + worker id
+        bot_kwargs = dict(bot_kwargs, metrics_port=bot_kwargs['metrics_port'] + worker_id)
+    asyncio.run(_run_worker(worker_id, tickers, bot_kwargs, socket_path))
+
+
+async def _run_worker(worker_id, tickers, bot_kwargs, socket_path):
+    # Imported here so the supervisor process does not load the exchange SDKs
+    from .edgex_arb import EdgexArb
+    from .multi_market import MultiMarketRunner
+
+    if len(tickers) > 1:
+        runner = MultiMarketRunner(tickers, **bot_kwargs)
+        bots = runner.bots
+    else:
+        runner = EdgexArb(ticker=tickers[0], **bot_kwargs)
+        bots = [runner]
+
+    risk_client = RiskClient(socket_path, logger=logging.getLogger(f"risk_client_{worker_id}"))
+    for bot in bots:
+        bot.risk_client = risk_client
+    try:
+        await runner.run()
+    finally:
+        await risk_client.close()
+
+
+class ShardedSupervisor:
+    """Runs ``workers`` processes, each trading a round-robin shard of ``tickers``.
+
+    The supervisor owns the RiskServer so that the global position and exposure
+    limits hold across all workers. Worker processes are not restarted when
+    they exit: their order and hedge state is unknown to a fresh process.
+    """
+
+    def __init__(self, tickers: List[str], workers: int, bot_kwargs: Dict,
+                 limits: RiskLimits, socket_path: str = None):
+        self.tickers = tickers
+        self.workers = max(1, min(workers, len(tickers)))
+        self.bot_kwargs = bot_kwargs
+        self.limits = limits
+        self.socket_path = socket_path or os.path.join(
+            tempfile.gettempdir(), f"arb_risk_{os.getpid()}.sock")
+        self.processes = []
+        self.stop_flag = False
+
+        self.logger = logging.getLogger("arbitrage_supervisor")
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+            self.logger.addHandler(handler)
+            self.logger.propagate = False
+
+    def shards(self) -> List[List[str]]:
+        return [self.tickers[i::self.workers] for i in range(self.workers)]
+
+    def shutdown(self, signum=None, frame=None):
+        if self.stop_flag:
+            return
+        self.stop_flag = True
+        self.logger.info("🛑 Stopping workers...")
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()  # SIGTERM: workers run their own graceful shutdown
+
+    def setup_signal_handlers(self):
+        signal.signal(signal.SIGINT, self.shutdown)
+        signal.signal(signal.SIGTERM, self.shutdown)
+
+    def _start_workers(self, keys):
+        ctx = multiprocessing.get_context('spawn')
+        for worker_id, shard in enumerate(self.shards()):
+            key_index, private_key = keys[worker_id]
+            process = ctx.Process(
+                target=_worker_main, name=f"arb-worker-{worker_id}",
+                args=(worker_id, shard, self.bot_kwargs, self.socket_path, key_index, private_key))
+            process.start()
+            self.processes.append(process)
+            self.logger.info(f"🚀 Worker {worker_id} (pid {process.pid}): {', '.join(shard)}")
+
+    async def run(self):
+        keys = _lighter_keys()
+        if len(keys) < self.workers:
+            self.logger.error(
+                f"❌ {self.workers} workers need {self.workers} Lighter API keys "
+                f"(comma-separated LIGHTER_API_KEY_INDEX / API_KEY_PRIVATE_KEY), found {len(keys)}")
+            return 1
+
+        server = RiskServer(self.socket_path, self.limits, self.logger)
+        await server.start()
+        self.setup_signal_handlers()
+        self._start_workers(keys)
+
+        exited = set()
+        try:
+            while any(process.is_alive() for process in self.processes):
+                await asyncio.sleep(1)
+                for process in self.processes:
+                    if process.is_alive() or process.name in exited:
+                        continue
+                    exited.add(process.name)
+                    if not self.stop_flag:
+                        self.logger.error(f"❌ {process.name} exited with code {process.exitcode}")
+        finally:
+            self.shutdown()
+            for process in self.processes:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.kill()
+            self.logger.info(f"Final risk book: {server.book.snapshot()}")
+            await server.close()
+        return 0
@@ -0,0 +1,101 @@
+"""Per-trade lifecycle handed out by OrderManager."""
+import asyncio
+import threading
+import time
+from decimal import Decimal
+
+
+class TradeState:
+    """One maker-fill -> Lighter-hedge round trip.
+
+    Each stage is an asyncio future so the strategy awaits the exact event it
+    needs instead of polling flags:
+
+    - ``maker_filled``: resolves with the final maker status ('FILLED' or 'CANCELED')
+    - ``hedge_submitted``: resolves with the hedge order result once it is sent
+    - ``hedge_filled``: resolves with the Lighter fill payload
+
+    Exchange callbacks may arrive on SDK threads, so every resolution is
+    marshalled onto the loop that created the trade.
+
+    ``stamps`` holds the monotonic nanosecond time of each lifecycle stage
+    (see strategy.latency.STAGES) for the latency histograms.
+    """
+
+    def __init__(self, side: str, quantity: Decimal, loop=None):
+        self.loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self.side = side
+        self.quantity = quantity
+        self.created_at = time.time()
+        self.stamps = {}
+
+        self.client_order_id = None
+        self.maker_order_id = None
+        self.maker_status = None
+        self.maker_filled_size = Decimal('0')
+        self.maker_fill_price = None
+
+        self.hedge_side = None
+        self.hedge_quantity = None
+        self.hedge_price = None
+        self.hedge_scheduled = False
+        self.hedge_task = None
+        # Pre-signed Lighter buy/sell pair staged while the maker order rests
+        self.prepared_hedge = None
+
+        self.maker_filled = self.loop.create_future()
+        self.hedge_submitted = self.loop.create_future()
+        self.hedge_filled = self.loop.create_future()
+
+    def stamp(self, stage, ns=None):
+        """Record ``stage`` at ``ns`` (default: now on the monotonic_ns clock); safe from any thread."""
+        self.stamps[stage] = time.monotonic_ns() if ns is None else ns
+
+    def new_maker_attempt(self, client_order_id):
+        """Reset the maker stage for a fresh (re)placement of the maker order."""
+        self.client_order_id = client_order_id
+        self.maker_order_id = None
+        self.maker_status = None
+        if self.maker_filled.done():
+            self.maker_filled = self.loop.create_future()
+
+    @property
+    def complete(self):
+        return self.hedge_filled.done()
+
+    def call_soon(self, callback, *args):
+        """Run ``callback`` on the trade's loop, from any thread."""
+        if threading.get_ident() == self._loop_thread_id:
+            self.loop.call_soon(callback, *args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def _resolve(self, future, value):
+        if threading.get_ident() == self._loop_thread_id:
+            if not future.done():
+                future.set_result(value)
+        else:
+            self.loop.call_soon_threadsafe(self._resolve, future, value)
+
+    def set_maker_status(self, status):
+        self.maker_status = status
+        if status in ('FILLED', 'CANCELED'):
+            self._resolve(self.maker_filled, status)
+
+    def set_hedge_params(self, side, quantity, price):
+        self.hedge_side = side
+        self.hedge_quantity = quantity
+        self.hedge_price = price
+
+    def set_hedge_submitted(self, result):
+        self._resolve(self.hedge_submitted, result)
+
+    def set_hedge_filled(self, fill):
+        self._resolve(self.hedge_filled, fill)
+
+    def cancel(self):
+        """Cancel any stage still pending (e.g. on shutdown or timeout)."""
+        for future in (self.maker_filled, self.hedge_submitted, self.hedge_filled):
+            if not future.done():
+                future.cancel()
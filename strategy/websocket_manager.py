@@ -1,9 +1,90 @@
 import asyncio
-import json
 import logging
 import websockets
 from decimal import Decimal
 
+from exchanges.ws_codec import BookUpdate, OrderEvent, decode_edgex, decode_extended, loads
+
+class EdgexStreamHub:
+    """One edgeX private/public stream pair shared by several contracts.
+
+    The SDK keeps a single handler per message type, so the hub installs one
+    trade-event and one depth handler and dispatches by contract id. Handlers
+    are called on the SDK's WebSocket thread.
+    """
+
+    def __init__(self, ws_manager, logger, depth=15):
+        self.ws_manager = ws_manager
+        self.logger = logger
+        self.depth = depth
+        self._order_handlers = {}
+        self._book_handlers = {}
+        self._disconnect_handlers = {}
+        self._private_connected = False
+        self._public_connected = False
+
+    def add_order_handler(self, contract_id, handler):
+        self._order_handlers[str(contract_id)] = handler
+        if not self._private_connected:
+            private_client = self.ws_manager.get_private_client()
+            private_client.on_message("trade-event", self._dispatch_orders)
+            self.ws_manager.connect_private()
+            self._private_connected = True
+
+    def add_book_handler(self, contract_id, handler, on_disconnect=None):
+        """Subscribe ``depth.{contract_id}.{depth}``; ``handler`` receives decoded BookUpdates."""
+        contract_id = str(contract_id)
+        self._book_handlers[contract_id] = handler
+        if on_disconnect:
+            self._disconnect_handlers[contract_id] = on_disconnect
+        if not self._public_connected:
+            public_client = self.ws_manager.get_public_client()
+            public_client.on_disconnect(self._dispatch_disconnect)
+            self.ws_manager.connect_public()
+            self._public_connected = True
+        self.ws_manager.subscribe_depth(contract_id, self._dispatch_book, depth=self.depth)
+
+    def remove(self, contract_id):
+        contract_id = str(contract_id)
+        self._order_handlers.pop(contract_id, None)
+        self._book_handlers.pop(contract_id, None)
+        self._disconnect_handlers.pop(contract_id, None)
+
+    def _dispatch_orders(self, message):
+        try:
+            if isinstance(message, str):
+                message = loads(message)
+            content = message.get("content", {})
+            if content.get("event") != "ORDER_UPDATE":
+                return
+            for order in content.get("data", {}).get("order", []):
+                handler = self._order_handlers.get(str(order.get("contractId")))
+                if handler:
+                    handler(order)
+        except Exception as e:
+            self.logger.error(f"Error handling EdgeX order update: {e}")
+
+    def _dispatch_book(self, message):
+        try:
+            msg = decode_edgex(message)
+            if isinstance(msg, BookUpdate):
+                handler = self._book_handlers.get(msg.market)
+                if handler:
+                    handler(msg)
+        except Exception as e:
+            self.logger.error(f"Error handling EdgeX depth update: {e}")
+
+    def _dispatch_disconnect(self, exc):
+        for handler in list(self._disconnect_handlers.values()):
+            try:
+                handler(exc)
+            except Exception as e:
+                self.logger.error(f"Error handling EdgeX disconnect: {e}")
+
+    def disconnect(self):
+        self.ws_manager.disconnect_all()
+
+
 class WebSocketManagerWrapper:
     def __init__(self, order_book_manager, logger):
         self.order_book_manager = order_book_manager
@@ -11,6 +92,7 @@ class WebSocketManagerWrapper:
         self.stop_flag = False
         
         self.on_lighter_order_filled = None
+        self.on_edgex_order_update = None
         self.on_extended_order_update = None 
 
         self.extended_ticker = None
@@ -18,11 +100,18 @@ class WebSocketManagerWrapper:
         self.extended_api_key = None
         
         self.edgex_ws_manager = None
+        self.edgex_contract_id = None
+        self.edgex_hub = None
         self.lighter_client = None
         self.lighter_market_index = None
         self.lighter_account_index = None
+        self.lighter_ws = None
         self.lighter_ws_task = None
         self.extended_ws_task = None
+        # 多市场运行时由 MultiMarketRunner 注入共享连接, 关闭时不由本实例断开
+        self.shared_streams = False
+        # 订单簿由独立的行情进程提供时, 这里只订阅私有订单推送
+        self.external_market_data = False
 
     def set_callbacks(self, on_lighter_order_filled=None, on_edgex_order_update=None, on_extended_order_update=None):
         self.on_lighter_order_filled = on_lighter_order_filled
@@ -34,11 +123,79 @@ class WebSocketManagerWrapper:
         self.extended_vault_id = vault_id
         self.extended_api_key = api_key
 
+    def set_edgex_ws_manager(self, ws_manager, contract_id):
+        self.edgex_ws_manager = ws_manager
+        self.edgex_contract_id = contract_id
+
+    def set_shared_streams(self, edgex_hub, lighter_ws):
+        """Use stream connections owned by a MultiMarketRunner instead of opening our own."""
+        self.edgex_hub = edgex_hub
+        self.lighter_ws = lighter_ws
+        self.shared_streams = True
+
     def set_lighter_config(self, client, market_index, account_index):
         self.lighter_client = client
         self.lighter_market_index = market_index
         self.lighter_account_index = account_index
 
+    # --- EdgeX Logic ---
+    async def setup_edgex_websocket(self):
+        """Connect the edgeX private stream and route trade-event order updates."""
+        if not self.edgex_ws_manager:
+            raise Exception("EdgeX WebSocket manager not initialized")
+        if self.edgex_hub is None:
+            self.edgex_hub = EdgexStreamHub(self.edgex_ws_manager, self.logger)
+
+        loop = asyncio.get_running_loop()
+
+        def order_update_handler(order):
+            # Runs on the SDK's WebSocket thread; order state is only touched on the loop
+            loop.call_soon_threadsafe(self._handle_edgex_order, order)
+
+        self.edgex_hub.add_order_handler(self.edgex_contract_id, order_update_handler)
+        if self.external_market_data:
+            return
+
+        try:
+            self.setup_edgex_depth_stream(loop)
+        except Exception as e:
+            # 行情推送不可用时, 下单定价退回 REST 深度接口
+            self.logger.error(f"Failed to subscribe EdgeX depth stream: {e}")
+
+    def setup_edgex_depth_stream(self, loop):
+        """Feed the edgeX book from the public ``depth.{contract}.{depth}`` stream.
+
+        Frames are decoded on the SDK thread and applied on ``loop`` so the book
+        is only ever mutated from the event loop.
+        """
+        def depth_handler(msg):
+            loop.call_soon_threadsafe(self._handle_edgex_book, msg)
+
+        def on_disconnect(exc):
+            loop.call_soon_threadsafe(
+                self.order_book_manager.mark_book_stale, "edgex", f"public stream disconnected: {exc}")
+
+        self.edgex_hub.add_book_handler(self.edgex_contract_id, depth_handler, on_disconnect)
+
+    def _handle_edgex_order(self, order):
+        if not self.on_edgex_order_update:
+            return
+        try:
+            self.on_edgex_order_update(order)
+        except Exception as e:
+            self.logger.error(f"Error handling EdgeX order update: {e}")
+
+    def _handle_edgex_book(self, msg):
+        try:
+            if msg.snapshot:
+                self.order_book_manager.apply_book_snapshot(
+                    "edgex", msg.bids, msg.asks, msg.timestamp, msg.offset)
+            else:
+                self.order_book_manager.apply_book_delta(
+                    "edgex", msg.bids, msg.asks, msg.timestamp, msg.offset)
+        except Exception as e:
+            self.logger.error(f"Error applying EdgeX depth update: {e}")
+
     # --- Extended Logic ---
     async def setup_extended_websocket(self):
         if not self.extended_ticker:
@@ -47,7 +204,7 @@ class WebSocketManagerWrapper:
         base_host = "wss://api.starknet.extended.exchange"
         prefix = "/stream.extended.exchange/v1"
         
-        public_url = f"{base_host}{prefix}/orderbooks/{self.extended_ticker}-USD?depth=1"
+        public_url = f"{base_host}{prefix}/orderbooks/{self.extended_ticker}-USD"
         private_url = f"{base_host}{prefix}/account"
         
         headers = {
@@ -79,43 +236,47 @@ class WebSocketManagerWrapper:
                     async for message in ws:
                         if self.stop_flag: break
                         try:
-                            data = json.loads(message)
-                            msg_type = data.get("type")
-                            payload = data.get("data", {})
-
-                            if msg_type in ["SNAPSHOT", "L2_UPDATE"] or "b" in payload:
-                                self._handle_extended_book(payload)
-                            elif msg_type == "ORDER":
-                                self._handle_extended_orders(payload)
+                            msg = decode_extended(message)
+                            if isinstance(msg, BookUpdate):
+                                self._handle_extended_book(msg)
+                            elif isinstance(msg, OrderEvent):
+                                self._handle_extended_orders(msg.orders)
                         except Exception:
                             pass
             except Exception as e:
                 self.logger.error(f"Extended {stream_name} Error: {e}")
                 await asyncio.sleep(5)
 
-    def _handle_extended_book(self, data):
-        bids = data.get('b', [])
-        asks = data.get('a', [])
-        if bids and asks:
-            try:
-                # 适配 {"p": "...", "q": "..."} 格式
-                best_bid = Decimal(str(bids[0]['p']))
-                best_ask = Decimal(str(asks[0]['p']))
-                self.order_book_manager.update_extended_bbo(best_bid, best_ask)
-            except: pass
-
-    def _handle_extended_orders(self, data):
-        orders = data.get("orders", [])
+    def _handle_extended_book(self, msg):
+        try:
+            if msg.snapshot:
+                if msg.bids or msg.asks:
+                    self.order_book_manager.apply_book_snapshot(
+                        "extended", msg.bids, msg.asks, msg.timestamp, msg.offset)
+            else:
+                # DELTA 消息中的数量为该档位的变化量
+                self.order_book_manager.apply_book_increments(
+                    "extended", msg.bids, msg.asks, msg.timestamp, msg.offset)
+        except: pass
+
+    def _handle_extended_orders(self, orders):
         if self.on_extended_order_update:
             for o in orders:
                 self.on_extended_order_update({
                     'order_id': str(o.get('id')),
                     'status': o.get('status'),
+                    'side': o.get('side'),
                     'filled_size': Decimal(str(o.get('filledQty', 0)))
                 })
 
     # --- Lighter Logic ---
     def start_lighter_websocket(self):
+        if self.shared_streams:
+            # 共享连接: 只注册本市场的订单簿和订单回调
+            self.lighter_ws.add_market(self.lighter_market_index, self._lighter_book_manager(),
+                                       self._handle_lighter_order_update)
+            return
+
         from exchanges.lighter_custom_websocket import LighterCustomWebSocketManager
         class Config:
             contract_id = self.lighter_market_index
@@ -123,14 +284,25 @@ class WebSocketManagerWrapper:
             lighter_client = self.lighter_client   
         config = Config()
         
-        async def run_lighter_ws():
-            ws = LighterCustomWebSocketManager(config, self._handle_lighter_order_update)
-            ws.set_logger(self.logger)
-            # 关键：注入 order_book_manager
-            ws.set_order_book_manager(self.order_book_manager)
-            await ws.connect()
-            
-        self.lighter_ws_task = asyncio.create_task(run_lighter_ws())
+        ws = LighterCustomWebSocketManager(config, self._handle_lighter_order_update)
+        ws.set_logger(self.logger)
+        # 关键：注入 order_book_manager
+        ws.set_order_book_manager(self._lighter_book_manager())
+        self.lighter_ws = ws
+
+        # connect() 内部负责断线重连, 直到 disconnect()
+        self.lighter_ws_task = asyncio.create_task(ws.connect())
+
+    def _lighter_book_manager(self):
+        # None: the stream only carries our account orders
+        return None if self.external_market_data else self.order_book_manager
+
+    def get_ws_metrics(self):
+        """Connection metrics of the managed streams, keyed by venue."""
+        metrics = {}
+        if self.lighter_ws:
+            metrics["lighter"] = self.lighter_ws.get_metrics()
+        return metrics
 
     def _handle_lighter_order_update(self, orders):
         for order in orders:
@@ -139,6 +311,14 @@ class WebSocketManagerWrapper:
 
     def shutdown(self):
         self.stop_flag = True
+        if self.shared_streams:
+            # 共享连接由 MultiMarketRunner 关闭, 这里只停止本市场的分发
+            if self.edgex_hub and self.edgex_contract_id is not None:
+                self.edgex_hub.remove(self.edgex_contract_id)
+            if self.lighter_ws and self.lighter_market_index is not None:
+                self.lighter_ws.remove_market(self.lighter_market_index)
+            return
         if self.extended_ws_task: self.extended_ws_task.cancel()
+        if self.lighter_ws: self.lighter_ws.disconnect()
         if self.lighter_ws_task: self.lighter_ws_task.cancel()
         if self.edgex_ws_manager: self.edgex_ws_manager.disconnect_all()
@@ -0,0 +1,64 @@
+"""The msgspec struct decoders must match the plain dict walk frame for frame."""
+
+import json
+
+import pytest
+
+from exchanges import ws_codec
+
+pytest.importorskip('msgspec')
+
+
+LIGHTER_FRAMES = [
+    {'type': 'subscribed/order_book', 'channel': 'order_book:1', 'offset': 7, 'timestamp': 1700000000000,
+     'order_book': {'bids': [{'price': '100.1', 'size': '2'}, {'price': '100.0', 'size': '1'}],
+                    'asks': [{'price': '100.2', 'size': '3'}], 'nonce': 11, 'begin_nonce': 10}},
+    {'type': 'update/order_book', 'channel': 'order_book/1', 'offset': 8,
+     'order_book': {'bids': [{'price': '100.1', 'size': '0'}], 'asks': [], 'offset': 9, 'nonce': 12}},
+    {'type': 'update/order_book', 'channel': 'order_book:2', 'offset': 8,
+     'order_book': {'bids': [], 'asks': [], 'offset': None}},
+    # list levels and p/q keys only the dict walk understands
+    {'type': 'update/order_book', 'channel': 'order_book:1',
+     'order_book': {'bids': [['100.1', '1']], 'asks': [{'p': '100.3', 'q': '1'}]}},
+    {'type': 'update/order_book', 'channel': 'order_book:1', 'order_book': {'bids': [{'price': 100.1, 'size': 1}]}},
+    # books outside 'order_book'
+    {'type': 'update/order_book', 'channel': 'order_book:3', 'bids': [{'price': '5', 'size': '1'}], 'asks': []},
+    {'type': 'update/order_book', 'channel': 'order_book:3', 'offset': 4,
+     'data': {'bids': [], 'asks': [{'price': '6', 'size': '2'}]}},
+    {'type': 'update/account_orders', 'channel': 'account_orders:1/5',
+     'orders': {'1': [{'status': 'filled', 'client_order_index': 3, 'order_index': 9, 'is_ask': False,
+                       'filled_base_amount': '1', 'extra': 'kept'}]}},
+    {'type': 'ping'},
+    {'type': 'connected', 'session_id': 'abc'},
+]
+
+EXTENDED_FRAMES = [
+    {'type': 'SNAPSHOT', 'ts': 1, 'seq': 1, 'data': {'m': 'BTC-USD', 'b': [{'p': '1', 'q': '2'}], 'a': [{'p': '2', 'q': '1'}]}},
+    {'type': 'DELTA', 'ts': 2, 'seq': 2, 'data': {'b': [{'p': '1', 'q': '-1'}]}},
+    {'type': 'SNAPSHOT', 'ts': 3, 'seq': 3, 'data': None},
+    {'type': 'SNAPSHOT', 'seq': 4, 'data': {}},
+    {'type': 'UNKNOWN', 'seq': 5, 'data': {'b': [{'p': '1', 'q': '1'}]}},
+    {'type': 'UNKNOWN', 'seq': 6, 'data': {'b': None}},
+    {'type': 'DELTA', 'seq': 7, 'data': {'b': [{'p': 1, 'q': 1}], 'a': []}},
+    {'type': 'ORDER', 'data': {'orders': [{'id': 1, 'status': 'FILLED', 'side': 'BUY', 'extra': 'kept'}]}},
+    {'type': 'PING'},
+]
+
+
+@pytest.mark.parametrize('frame', LIGHTER_FRAMES)
+@pytest.mark.parametrize('depth', [None, 1])
+def test_lighter_struct_matches_dict(frame, depth):
+    raw = json.dumps(frame)
+    assert ws_codec.decode_lighter(raw, depth) == ws_codec._lighter_from_dict(json.loads(raw), depth)
+
+
+@pytest.mark.parametrize('frame', EXTENDED_FRAMES)
+@pytest.mark.parametrize('depth', [None, 1])
+def test_extended_struct_matches_dict(frame, depth):
+    raw = json.dumps(frame)
+    assert ws_codec.decode_extended(raw, depth) == ws_codec._extended_from_dict(json.loads(raw), depth)
+
+
+def test_struct_path_handles_book_frames():
+    assert ws_codec._lighter_from_struct(ws_codec._lighter_decoder.decode(json.dumps(LIGHTER_FRAMES[0]))) is not None
+    assert ws_codec._extended_from_struct(ws_codec._extended_decoder.decode(json.dumps(EXTENDED_FRAMES[0]))) is not None